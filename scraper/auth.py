@@ -2,6 +2,8 @@
 import pickle
 import os.path
 import socket
+import throttle
+from quota import sheets_governor
 from googleapiclient.discovery import build
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
@@ -10,7 +12,17 @@ from google.auth.transport.requests import Request
 socket.setdefaulttimeout(600)
 
 
-def authenticate():
+def authenticate(quota=None):
+    """Authenticate in Google Sheets API.
+
+    Args:
+        quota (dict):
+            Max numbers of "reads" and "writes" requests
+            per minute, Sheets API quota defaults if not set.
+
+    Returns:
+        throttle.SheetsResource: Spreadsheets API resource.
+    """
     creds = None
     # The file token.pickle stores the user's access and refresh tokens, and is
     # created automatically when the authorization flow completes for the first
@@ -32,4 +44,9 @@ def authenticate():
             pickle.dump(creds, token)
 
     service = build("sheets", "v4", credentials=creds)
-    return service.spreadsheets()
+    if quota:
+        sheets_governor.configure(**quota)
+
+    return throttle.SheetsResource(
+        service.spreadsheets(), throttle.sheets_controller, sheets_governor
+    )
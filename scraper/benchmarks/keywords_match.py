@@ -0,0 +1,74 @@
+"""
+Microbenchmark: keywords matching in issue/PR bodies.
+
+Compares the previous implementation of try_match_keywords(),
+which ran a regex per keyword and a substring search per
+keyword and tracked repo, with the current single-pass regex.
+
+Run from the scraper directory:
+    python benchmarks/keywords_match.py [<number of tracked repos>]
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import try_match_keywords  # noqa: E402
+
+PATTERNS = (
+    re.compile(r"Fixes[\:]?[\s]*#[\d*]+"),
+    re.compile(r"Closes[\:]?[\s]*#[\d*]+"),
+    re.compile(r"Towards[\:]?[\s]*#[\d*]+"),
+)
+
+
+def legacy_try_match_keywords(body, repo_names):
+    """Previous implementation of try_match_keywords()."""
+    result = []
+    if body:
+        for pattern in PATTERNS:
+            result += pattern.findall(body)
+
+        for repo_name in repo_names:
+            for keyword in ("Closes", "Fixes", "Towards"):
+                link = keyword + " " + repo_name + "#"
+
+                if link in body:
+                    start_ind = body.index(link)
+                    parts = body[start_ind:].split()
+                    result += [
+                        parts[0] + " " + parts[1],
+                    ]
+    return result
+
+
+def main():
+    repos_num = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    repo_names = tuple("org/repository-{}".format(i) for i in range(repos_num))
+    bodies = [
+        "Some description of the change. " * 40
+        + "Closes #{num}. Towards {repo}#{num}".format(
+            num=num, repo=repo_names[num % repos_num]
+        )
+        for num in range(200)
+    ]
+
+    for func in (legacy_try_match_keywords, try_match_keywords):
+        seconds = min(
+            timeit.repeat(
+                lambda: [func(body, repo_names) for body in bodies],
+                number=20,
+                repeat=5,
+            )
+        )
+        print(
+            "{name}: {usec:.1f} usec per body".format(
+                name=func.__name__, usec=seconds / 20 / len(bodies) * 10**6
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: paginated reading with and without read-ahead.
+
+Simulates a paginated list, which spends the given time
+on every page request, and processing of every item.
+
+Run from the scraper directory:
+    python benchmarks/read_ahead.py [<pages>] [<page latency, s>]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import read_ahead  # noqa: E402
+
+PER_PAGE = 100
+# processing time of a single item
+ITEM_TIME = 0.0005
+
+
+def paginated_list(pages, latency):
+    """Simulate PyGithub paginated list."""
+    for page in range(pages):
+        time.sleep(latency)
+        for item in range(PER_PAGE):
+            yield page * PER_PAGE + item
+
+
+def process(items):
+    """Simulate issues processing."""
+    for _ in items:
+        time.sleep(ITEM_TIME)
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+
+    for name, wrap in (("sequential", iter), ("read-ahead", read_ahead)):
+        start = time.perf_counter()
+        process(wrap(paginated_list(pages, latency)))
+        print("{name}: {sec:.2f} s".format(name=name, sec=time.perf_counter() - start))
+
+    print(
+        "network: {net:.2f} s, processing: {proc:.2f} s".format(
+            net=pages * latency, proc=pages * PER_PAGE * ITEM_TIME
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Memory benchmark: PyGithub objects vs snapshots.
+
+Builds an index of issues and PRs from payloads shaped
+like GitHub REST API responses, and measures memory
+taken by PyGithub objects and by their snapshots.
+
+Run from the scraper directory:
+    python benchmarks/snapshots_memory.py [<number of issues>]
+"""
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import github  # noqa: E402
+import snapshots  # noqa: E402
+
+REPOS = tuple("org/repo{}".format(i) for i in range(5))
+LABELS = ("type: bug", "api: core", "priority: p2", "help wanted", "backend")
+LOGINS = tuple("user{}".format(i) for i in range(20))
+
+
+def user_payload(login):
+    """Build user payload, as returned by the API."""
+    url = "https://api.github.com/users/" + login
+    return {
+        "login": login,
+        "id": 1000,
+        "node_id": "MDQ6VXNlcjEwMDA=",
+        "avatar_url": "https://avatars.githubusercontent.com/u/1000?v=4",
+        "url": url,
+        "html_url": "https://github.com/" + login,
+        "followers_url": url + "/followers",
+        "following_url": url + "/following{/other_user}",
+        "gists_url": url + "/gists{/gist_id}",
+        "starred_url": url + "/starred{/owner}{/repo}",
+        "subscriptions_url": url + "/subscriptions",
+        "organizations_url": url + "/orgs",
+        "repos_url": url + "/repos",
+        "events_url": url + "/events{/privacy}",
+        "received_events_url": url + "/received_events",
+        "type": "User",
+        "site_admin": False,
+    }
+
+
+def label_payload(repo_name, name):
+    """Build label payload, as returned by the API."""
+    return {
+        "id": 2000,
+        "node_id": "MDU6TGFiZWwyMDAw",
+        "url": "https://api.github.com/repos/{}/labels/{}".format(repo_name, name),
+        "name": name,
+        "color": "d73a4a",
+        "default": False,
+        "description": "Label " + name,
+    }
+
+
+def issue_payload(repo_name, number, login):
+    """Build issue payload, as returned by the API."""
+    api_url = "https://api.github.com/repos/{}/issues/{}".format(repo_name, number)
+    return {
+        "url": api_url,
+        "repository_url": "https://api.github.com/repos/" + repo_name,
+        "labels_url": api_url + "/labels{/name}",
+        "comments_url": api_url + "/comments",
+        "events_url": api_url + "/events",
+        "html_url": "https://github.com/{}/issues/{}".format(repo_name, number),
+        "id": 3000 + number,
+        "node_id": "MDU6SXNzdWUzMDAw",
+        "number": number,
+        "title": "Issue number {} title".format(number),
+        "user": user_payload(login),
+        "labels": [label_payload(repo_name, name) for name in LABELS[:3]],
+        "state": "open",
+        "locked": False,
+        "assignee": user_payload(login),
+        "assignees": [user_payload(login)],
+        "milestone": None,
+        "comments": 3,
+        "created_at": "2020-06-01T10:00:00Z",
+        "updated_at": "2020-06-03T10:00:00Z",
+        "closed_at": None,
+        "author_association": "MEMBER",
+        "body": "Issue description. " * 50,
+    }
+
+
+def pull_payload(repo_name, number, login):
+    """Build pull request payload, as returned by the API."""
+    api_url = "https://api.github.com/repos/{}/pulls/{}".format(repo_name, number)
+    return {
+        "url": api_url,
+        "id": 4000 + number,
+        "node_id": "MDExOlB1bGxSZXF1ZXN0NDAwMA==",
+        "html_url": "https://github.com/{}/pull/{}".format(repo_name, number),
+        "diff_url": "https://github.com/{}/pull/{}.diff".format(repo_name, number),
+        "patch_url": "https://github.com/{}/pull/{}.patch".format(repo_name, number),
+        "issue_url": api_url.replace("pulls", "issues"),
+        "commits_url": api_url + "/commits",
+        "review_comments_url": api_url + "/comments",
+        "comments_url": api_url.replace("pulls", "issues") + "/comments",
+        "statuses_url": "https://api.github.com/repos/{}/statuses/abc".format(
+            repo_name
+        ),
+        "number": number,
+        "state": "closed",
+        "locked": False,
+        "title": "Fix issue {}".format(number),
+        "user": user_payload(login),
+        "body": "Closes #{}. ".format(number) + "PR description. " * 30,
+        "labels": [],
+        "created_at": "2020-06-01T10:00:00Z",
+        "updated_at": "2020-06-03T10:00:00Z",
+        "closed_at": "2020-06-03T10:00:00Z",
+        "merged_at": "2020-06-03T10:00:00Z",
+        "merge_commit_sha": "e5bd3914e2e596debea16f433f57875b5b90bcd6",
+        "assignee": None,
+        "assignees": [],
+        "author_association": "MEMBER",
+    }
+
+
+def build_objects(num):
+    """Build PyGithub issues and PRs."""
+    requester = github.Github()._Github__requester
+
+    issues = {}
+    pulls = []
+    for number in range(1, num + 1):
+        repo_name = REPOS[number % len(REPOS)]
+        login = LOGINS[number % len(LOGINS)]
+
+        issue = github.Issue.Issue(
+            requester, {}, issue_payload(repo_name, number, login), completed=True
+        )
+        issues[issue.html_url] = issue
+        pulls.append(
+            github.PullRequest.PullRequest(
+                requester, {}, pull_payload(repo_name, number, login), completed=True
+            )
+        )
+    return issues, pulls
+
+
+def build_snapshots(issues, pulls):
+    """Convert PyGithub objects into snapshots."""
+    return (
+        {url: snapshots.issue_snapshot(issue) for url, issue in issues.items()},
+        [snapshots.pull_snapshot(pull) for pull in pulls],
+    )
+
+
+def measure(func, *args):
+    """Measure memory taken by the function result.
+
+    Returns:
+        object: Function result.
+        int: Allocated memory in bytes.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = func(*args)
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def main():
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    # make datetime parsing and interning caches warm
+    build_snapshots(*build_objects(10))
+
+    objects, objects_size = measure(build_objects, num)
+    _, snapshots_size = measure(build_snapshots, *objects)
+
+    print("Issues and PRs: {num} each".format(num=num))
+    print("PyGithub objects: {:.1f} MB".format(objects_size / 2**20))
+    print("Snapshots:        {:.1f} MB".format(snapshots_size / 2**20))
+    print("Reduction:        {:.1f}x".format(objects_size / snapshots_size))
+
+
+if __name__ == "__main__":
+    main()
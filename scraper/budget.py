@@ -0,0 +1,109 @@
+"""Planning GitHub requests within the rate limit."""
+import logging
+import threading
+import time
+from utils import load_update_stamps, save_update_stamps
+
+
+# cost of a repo, which was never read
+DEFAULT_COST = 20
+
+
+class BudgetScheduler:
+    """Plans repositories reading within the remaining rate limit.
+
+    Scheduler estimates every repository reading cost
+    (number of requests) from the previous updates. If
+    the remaining rate limit isn't enough to read all of
+    the repositories, the most important ones are read, and
+    the others are deferred till the next update.
+
+    Args:
+        name (str): Name to save cost estimations with.
+        reserve (int): Number of requests to be left unused.
+    """
+
+    def __init__(self, name, reserve=50):
+        self._name = name
+        self._reserve = reserve
+        self._lock = threading.Lock()
+        # estimated reading costs of repos
+        self._costs = load_update_stamps("repo_costs", name)
+        # repos deferred on the previous update
+        self._deferred = []
+
+    def plan(self, repo_names, priorities, rate_limit):
+        """Designate repositories to be read on this update.
+
+        Repositories with higher priority are read first. Among
+        the repos with the same priority the ones, deferred on
+        the previous update, go first.
+
+        Args:
+            repo_names (tuple): Names of the tracked repos.
+            priorities (dict): Repos priorities, 0 by default.
+            rate_limit (tuple):
+                Remaining requests, requests limit and rate
+                limit reset timestamp. None, if unknown.
+
+        Returns:
+            list: Names of the repos to be read, in reading order.
+        """
+        order = sorted(
+            repo_names,
+            key=lambda name: (-priorities.get(name, 0), name not in self._deferred),
+        )
+        if rate_limit is None:
+            self._deferred = []
+            return order
+
+        remaining, limit, reset_time = rate_limit
+        if reset_time <= time.time():
+            remaining = limit
+
+        budget = remaining - self._reserve
+        planned = []
+        deferred = []
+        for name in order:
+            cost = self._costs.get(name, DEFAULT_COST)
+            if cost <= budget:
+                planned.append(name)
+                budget -= cost
+            else:
+                deferred.append(name)
+
+        self._deferred = deferred
+        if deferred:
+            logging.warning(
+                "Rate limit is not enough, deferred till the next update: "
+                + ", ".join(deferred)
+            )
+        return planned
+
+    def record(self, repo_name, cost):
+        """Update repository reading cost estimation.
+
+        Args:
+            repo_name (str): Repository name.
+            cost (int): Number of requests spent on the repo reading.
+        """
+        with self._lock:
+            old_cost = self._costs.get(repo_name)
+            if old_cost is None:
+                self._costs[repo_name] = cost
+            else:
+                self._costs[repo_name] = (old_cost + cost + 1) // 2
+
+    def defer(self, repo_name):
+        """Defer repository reading till the next update.
+
+        Args:
+            repo_name (str): Repository name.
+        """
+        with self._lock:
+            if repo_name not in self._deferred:
+                self._deferred.append(repo_name)
+
+    def save(self):
+        """Save cost estimations into file."""
+        save_update_stamps("repo_costs", self._name, self._costs)
@@ -28,6 +28,31 @@ TITLE = "QLogic Issue Tracker"
 # TODO: set duration of a pause between updates
 UPDATE_PERIODICITY = 3600  # one hour
 
+# on-disk cache of GitHub responses, revalidated with
+# conditional requests, which don't consume rate limit
+# set to {} to disable caching
+HTTP_CACHE = {"path": "http_cache", "max_size": 100 * 1024 * 1024}  # 100 MB
+
+# pool of GitHub credentials, every one with its own rate limit;
+# requests are sent with the token, which has the most of the
+# rate limit remaining; "apps" are GitHub App installations:
+# {"app_id": 1234, "private_key_path": "app.pem", "installation_id": 5678}
+# set to {} to use login and password from loginpas.txt
+GITHUB_TOKENS = {}  # {"tokens": ["<token1>", "<token2>"], "apps": []}
+
+# max numbers of Google Sheets API read and write requests
+# per minute; requests are paced to fit into these quotas
+SHEETS_QUOTA = {"reads": 60, "writes": 60}
+
+# local receiver of GitHub webhook events ("issues", "pull_request"
+# and "issue_comment"), which are used to update affected sheets
+# between the regular updates; "secret" must be the same as the
+# webhook secret set on GitHub; set to {} to disable webhooks
+WEBHOOKS = {}  # {"secret": "<webhook secret>", "port": 8080}
+
+# TODO: set duration of a pause between checks for webhook events
+WEBHOOKS_PERIODICITY = 60  # one minute
+
 # TODO: set your table structure
 COLUMNS = [
     {
@@ -174,6 +199,25 @@ SHEETS = {
         },
         # columns configurations for this sheet
         "columns": PY_COLUMNS,
+        # number of repositories to be read from GitHub in parallel
+        "fetch_workers": 8,
+        # number of pages of a repository to be read in parallel
+        # on the first update ("rest" engine only); too many parallel
+        # requests can trigger GitHub secondary rate limits
+        "page_workers": 4,
+        # API to read GitHub data with: "rest" (default) or "graphql";
+        # GraphQL requires personal access token used as a password,
+        # and is used for all of the sheets if any sheet sets it
+        "fetch_engine": "rest",  # "graphql"
+        # sheets with higher priority are updated first, if
+        # GitHub rate limit isn't enough for all of the repos
+        "priority": 1,
+        # raise an error, if filling functions make PyGithub
+        # objects send additional requests (for debugging)
+        "strict_completion": False,
+        # read repos only if their events feed changed since the
+        # last update; events can appear in the feed with a delay
+        "probe_changes": True,
     },
     # -----------------------------
     "NodeJS": {
@@ -22,4 +22,12 @@ while True:
     spreadsheet.update_structure()
     spreadsheet.update_all_sheets()
 
-    time.sleep(config.UPDATE_PERIODICITY)
+    if config.WEBHOOKS:
+        # between the regular updates, update only
+        # sheets affected by webhook events
+        next_update = time.time() + config.UPDATE_PERIODICITY
+        while time.time() < next_update:
+            time.sleep(config.WEBHOOKS_PERIODICITY)
+            spreadsheet.update_dirty_sheets()
+    else:
+        time.sleep(config.UPDATE_PERIODICITY)
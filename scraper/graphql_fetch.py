@@ -0,0 +1,294 @@
+"""
+Reading issues and PRs with GitHub GraphQL API.
+
+A single GraphQL request returns a page of 100 issues
+or PRs with all of the fields, which filling functions
+use, so no additional requests are needed to fill a row.
+"""
+import json
+import transport
+from snapshots import IssueSnapshot, PullSnapshot, to_datetime
+
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+PAGE_SIZE = 100
+
+ISSUE_FIELDS = """
+number title state createdAt updatedAt closedAt
+labels(first: 100) { nodes { name } }
+assignees(first: 10) { nodes { login } }
+"""
+
+ISSUES_QUERY = (
+    """
+query($owner: String!, $name: String!, $cursor: String, $size: Int!,
+      $since: DateTime, $states: [IssueState!]) {
+  repository(owner: $owner, name: $name) {
+    issues(first: $size, after: $cursor, states: $states,
+           filterBy: {since: $since},
+           orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes { %s }
+    }
+  }
+}
+"""
+    % ISSUE_FIELDS
+)
+
+# every issue is requested with its own alias: i<number>
+ISSUES_BY_NUMBERS_QUERY = """
+query($owner: String!, $name: String!) {
+  repository(owner: $owner, name: $name) { %s }
+}
+"""
+
+PULLS_QUERY = """
+query($owner: String!, $name: String!, $cursor: String, $size: Int!) {
+  repository(owner: $owner, name: $name) {
+    pullRequests(first: $size, after: $cursor,
+                 orderBy: {field: UPDATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number body state merged createdAt updatedAt
+        author { login }
+      }
+    }
+  }
+}
+"""
+
+
+class GraphQLError(Exception):
+    """GitHub GraphQL API returned errors.
+
+    Args:
+        errors (list): Errors from the response.
+    """
+
+    def __init__(self, errors):
+        super().__init__("; ".join(error.get("message", "") for error in errors))
+        self.errors = errors
+
+
+class RateLimitError(GraphQLError):
+    """GitHub GraphQL API rate limit exceeded."""
+
+
+class HTTPTransport:
+    """Transport, sending GraphQL queries to GitHub.
+
+    Args:
+        token (str):
+            GitHub access token. If not given, queries
+            are signed by the transport tokens pool.
+        url (str): GraphQL API endpoint.
+        timeout (int): Request timeout in seconds.
+    """
+
+    def __init__(self, token=None, url=GRAPHQL_URL, timeout=600):
+        self._headers = {"Content-Type": "application/json"}
+        if token is not None:
+            self._headers["Authorization"] = "bearer " + token
+        self._url = url
+        self._timeout = timeout
+
+    def __call__(self, query, variables):
+        """Send GraphQL query.
+
+        Args:
+            query (str): GraphQL query.
+            variables (dict): Query variables.
+
+        Returns:
+            dict: Parsed JSON response.
+        """
+        resp = transport.send(
+            "POST",
+            self._url,
+            json.dumps({"query": query, "variables": variables}),
+            dict(self._headers),
+            self._timeout,
+        )
+        if resp.status != 200:
+            message = "HTTP {status}: {body}".format(
+                status=resp.status, body=resp.read()
+            )
+            raise GraphQLError([{"message": message}])
+        return json.loads(resp.read())
+
+
+class GraphQLFetcher:
+    """Reads issues and PRs of repositories with GraphQL API.
+
+    Args:
+        transport (Callable):
+            Function, which sends (query, variables) to
+            GraphQL endpoint and returns parsed JSON response.
+    """
+
+    def __init__(self, transport):
+        self._transport = transport
+
+    def fetch_issues(self, repo_name, since=None):
+        """Read issues of the repository.
+
+        Args:
+            repo_name (str): Repository full name.
+            since (datetime.datetime):
+                If given, read all (opened and closed) issues,
+                updated since this time. Read only opened
+                issues otherwise.
+
+        Yields:
+            snapshots.IssueSnapshot: Issues, the last updated first.
+        """
+        variables = {
+            "since": _to_iso(since) if since else None,
+            "states": None if since else ["OPEN"],
+        }
+        for node in self._paginate(ISSUES_QUERY, repo_name, "issues", variables):
+            yield _build_issue(repo_name, node)
+
+    def fetch_issues_by_numbers(self, repo_name, numbers):
+        """Read the specified issues of the repository.
+
+        Issues are requested in batches of 100 per query.
+
+        Args:
+            repo_name (str): Repository full name.
+            numbers (Iterable): Numbers of the issues to read.
+
+        Returns:
+            dict:
+                Index in format {<number>: snapshots.IssueSnapshot}.
+                Deleted (and transferred) issues have None value.
+        """
+        owner, name = repo_name.split("/")
+        numbers = sorted(set(numbers))
+        issues = {}
+
+        for start in range(0, len(numbers), PAGE_SIZE):
+            aliases = " ".join(
+                "i{num}: issue(number: {num}) {{ {fields} }}".format(
+                    num=num, fields=ISSUE_FIELDS
+                )
+                for num in numbers[start : start + PAGE_SIZE]  # noqa: E203
+            )
+            resp = self._transport(
+                ISSUES_BY_NUMBERS_QUERY % aliases, {"owner": owner, "name": name}
+            )
+            # missing issues are returned as
+            # nulls with NOT_FOUND errors
+            errors = [
+                error
+                for error in resp.get("errors") or []
+                if error.get("type") != "NOT_FOUND"
+            ]
+            if errors or not resp.get("data"):
+                raise GraphQLError(errors or resp.get("errors", []))
+
+            for alias, node in resp["data"]["repository"].items():
+                num = int(alias[1:])
+                issues[num] = _build_issue(repo_name, node) if node else None
+
+        return issues
+
+    def fetch_pulls(self, repo_name, since=None):
+        """Read pull requests of the repository.
+
+        Args:
+            repo_name (str): Repository full name.
+            since (datetime.datetime):
+                If given, stop on the first PR which
+                wasn't updated since this time.
+
+        Yields:
+            snapshots.PullSnapshot: PRs, the last updated first.
+        """
+        for node in self._paginate(PULLS_QUERY, repo_name, "pullRequests"):
+            updated_at = to_datetime(node["updatedAt"])
+            if since and updated_at < since:
+                return
+
+            yield PullSnapshot(
+                repo_name,
+                node["number"],
+                node["body"],
+                "open" if node["state"] == "OPEN" else "closed",
+                node["merged"],
+                # author is None for deleted accounts
+                (node["author"] or {"login": "ghost"})["login"],
+                to_datetime(node["createdAt"]),
+                updated_at,
+            )
+
+    def _paginate(self, query, repo_name, connection, variables=None):
+        """Iterate through all the pages of the repository connection.
+
+        Args:
+            query (str): GraphQL query.
+            repo_name (str): Repository full name.
+            connection (str): Name of the paginated connection.
+            variables (dict): Additional query variables.
+
+        Yields:
+            dict: Connection nodes.
+        """
+        owner, name = repo_name.split("/")
+        variables = dict(variables or {}, owner=owner, name=name, size=PAGE_SIZE)
+        variables["cursor"] = None
+
+        while True:
+            resp = self._transport(query, variables)
+            errors = resp.get("errors")
+            if errors:
+                if any(error.get("type") == "RATE_LIMITED" for error in errors):
+                    raise RateLimitError(errors)
+                raise GraphQLError(errors)
+
+            page = resp["data"]["repository"][connection]
+            for node in page["nodes"]:
+                yield node
+
+            if not page["pageInfo"]["hasNextPage"]:
+                return
+            variables["cursor"] = page["pageInfo"]["endCursor"]
+
+
+def _build_issue(repo_name, node):
+    """Build issue object from GraphQL node.
+
+    Issue body is not read, as it's not used in filling.
+
+    Args:
+        repo_name (str): Repository full name.
+        node (dict): Issue node.
+
+    Returns:
+        snapshots.IssueSnapshot: Issue object.
+    """
+    return IssueSnapshot(
+        repo_name,
+        node["number"],
+        node["title"],
+        None,
+        node["state"].lower(),
+        [label["name"] for label in node["labels"]["nodes"]],
+        [user["login"] for user in node["assignees"]["nodes"]],
+        to_datetime(node["createdAt"]),
+        to_datetime(node["updatedAt"]),
+        to_datetime(node["closedAt"]),
+    )
+
+
+def _to_iso(value):
+    """Convert naive UTC datetime into GraphQL DateTime.
+
+    Args:
+        value (datetime.datetime): Time to convert.
+
+    Returns:
+        str: ISO-8601 time string.
+    """
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
@@ -0,0 +1,187 @@
+"""
+On-disk cache of GitHub responses.
+
+Cached responses are revalidated with conditional requests
+(If-None-Match/If-Modified-Since). GitHub answers with
+"304 Not Modified" if the resource wasn't changed, and such
+responses are not counted against the rate limit.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from transport import Response
+
+
+class HTTPCache:
+    """Size-bounded cache of GET responses, stored in a directory.
+
+    Every response is stored in its own file. When the
+    total size exceeds the limit, the least recently
+    used responses are deleted.
+
+    Args:
+        path (str): Path to the cache directory.
+        max_size (int): Max total size of the cached responses in bytes.
+    """
+
+    def __init__(self, path="http_cache", max_size=100 * 1024 * 1024):
+        self._path = path
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        # {<file name>: [<size>, <last access time>]}
+        self._entries = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def send(self, request, verb, url, body, headers, timeout=None):
+        """Send GET request, using the cached response if possible.
+
+        Args:
+            request (Callable): Function to actually send the request.
+            verb (str): HTTP method.
+            url (str): Absolute URL.
+            body (str): Request body.
+            headers (dict): Request headers.
+            timeout (int): Request timeout in seconds.
+
+        Returns:
+            transport.Response: Response object.
+        """
+        key = _build_key(url, headers)
+        entry = self._load(key)
+
+        if entry is not None:
+            headers = dict(headers)
+            if entry["etag"]:
+                headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        resp = request(verb, url, body, headers, timeout)
+
+        if resp.status == 304 and entry is not None:
+            with self._lock:
+                self.hits += 1
+            # 304 contains actual rate limit headers
+            resp_headers = dict(entry["headers"])
+            resp_headers.update({k.lower(): v for k, v in resp.headers.items()})
+            return Response(200, resp_headers, entry["body"])
+
+        with self._lock:
+            self.misses += 1
+        if resp.status == 200:
+            self._store(key, url, resp)
+        return resp
+
+    def stats(self):
+        """Return cache usage counters.
+
+        Returns:
+            dict: Hits, misses and evictions numbers.
+        """
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def _load(self, key):
+        """Load cached response.
+
+        Args:
+            key (str): Cache entry key.
+
+        Returns:
+            dict: Cached response, None if not found.
+        """
+        with self._lock:
+            self._load_entries()
+            if key not in self._entries:
+                return None
+
+            entry_path = os.path.join(self._path, key)
+            try:
+                with open(entry_path) as entry_file:
+                    entry = json.load(entry_file)
+                # remember access time for restarts
+                os.utime(entry_path)
+            except (OSError, ValueError):
+                self._entries.pop(key)
+                return None
+
+            self._entries[key][1] = time.time()
+        return entry
+
+    def _store(self, key, url, resp):
+        """Save response into cache, if it can be revalidated.
+
+        Args:
+            key (str): Cache entry key.
+            url (str): Response URL.
+            resp (transport.Response): Response to cache.
+        """
+        headers = {k.lower(): v for k, v in resp.headers.items()}
+        if not ("etag" in headers or "last-modified" in headers):
+            return
+
+        data = json.dumps(
+            {
+                "url": url,
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "headers": headers,
+                "body": resp.read(),
+            }
+        )
+        with self._lock:
+            self._load_entries()
+            with open(os.path.join(self._path, key), "w") as entry_file:
+                entry_file.write(data)
+
+            self._entries[key] = [len(data), time.time()]
+            self._evict()
+
+    def _load_entries(self):
+        """Build entries index from the cache directory (once)."""
+        if self._entries is not None:
+            return
+
+        os.makedirs(self._path, exist_ok=True)
+        self._entries = {}
+        for name in os.listdir(self._path):
+            stat = os.stat(os.path.join(self._path, name))
+            self._entries[name] = [stat.st_size, stat.st_mtime]
+
+    def _evict(self):
+        """Delete the least recently used entries to fit the size limit."""
+        total = sum(size for size, _ in self._entries.values())
+        if total <= self._max_size:
+            return
+
+        for key in sorted(self._entries, key=lambda k: self._entries[k][1]):
+            total -= self._entries.pop(key)[0]
+            try:
+                os.remove(os.path.join(self._path, key))
+            except OSError:
+                pass
+
+            self.evictions += 1
+            if total <= self._max_size:
+                return
+
+
+def _build_key(url, headers):
+    """Build cache key of the request.
+
+    Different credentials can give different responses
+    for the same URL, so authorization is a part of the key.
+
+    Args:
+        url (str): Absolute URL.
+        headers (dict): Request headers.
+
+    Returns:
+        str: Cache key, which can be used as a file name.
+    """
+    auth = headers.get("Authorization", "")
+    return hashlib.sha1((auth + " " + url).encode()).hexdigest()
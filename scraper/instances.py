@@ -16,6 +16,7 @@ class Columns:
     def __init__(self, cols, sheet_id):
         self._sheet_id = sheet_id
         self._requests = []  # formating requests for columns
+        self.rules = []  # conditional format rules for columns
         self.names = []  # column names in title row
         self.fill_funcs = {}
 
@@ -40,8 +41,7 @@ class Columns:
         Returns:
             list: Columns formatting requests.
         """
-        self._requests.insert(0, self._title_row_request)
-        return self._requests
+        return [self._title_row_request] + self._requests
 
     def column_symbol(self, column):
         """Return columns letter.
@@ -134,7 +134,7 @@ class Columns:
             self._requests.append(request)
 
     def _gen_color_request(self, index, col):
-        """Requests to set color for specific values in cell.
+        """Conditional rules to set color for specific values in cell.
 
         Args:
             index (int): Column index.
@@ -142,27 +142,23 @@ class Columns:
         """
         if "values" in col.keys() and isinstance(col["values"], dict):
             for value, color in col["values"].items():
-                self._requests.append(
+                self.rules.append(
                     {
-                        "addConditionalFormatRule": {
-                            "rule": {
-                                "ranges": [
-                                    {
-                                        "sheetId": self._sheet_id,
-                                        "startRowIndex": 1,
-                                        "startColumnIndex": index,
-                                        "endColumnIndex": index + 1,
-                                    }
-                                ],
-                                "booleanRule": {
-                                    "condition": {
-                                        "type": "TEXT_EQ",
-                                        "values": [{"userEnteredValue": value}],
-                                    },
-                                    "format": {"backgroundColor": color},
-                                },
+                        "ranges": [
+                            {
+                                "sheetId": self._sheet_id,
+                                "startRowIndex": 1,
+                                "startColumnIndex": index,
+                                "endColumnIndex": index + 1,
                             }
-                        }
+                        ],
+                        "booleanRule": {
+                            "condition": {
+                                "type": "TEXT_EQ",
+                                "values": [{"userEnteredValue": value}],
+                            },
+                            "format": {"backgroundColor": color},
+                        },
                     }
                 )
 
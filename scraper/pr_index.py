@@ -4,10 +4,13 @@ and indexating.
 """
 import datetime
 import logging
+import snapshots
 from utils import (
     try_match_keywords,
     log_progress,
     load_update_stamps,
+    read_ahead,
+    read_pages,
     save_update_stamps,
 )
 
@@ -17,7 +20,13 @@ class PullRequestsIndex(dict):
 
     Index is built this way:
         <issue URL>:
-            [<PR related to this issue>, <PR related to this issue>...]
+            {<PR number>: <PR related to this issue>, ...}
+
+    PRs of every issue are kept in creation date
+    order (DESC), so they are never sorted on read.
+
+    Index is saved on disk together with the last
+    update stamps, and restored on restart.
 
     Args:
         sheet_name (str):
@@ -30,6 +39,15 @@ class PullRequestsIndex(dict):
         self._sheet_name = sheet_name
         # time when any PR was last updated in specific repo
         self._last_pr_updates = load_update_stamps("last_pr_updates", sheet_name)
+        # index changed since the last save
+        self._changed = False
+
+        for issue_url, records in load_update_stamps("prs_index", sheet_name).items():
+            prs = map(snapshots.pull_from_record, records)
+            self[issue_url] = {
+                pr.number: pr
+                for pr in sorted(prs, key=lambda pr: pr.created_at, reverse=True)
+            }
 
     def get_related_prs(self, issue_id):
         """Get PRs related to the given issue.
@@ -38,11 +56,9 @@ class PullRequestsIndex(dict):
             issue_id (str): Issue URL.
 
         Returns:
-            list: Related PRs objects.
+            list: Related PRs objects, sorted by creation date (DESC).
         """
-        prs = self.get(issue_id, [])
-        prs.sort(key=sort_pull_requests, reverse=True)
-        return prs
+        return list(self.get(issue_id, {}).values())
 
     def index_closed_prs(self, repo, repo_names):
         """Add closed pull requests into index.
@@ -55,36 +71,123 @@ class PullRequestsIndex(dict):
             repo (github.Repository.Repository): Repository object.
             repo_names (tuple): All tracked on this sheet repos names.
         """
+        links, last_update = self.fetch_closed_prs(repo, repo_names)
+        self.merge(repo.full_name, links, last_update)
+
+    def fetch_closed_prs(self, repo, repo_names, page_workers=1):
+        """Read closed pull requests updated since the last indexation.
+
+        Doesn't change the index, so it can be called for
+        several repositories in parallel. Use merge() to
+        add the fetched PRs into the index.
+
+        Args:
+            repo (github.Repository.Repository): Repository object.
+            repo_names (tuple): All tracked on this sheet repos names.
+            page_workers (int):
+                Number of threads reading pages in parallel
+                on the first update.
+
+        Returns:
+            list:
+                (<repo URL>, <PR>, <key phrase>) tuples,
+                ready to be passed into add().
+            datetime.datetime:
+                Last PR update time, None if there are no PRs.
+        """
+        links = []
+        last_update = None
+
         pulls = repo.get_pulls(state="closed", sort="updated", direction="desc")
 
-        if pulls.totalCount:
-            is_first_update = False
-            logging.info("{repo}: indexing pull requests".format(repo=repo.full_name))
+        last_indexed = self._last_pr_updates.get(repo.full_name)
+        is_first_update = last_indexed is None
+        if is_first_update:
+            last_indexed = datetime.datetime(1, 1, 1)
 
-            for index, pull in enumerate(pulls):
-                if repo.full_name not in self._last_pr_updates.keys():
-                    self._last_pr_updates[repo.full_name] = datetime.datetime(1, 1, 1)
-                    is_first_update = True
+        logging.info("{repo}: indexing pull requests".format(repo=repo.full_name))
 
-                if pull.updated_at < self._last_pr_updates[repo.full_name]:
-                    break
+        # PRs number is requested separately, so
+        # it's read only for parallel pages reading
+        total = None
+        if is_first_update and page_workers > 1:
+            total = pulls.totalCount
+            pulls_iter = read_pages(pulls, total, page_workers)
+        elif is_first_update:
+            # the next page is read while the current one is processed
+            pulls_iter = read_ahead(pulls)
+        else:
+            # the scan usually stops on the first page, so pages
+            # are not read ahead, not to waste a request
+            pulls_iter = pulls
 
-                for key_phrase in try_match_keywords(pull.body, repo_names):
-                    self.add(repo.html_url, pull, key_phrase)
+        for index, pull in enumerate(pulls_iter):
+            if last_update is None:
+                last_update = pull.updated_at
 
-                log_progress(is_first_update, pulls.totalCount, index, "pull requests")
+            if pull.updated_at < last_indexed:
+                break
 
-            self._last_pr_updates[repo.full_name] = pulls[0].updated_at
-            logging.info(
-                "{repo}: all pull requests indexed".format(repo=repo.full_name)
-            )
+            for key_phrase in try_match_keywords(pull.body, repo_names):
+                links.append((repo.html_url, pull, key_phrase))
+
+            log_progress(is_first_update, total, index, "pull requests")
+
+        logging.info("{repo}: all pull requests indexed".format(repo=repo.full_name))
+        return links, last_update
+
+    def merge(self, repo_name, links, last_update=None):
+        """Add fetched pull requests into index.
+
+        Args:
+            repo_name (str): Repository full name.
+            links (list): (<repo URL>, <PR>, <key phrase>) tuples.
+            last_update (datetime.datetime): Last PR update time in this repo.
+        """
+        for repo_url, pull, key_phrase in links:
+            self.add(repo_url, pull, key_phrase)
+            self._changed = True
+
+        if last_update is not None:
+            self._last_pr_updates[repo_name] = last_update
+
+    def last_update(self, repo_name):
+        """Get the last indexed PR update time.
+
+        Args:
+            repo_name (str): Repository full name.
+
+        Returns:
+            datetime.datetime:
+                Last PR update time, None if PRs of
+                the repo were never indexed.
+        """
+        return self._last_pr_updates.get(repo_name)
 
     def save_updates(self):
-        """Save last PRs update timestamps into file."""
+        """Save index and last PRs update timestamps into file.
+
+        Index is saved before the stamps, so that if the process
+        dies in between, PRs will be indexed once again, not lost.
+        """
+        if self._changed:
+            save_update_stamps(
+                "prs_index",
+                self._sheet_name,
+                {
+                    issue_url: [snapshots.pull_to_record(pull) for pull in prs.values()]
+                    for issue_url, prs in self.items()
+                },
+            )
+            self._changed = False
+
         save_update_stamps("last_pr_updates", self._sheet_name, self._last_pr_updates)
 
     def add(self, repo_url, lpr, key_exp):
-        """Add PR object into index or update it."""
+        """Add PR object into index or update it.
+
+        PRs are kept in the index as compact snapshots.
+        """
         issue_num = key_exp.split("#")[1]
 
         if "/" in key_exp:  # external repo
@@ -92,30 +195,29 @@ class PullRequestsIndex(dict):
             repo_url = "https://github.com/" + repo_name
 
         issue_url = repo_url + "/issues/" + issue_num
-        if issue_url not in self:
-            self[issue_url] = []
-
-        self._add_or_update_pr(self[issue_url], lpr)
+        self._add_or_update_pr(issue_url, snapshots.pull_snapshot(lpr))
 
-    def _add_or_update_pr(self, prs, pr):
+    def _add_or_update_pr(self, issue_url, pr):
         """Update PR in index or add it into index.
 
         Args:
-            prs (list): PRs related to a concrete issue.
-            pr (github.PullRequest.PullRequest): Recently updated PR.
+            issue_url (str): URL of the issue related to the PR.
+            pr (snapshots.PullSnapshot): Recently updated PR.
         """
-        is_old = False
-
-        for index, old_pr in enumerate(prs):
-            if old_pr.number == pr.number:
-                prs[index] = pr
-                is_old = True
-                return
-
-        if not is_old:
-            prs.append(pr)
-
-
-def sort_pull_requests(pull_request):
-    """Sort pull requests by their creation date."""
-    return pull_request.created_at
+        prs = self.get(issue_url)
+        if prs is None:
+            self[issue_url] = {pr.number: pr}
+        elif pr.number in prs:
+            # PR creation date never changes,
+            # so the order is kept
+            prs[pr.number] = pr
+        else:
+            # new PR links are rare, so the
+            # issue PRs are rebuilt in order
+            ordered = list(prs.values())
+            pos = 0
+            while pos < len(ordered) and ordered[pos].created_at >= pr.created_at:
+                pos += 1
+
+            ordered.insert(pos, pr)
+            self[issue_url] = {pull.number: pull for pull in ordered}
@@ -0,0 +1,76 @@
+"""
+Pacing of the Google Sheets API requests.
+
+Sheets API limits the number of read and write
+requests per minute. Governor tracks requests sent
+during the last minute and holds the next request
+till it fits into the quota, so that a full update of
+a big spreadsheet is paced instead of failing.
+"""
+import collections
+import logging
+import threading
+import time
+
+# Sheets API methods, which are counted as reads
+READ_METHODS = ("get", "batchGet", "getByDataFilter", "batchGetByDataFilter")
+
+
+class QuotaGovernor:
+    """Sliding window quotas of read and write requests.
+
+    Args:
+        reads (int): Max number of read requests in the window.
+        writes (int): Max number of write requests in the window.
+        window (float): Quota window in seconds.
+    """
+
+    def __init__(self, reads=60, writes=60, window=60):
+        self._limits = {"read": reads, "write": writes}
+        self._window = window
+        self._lock = threading.Lock()
+        # send times of the requests in the current window
+        self._sent = {"read": collections.deque(), "write": collections.deque()}
+
+        self.waited = 0
+
+    def configure(self, reads=60, writes=60):
+        """Set quotas.
+
+        Args:
+            reads (int): Max number of read requests in the window.
+            writes (int): Max number of write requests in the window.
+        """
+        with self._lock:
+            self._limits = {"read": reads, "write": writes}
+
+    def acquire(self, method):
+        """Wait till the request fits into the quota.
+
+        Args:
+            method (str): Sheets API method name.
+        """
+        kind = "read" if method in READ_METHODS else "write"
+        while True:
+            with self._lock:
+                now = time.time()
+                sent = self._sent[kind]
+                while sent and sent[0] <= now - self._window:
+                    sent.popleft()
+
+                if len(sent) < self._limits[kind]:
+                    sent.append(now)
+                    return
+
+                delay = sent[0] + self._window - now
+                self.waited += delay
+
+            logging.info(
+                "Sheets {kind} quota reached, waiting {delay:.1f} s".format(
+                    kind=kind, delay=delay
+                )
+            )
+            time.sleep(delay)
+
+
+sheets_governor = QuotaGovernor()
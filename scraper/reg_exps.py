@@ -1,13 +1,46 @@
+import functools
 import re
 
 DIGITS_PATTERN = re.compile(r"[\d*]+")
 
-# patterns, which are used for designation connections
-# between issues and PRs
-PATTERNS = (
-    re.compile("Fixes[\:]?[\s]*#[\d*]+"),
-    re.compile("Closes[\:]?[\s]*#[\d*]+"),
-    re.compile("Towards[\:]?[\s]*#[\d*]+"),
-)
+# keywords, which are used for designation connections
+# between issues and PRs: GitHub closing keywords and "Towards"
+KEYWORDS = r"close[sd]?|fix(?:e[sd])?|resolve[sd]?|towards"
+KEYWORD_REF = r"\b(?P<keyword>{keywords}):?\s*(?P<repo>{repos})?#(?P<num>\d+)\Z"
+# issue references, which can be preceded by a keyword
+ISSUE_REF_REGEX = re.compile(r"#\d+\b")
+# max length of a keyword with a colon and spaces
+KEYWORD_LENGTH = 40
+
+
+@functools.lru_cache(maxsize=32)
+def build_keywords_regex(repo_names):
+    """Build regex matching keyword references to issues.
+
+    Regex matches references to the issues of the same
+    repo ("Closes #12") and of the given repos
+    ("Closes org/repo#12"), case-insensitively. It's
+    intended to be searched in a window, ending with
+    an issue reference found with ISSUE_REF_REGEX.
+
+    Args:
+        repo_names (tuple): Tracked repositories names.
+
+    Returns:
+        re.Pattern:
+            Compiled regex with "keyword", "repo"
+            (None for the same repo) and "num" groups.
+        dict: Tracked repos names, indexed by their lower case versions.
+        int: Length of the window to search regex in.
+    """
+    repos = "|".join(
+        re.escape(name) for name in sorted(repo_names, key=len, reverse=True)
+    )
+    regex = re.compile(
+        KEYWORD_REF.format(keywords=KEYWORDS, repos=repos or "(?!)"), re.IGNORECASE
+    )
+    window = max(map(len, repo_names), default=0) + KEYWORD_LENGTH
+    return regex, {name.lower(): name for name in repo_names}, window
+
 
 NUM_REGEX = re.compile(r"""(?P<num>"[\d]+")""")
@@ -0,0 +1,252 @@
+"""Spreadsheet-level storage of the data read from GitHub."""
+import webhooks
+from sheet_builder import SheetBuilder
+from utils import parse_url, try_match_keywords
+
+
+class ReposData(SheetBuilder):
+    """Issues and PRs of all the repositories tracked in a spreadsheet.
+
+    Every repository is read once per update cycle, no matter
+    how many sheets track it. Sheets take issues and PRs of
+    their repositories from this object through ReposDataView
+    instead of reading them from GitHub by themselves.
+
+    Args:
+        spreadsheet_id (str):
+            Id of the spreadsheet. Used to store
+            the last update timestamps.
+    """
+
+    def __init__(self, spreadsheet_id):
+        super().__init__(spreadsheet_id)
+        # issues updated during the last cycle
+        self._cycle_issues = {}
+
+    def update(self, sheets_config):
+        """Read recently updated issues and PRs of all the tracked repos.
+
+        Args:
+            sheets_config (dict): Configurations of all the sheets.
+        """
+        self._cycle_issues = {}
+
+        repo_names = {}
+        priorities = {}
+        # repos tracked by sheets, which don't allow probing
+        no_probe_repos = set()
+        fetch_workers = 1
+        page_workers = 1
+        fetch_engine = "rest"
+        for config in sheets_config.values():
+            repo_names.update(config.get("repo_names", {}))
+            # repo has priority of the most important sheet tracking it
+            for repo_name in config.get("repo_names", {}):
+                priorities[repo_name] = max(
+                    priorities.get(repo_name, 0), config.get("priority", 0)
+                )
+                if not config.get("probe_changes"):
+                    no_probe_repos.add(repo_name)
+            fetch_workers = max(fetch_workers, config.get("fetch_workers", 1))
+            page_workers = max(page_workers, config.get("page_workers", 1))
+            # GraphQL is used if at least one sheet asks for it
+            if config.get("fetch_engine") == "graphql":
+                fetch_engine = "graphql"
+
+        self.reload_config(
+            {
+                "repo_names": repo_names,
+                "fetch_workers": fetch_workers,
+                "page_workers": page_workers,
+                "fetch_engine": fetch_engine,
+            }
+        )
+        self._priorities = priorities
+        self._probe_repos = set(repo_names) - no_probe_repos
+        self._cycle_issues = self.retrieve_updated()
+
+    def apply_events(self, events):
+        """Apply GitHub webhook events to the indexes.
+
+        Issues from the events replace issues updated during
+        the last cycle, so that sheets take only them on update.
+        Events are not applied to the update stamps, so the
+        next polling update re-reads the same changes.
+
+        Args:
+            events (list): (<event name>, <payload>) tuples.
+
+        Returns:
+            set: Names of the repos affected by the events.
+        """
+        self._cycle_issues = {}
+        repo_names = set()
+
+        for event, payload in events:
+            repo_name = payload["repository"]["full_name"]
+            if repo_name not in self._repo_names:
+                continue
+
+            if event == "pull_request":
+                pull = webhooks.pull_from_payload(payload)
+                links = [
+                    (pull.repository.html_url, pull, key_phrase)
+                    for key_phrase in try_match_keywords(pull.body, self._repo_names)
+                ]
+                # body is needed only to find links
+                pull.body = None
+                self.prs_index.merge(repo_name, links)
+            elif "pull_request" in payload["issue"]:
+                # comment on a PR
+                continue
+            elif event == "issues" and payload["action"] in ("deleted", "transferred"):
+                # as with polling, deleted issues are detected on restart
+                continue
+            else:
+                issue = webhooks.issue_from_payload(payload)
+                indexed = self._issues_index.get(issue.html_url)
+                # events can be delivered out of order
+                if indexed is not None and indexed.updated_at > issue.updated_at:
+                    continue
+
+                self._issues_index[issue.html_url] = issue
+                self._cycle_issues[issue.html_url] = issue
+
+            repo_names.add(repo_name)
+
+        return repo_names
+
+    def get_issues(self, repo_names, indexed=False):
+        """Get issues of the given repositories.
+
+        Args:
+            repo_names (Iterable): Repositories names.
+            indexed (bool):
+                If True, return all of the indexed issues
+                of these repos. Otherwise return only issues
+                updated during the last cycle.
+
+        Returns:
+            dict: Issues index in format {issue.html_url: github.Issue.Issue}
+        """
+        repo_names = set(repo_names)
+        source = self._issues_index if indexed else self._cycle_issues
+
+        # restored issues are given only after they were checked
+        return {
+            url: issue
+            for url, issue in source.items()
+            if parse_url(url)[0] in repo_names and url not in self._restored
+        }
+
+
+class ReposDataView:
+    """Issues and PRs of the repositories tracked by a single sheet.
+
+    Takes GitHub data from the spreadsheet repos data
+    instead of reading it by itself, having the same
+    interface as sheet_builder.SheetBuilder.
+
+    Args:
+        sheet_name (str): Name of the sheet.
+        repos_data (ReposData): Spreadsheet-level GitHub data.
+    """
+
+    def __init__(self, sheet_name, repos_data):
+        self._sheet_name = sheet_name
+        self._repos_data = repos_data
+        self._repo_names = ()
+        # repos, which issues were already taken from repos data
+        self._taken_repos = set()
+        # issues of the sheet repos, taken from repos data
+        self._issues_index = {}
+
+        self.prs_index = repos_data.prs_index
+        self.first_update = True
+
+    def retrieve_updated(self):
+        """Take issues of the tracked repos from the spreadsheet repos data.
+
+        All of the indexed issues are taken for the repos
+        which are new for this sheet, and only the last
+        cycle updates - for the others.
+
+        Returns:
+            dict:
+                Issues index in format:
+                {issue.html_url: github.Issue.Issue}
+        """
+        new_repos = set(self._repo_names) - self._taken_repos
+
+        updated_issues = self._repos_data.get_issues(set(self._repo_names) - new_repos)
+        updated_issues.update(self._repos_data.get_issues(new_repos, indexed=True))
+        self._taken_repos.update(new_repos)
+
+        self._issues_index.update(updated_issues)
+        return updated_issues
+
+    def get_from_index(self, issue_id):
+        """Get issue object taken by this sheet.
+
+        Args:
+            issue_id (str): Issue HTML URL.
+
+        Returns:
+            github.Issue.Issue: Issue object from index.
+        """
+        return self._issues_index.get(issue_id)
+
+    def delete_from_index(self, issue_id):
+        """Delete issue from this sheet and the spreadsheet repos data.
+
+        Args:
+            issue_id (str): Issue HTML URL.
+        """
+        self._issues_index.pop(issue_id, None)
+        self._repos_data.delete_from_index(issue_id)
+
+    def read_issue(self, id_):
+        """Read issue by its URL with the spreadsheet repos data.
+
+        Args:
+            id_ (str): Issue HTML URL.
+
+        Returns:
+            github.Issue.Issue: Issue object from GitHub.
+
+        Raises:
+            github.UnknownObjectException: Issue was deleted.
+        """
+        issue = self._repos_data.read_issue(id_)
+        if issue is not None:
+            self._issues_index[issue.html_url] = issue
+        return issue
+
+    def hydrate(self, issue_ids):
+        """Read the given issues in bulk with the spreadsheet repos data.
+
+        Args:
+            issue_ids (Iterable): Issues HTML URLs.
+        """
+        self._repos_data.hydrate(issue_ids)
+
+    def reload_config(self, config):
+        """Update list of the tracked repos.
+
+        Args:
+            config (dict): Dict with sheet configurations.
+        """
+        self._repo_names = tuple(config["repo_names"].keys())
+
+    def get_related_prs(self, issue_id):
+        """Return pull requests of the specified issue.
+
+        Args:
+            issue_id (tuple): Issue number and repo short name.
+
+        Returns:
+            list:
+                All of the pull requests related to the
+                specified issue.
+        """
+        return self.prs_index.get_related_prs(issue_id)
@@ -1,14 +1,22 @@
 """API to control single Google Sheet."""
 import abc
 import datetime
-import string
+import logging
 import github
 import fill_funcs
 import sheet_builder
-from reg_exps import DIGITS_PATTERN
+import sheet_format
+import transport
 from instances import Columns, Row
+from repos_data import ReposDataView
+from sheet_diff import TableDiff, cell_data
 from utils import BatchIterator, get_url_from_formula
 
+# Sheets API recommended max size of a request payload
+MAX_BATCH_BYTES = 2 * 1024 * 1024
+# number of rows in a new sheet
+ROW_COUNT = 1000
+
 
 class BaseSheet(metaclass=abc.ABCMeta):
     """Single sheet base object.
@@ -24,6 +32,8 @@ class BaseSheet(metaclass=abc.ABCMeta):
         self.name = name
         self.ss_id = spreadsheet_id
         self._config = None
+        # fingerprint of the last posted formatting
+        self._format_fingerprint = None
 
     @abc.abstractmethod
     def update(self, ss_resource):
@@ -49,7 +59,7 @@ class BaseSheet(metaclass=abc.ABCMeta):
             "addSheet": {
                 "properties": {
                     "title": self.name,
-                    "gridProperties": {"rowCount": 1000, "columnCount": 26},
+                    "gridProperties": {"rowCount": ROW_COUNT, "columnCount": 26},
                 }
             }
         }
@@ -74,21 +84,18 @@ class BaseSheet(metaclass=abc.ABCMeta):
         """
         self._config = config
 
-    def _read(self, ss_resource):
+    def _read(self, ss_resource, table=None):
         """Read data from this sheet.
 
+        Args:
+            table (list):
+                Sheet values, if they were read with
+                the other sheets of the spreadsheet.
+
         Returns:
             dict: Issues index.
         """
-        table = (
-            ss_resource.values()
-            .get(spreadsheetId=self.ss_id, range=self.name, valueRenderOption="FORMULA")
-            .execute()
-            .get("values")
-        )
-
-        if table is None:  # sheet is completely clear
-            self._format(ss_resource)
+        if table is None:
             table = (
                 ss_resource.values()
                 .get(
@@ -96,10 +103,17 @@ class BaseSheet(metaclass=abc.ABCMeta):
                     range=self.name,
                     valueRenderOption="FORMULA",
                 )
-                .execute()["values"]
+                .execute()
+                .get("values", [])
             )
 
+        if not table:  # sheet is completely clear
+            self._format(ss_resource)
+            table = [self._columns.names]
+
         self._columns = Columns(self._config["columns"], self.id)
+        # rows as they are in the sheet, None if columns were changed
+        self._read_rows = table[1:] if table[0] == self._columns.names else None
         return _build_index(table[1:], table[0])
 
     def _format(self, ss_resource):
@@ -108,45 +122,137 @@ class BaseSheet(metaclass=abc.ABCMeta):
         Create title row in the specified sheet, format columns
         and add data validation according to config module.
         """
-        self._columns = Columns(self._config["columns"], self.id)
+        requests, fingerprint = self._format_requests(ss_resource)
+        requests.insert(0, self._values_request([self._columns.names], 0))
 
-        self._insert(ss_resource, [self._columns.names], "A1")
-        self._post_requests(ss_resource, self._columns.requests)
+        self._post_requests(ss_resource, requests)
+        self._format_fingerprint = fingerprint
 
-    def _insert(self, ss_resource, rows, start_from):
-        """Write new data into this sheet.
+    def _format_requests(self, ss_resource):
+        """Build requests to update sheet structure.
 
-        Args:
-            rows (list):
-                Lists, each of which represents single row.
+        Formatting is built only if it was changed since the
+        last sent one. Conditional format rules are reconciled
+        with the rules existing in the sheet.
 
-            start_from (str):
-                Symbolic index, from which data insertion
-                must start.
+        Returns:
+            list: Columns formatting requests.
+            str:
+                Formatting fingerprint, to be remembered
+                after the requests are posted.
         """
-        start_index = int(DIGITS_PATTERN.findall(start_from)[0])
+        self._columns = Columns(self._config["columns"], self.id)
 
-        sym_range = "{start_from}:{last_sym}{count}".format(
-            start_from=start_from,
-            last_sym=string.ascii_uppercase[len(rows[0]) - 1],
-            count=len(rows) + start_index + 1,
+        requests = self._columns.requests
+        fingerprint = sheet_format.fingerprint(requests + self._columns.rules)
+        if fingerprint == self._format_fingerprint:
+            return [], fingerprint
+
+        logging.info("{name}: formatting changed".format(name=self.name))
+        return (
+            requests
+            + sheet_format.reconcile_rules(
+                self.id, self._read_rules(ss_resource), self._columns.rules
+            ),
+            fingerprint,
         )
-        ss_resource.values().update(
+
+    def _read_rules(self, ss_resource):
+        """Read conditional format rules of this sheet.
+
+        Returns:
+            list: Conditional format rules.
+        """
+        resp = ss_resource.get(
             spreadsheetId=self.ss_id,
-            range=self.name + "!" + sym_range,
-            valueInputOption="USER_ENTERED",
-            body={"values": rows},
+            ranges=self.name,
+            fields="sheets(properties.sheetId,conditionalFormats)",
         ).execute()
 
+        for sheet in resp.get("sheets", []):
+            return sheet.get("conditionalFormats", [])
+        return []
+
+    def _values_request(self, rows, start_row, start_col=0):
+        """Request to write values into this sheet.
+
+        Args:
+            rows (list): Lists, each of which represents single row.
+            start_row (int): Index of the first row to write.
+            start_col (int): Index of the first column to write.
+
+        Returns:
+            dict: Cells updating request.
+        """
+        date_cols = self._date_columns()
+        return {
+            "updateCells": {
+                "start": {
+                    "sheetId": self.id,
+                    "rowIndex": start_row,
+                    "columnIndex": start_col,
+                },
+                "rows": [
+                    {
+                        "values": [
+                            cell_data(value, start_col + index in date_cols)
+                            for index, value in enumerate(row)
+                        ]
+                    }
+                    for row in rows
+                ],
+                "fields": "userEnteredValue",
+            }
+        }
+
+    def _grid_request(self, length):
+        """Request to resize the sheet to fit the whole table.
+
+        Cells updating doesn't add rows into the sheet,
+        so the grid is resized before writing the whole
+        table. An empty row is left at the bottom to
+        insert rows after the last one.
+
+        Args:
+            length (int): Number of rows in the table, including title.
+
+        Returns:
+            dict: Sheet properties updating request.
+        """
+        return {
+            "updateSheetProperties": {
+                "properties": {
+                    "sheetId": self.id,
+                    "gridProperties": {"rowCount": max(ROW_COUNT, length + 1)},
+                },
+                "fields": "gridProperties.rowCount",
+            }
+        }
+
+    def _date_columns(self):
+        """Get indexes of the columns with dates.
+
+        Returns:
+            list: Indexes of the date columns.
+        """
+        return [
+            index
+            for index, col in enumerate(self._config["columns"])
+            if col.get("type") == "date"
+        ]
+
     def _post_requests(self, ss_resource, requests):
         """Post requests with batchUpdate().
 
+        All of the requests are usually posted with a single
+        call. Too big requests lists are split by the size.
+
         Args:
             requests (list):
                 Dicts, each of which represents single request.
         """
         if requests:
-            for batch in BatchIterator(requests):
+            for batch in BatchIterator(requests, max_bytes=MAX_BATCH_BYTES):
                 ss_resource.batchUpdate(
                     spreadsheetId=self.ss_id, body={"requests": batch}
                 ).execute()
@@ -159,11 +265,20 @@ class Sheet(BaseSheet):
         name (str): Sheet name.
         spreadsheet_id (str): Parent spreadsheet id.
         id (int): Numeric sheet id.
+        repos_data (repos_data.ReposData):
+            Spreadsheet-level GitHub data, shared by sheets.
+            If not given, the sheet reads GitHub by itself.
     """
 
-    def __init__(self, name, spreadsheet_id, id_=None):
+    def __init__(self, name, spreadsheet_id, id_=None, repos_data=None):
         super(Sheet, self).__init__(name, spreadsheet_id, id_)
-        self._builder = sheet_builder.SheetBuilder(name)
+        if repos_data is None:
+            self._builder = sheet_builder.SheetBuilder(name)
+        else:
+            self._builder = ReposDataView(name, repos_data)
+        # known colors of the cells: {<column index>: <color>}
+        # per row, None for the rows with unknown colors
+        self._cell_colors = []
 
     def reload_config(self, config):
         """Reload sheet configurations.
@@ -174,27 +289,146 @@ class Sheet(BaseSheet):
         super(Sheet, self).reload_config(config)
         self._builder.reload_config(config)
 
-    def update(self, ss_resource, to_be_archived):
+    def update(self, ss_resource, to_be_archived, table=None):
         """Update specified sheet with issues/PRs data.
 
+        All of the GitHub data is read before filling, so
+        filling functions should not send any requests.
+        Lazy completions of PyGithub objects during filling
+        are logged, or raised, if "strict_completion" is set
+        in the sheet configurations.
+
         Args:
             to_be_archived (dict): Issues to be archived.
+            table (list): Sheet values, if they were already read.
         """
         updated_issues = self._builder.retrieve_updated()
 
-        tracked_issues = self._read(ss_resource)
-        to_be_archived.update(self._merge_tables(tracked_issues, updated_issues))
+        tracked_issues = self._read(ss_resource, table)
+        if self._builder.first_update:
+            self._builder.hydrate(
+                [id_ for id_ in tracked_issues.keys() if id_ not in updated_issues]
+            )
 
-        self._insert_new_issues(tracked_issues, updated_issues)
-        new_table, requests = self._prepare_table(tracked_issues.values())
+        with transport.completion_guard(self._config.get("strict_completion", False)):
+            to_be_archived.update(self._merge_tables(tracked_issues, updated_issues))
+            self._insert_new_issues(tracked_issues, updated_issues)
+
+        new_table, colors = self._prepare_table(tracked_issues.values())
+
+        # all of the changes are posted with a single batch
+        requests, fingerprint = self._format_requests(ss_resource)
+        # columns formatting resets cells colors
+        kept_rows = {}
+        if self._read_rows is None:
+            requests.append(self._grid_request(len(new_table) + 1))
+            requests.append(self._values_request([self._columns.names] + new_table, 0))
+            requests.append(
+                self._clear_request(len(new_table), len(self._columns.names))
+            )
+        else:
+            diff = self._table_diff(new_table)
+            if not requests:
+                kept_rows = diff.kept_rows
+            requests += self._diff_requests(diff)
 
-        self._format(ss_resource)
-        self._insert(ss_resource, new_table, "A2")
+        color_requests, cell_colors = self._color_requests(colors, kept_rows)
 
-        self._clear_bottom(ss_resource, len(tracked_issues), len(self._columns.names))
-        self._post_requests(ss_resource, requests)
+        self._post_requests(ss_resource, requests + color_requests)
+        self._format_fingerprint = fingerprint
+        self._cell_colors = cell_colors
         self._builder.first_update = False
 
+    def _table_diff(self, new_table):
+        """Compare the new table with the one read from the sheet.
+
+        Args:
+            new_table (list): Lists, each of which represents single row.
+
+        Returns:
+            sheet_diff.TableDiff: Changes between the tables.
+        """
+        diff = TableDiff(
+            self._read_rows,
+            new_table,
+            self._columns.names.index("Issue"),
+            len(self._columns.names),
+            self._date_columns(),
+        )
+        logging.info(
+            "{name}: {rows} rows changes, {cells} cells written".format(
+                name=self.name, rows=len(diff.row_changes), cells=diff.changed_cells
+            )
+        )
+        return diff
+
+    def _diff_requests(self, diff):
+        """Build requests to write only the changes between tables.
+
+        Rows of deleted and new issues are deleted and
+        inserted, changed cells are written in rectangles,
+        coalesced from adjacent cells.
+
+        Args:
+            diff (sheet_diff.TableDiff): Changes between the tables.
+
+        Returns:
+            list: Rows inserting/deleting and cells updating requests.
+        """
+        # +1 for the title row
+        return [
+            _gen_dimension_request(self.id, change, start + 1, end + 1)
+            for change, start, end in diff.row_changes
+        ] + [
+            self._values_request(values, row + 1, col)
+            for row, col, values in diff.blocks
+        ]
+
+    def _color_requests(self, colors, kept_rows):
+        """Build requests to color only the changed cells.
+
+        Colors of the cells, which were sent on the previous
+        update, are remembered, and tracked while rows are
+        moved. Cells of new and moved rows are colored anew,
+        and the ones without color are cleared, as inserted
+        rows inherit colors of their neighbors.
+
+        Args:
+            colors (list):
+                {<column index>: <color>} dicts - colors
+                of the new table cells.
+            kept_rows (dict):
+                {<new row index>: <old row index>} - rows
+                left in their places in the sheet.
+
+        Returns:
+            list: Coloring and clearing requests.
+            list: Known colors of the cells after the requests are posted.
+        """
+        previous = []
+        for index in range(len(colors)):
+            old_index = kept_rows.get(index)
+            if old_index is not None and old_index < len(self._cell_colors):
+                previous.append(self._cell_colors[old_index])
+            else:
+                previous.append(None)
+
+        ranges = sheet_format.color_ranges(
+            colors, previous, len(self._columns.names)
+        )
+        logging.info(
+            "{name}: {requests} coloring requests".format(
+                name=self.name, requests=len(ranges)
+            )
+        )
+
+        # +1 for the title row
+        requests = [
+            _gen_color_request(self.id, start + 1, end + 1, col, color)
+            for col, start, end, color in ranges
+        ]
+        return requests, list(colors)
+
     def _merge_tables(self, tracked_issues, updated_issues):
         """Merge new data into the table read from the sheet.
 
@@ -259,19 +493,29 @@ class Sheet(BaseSheet):
         else:
             return self._builder.get_from_index(id_)
 
-    def _clear_bottom(self, ss_resource, length, width):
-        """Clear cells from the last actual row till the end.
+    def _clear_request(self, length, width):
+        """Request to clear cells from the last actual row till the end.
+
+        Values and colors of the cells are cleared.
 
         Args:
             length (int): Length of issues list.
             width (int): Number of columns in range to clear.
+
+        Returns:
+            dict: Cells clearing request.
         """
-        sym_range = "{sheet_name}!A{start_from}:{end}".format(
-            sheet_name=self.name,
-            start_from=length + 2,
-            end=string.ascii_uppercase[width - 1],
-        )
-        ss_resource.values().clear(spreadsheetId=self.ss_id, range=sym_range).execute()
+        return {
+            "updateCells": {
+                "range": {
+                    "sheetId": self.id,
+                    "startRowIndex": length + 1,
+                    "startColumnIndex": 0,
+                    "endColumnIndex": width,
+                },
+                "fields": "userEnteredValue,userEnteredFormat.backgroundColor",
+            }
+        }
 
     def _prepare_table(self, tracked_issues):
         """Convert every Row into list.
@@ -281,23 +525,22 @@ class Sheet(BaseSheet):
 
         Returns:
             list: Lists, each of which represents single row.
-            list: Dicts, each of which represents single coloring request.
+            list: {<column index>: <color>} dicts - colors of the rows cells.
         """
         new_table = list(tracked_issues)
         new_table.sort(key=fill_funcs.sort_func)
-        requests = []
+        colors = []
 
         # convert rows into lists
         for index, row in enumerate(new_table):
             new_table[index] = row.as_list()[: len(self._columns.names)]
-
-            for col, color in row.colors.items():
-                requests.append(
-                    _gen_color_request(
-                        self.id, index + 1, self._columns.names.index(col), color
-                    )
-                )
-        return new_table, requests
+            colors.append(
+                {
+                    self._columns.names.index(col): color
+                    for col, color in row.colors.items()
+                }
+            )
+        return new_table, colors
 
     def _insert_new_issues(self, tracked_issues, new_issues):
         """Insert new issues into tracked issues index.
@@ -337,20 +580,24 @@ class ArchiveSheet(BaseSheet):
         super(ArchiveSheet, self).__init__(name, spreadsheet_id, id_)
         self.is_new = is_new
 
-    def update(self, ss_resource, to_be_archived):
+    def update(self, ss_resource, to_be_archived, table=None):
         """Update sheet with recently archived issues.
 
         Args:
             to_be_archived (dict): Issue rows to be archived.
+            table (list): Sheet values, if they were already read.
         """
-        archived_issues = self._read(ss_resource)
+        archived_issues = self._read(ss_resource, table)
         archived_issues.update(to_be_archived)
 
         new_table = self._prepare_table(archived_issues.values())
 
-        self._format(ss_resource)
-        if new_table:
-            self._insert(ss_resource, new_table, "A2")
+        requests, fingerprint = self._format_requests(ss_resource)
+        requests.append(self._grid_request(len(new_table) + 1))
+        requests.append(self._values_request([self._columns.names] + new_table, 0))
+
+        self._post_requests(ss_resource, requests)
+        self._format_fingerprint = fingerprint
 
     def _prepare_table(self, archived_issues):
         """Prepare table for insertion into the archive sheet.
@@ -396,14 +643,40 @@ def _build_index(table, column_names):
     return issues_index
 
 
-def _gen_color_request(sheet_id, row, column, color):
-    """Request to change color of the specified cell.
+def _gen_dimension_request(sheet_id, change, start, end):
+    """Request to insert or delete rows.
+
+    Args:
+        sheet_id (int): Numeric sheet id.
+        change (str): "insert" or "delete".
+        start (int): Index of the first row.
+        end (int): Index of the row after the last one.
+
+    Returns:
+        dict: Rows inserting or deleting request.
+    """
+    rows_range = {
+        "sheetId": sheet_id,
+        "dimension": "ROWS",
+        "startIndex": start,
+        "endIndex": end,
+    }
+    if change == "delete":
+        return {"deleteDimension": {"range": rows_range}}
+
+    # rows right after the title must not inherit its format
+    return {"insertDimension": {"range": rows_range, "inheritFromBefore": start > 1}}
+
+
+def _gen_color_request(sheet_id, start_row, end_row, column, color):
+    """Request to change color of the specified cells.
 
     Args:
         sheet_id (int): Numeric sheet id.
-        row (int): Number of the row to highlight with color.
+        start_row (int): Number of the first row to highlight with color.
+        end_row (int): Number of the row after the last one to highlight.
         column (int): Number of the column to highlight with color.
-        color (str): Color code.
+        color (str): Color code, None to clear the cells color.
 
     Returns:
         dict: Highlighting request.
@@ -413,8 +686,8 @@ def _gen_color_request(sheet_id, row, column, color):
             "fields": "userEnteredFormat",
             "range": {
                 "sheetId": sheet_id,
-                "startRowIndex": row,
-                "endRowIndex": row + 1,
+                "startRowIndex": start_row,
+                "endRowIndex": end_row,
                 "startColumnIndex": column,
                 "endColumnIndex": column + 1,
             },
@@ -426,4 +699,7 @@ def _gen_color_request(sheet_id, row, column, color):
             },
         }
     }
+    if color is None:
+        request["repeatCell"]["fields"] = "userEnteredFormat.backgroundColor"
+        request["repeatCell"]["cell"] = {"userEnteredFormat": {}}
     return request
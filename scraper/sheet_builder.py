@@ -2,21 +2,33 @@
 Utils for reading data from GitHub and building
 them into convenient structures.
 """
+import concurrent.futures
 import datetime
+import functools
 import logging
 import os.path
 import github
+import graphql_fetch
+import snapshots
+import transport
+from budget import BudgetScheduler
 from pr_index import PullRequestsIndex
 from utils import (
     try_match_keywords,
     parse_url,
     log_progress,
     load_update_stamps,
+    read_ahead,
+    read_pages,
     save_update_stamps,
 )
 
 
 LOGIN_PASS_FILE = "loginpas.txt"
+# GitHub clients with checked credentials: {<login/password>: client}
+_clients = {}
+
+transport.install()
 
 
 class SheetBuilder:
@@ -25,19 +37,52 @@ class SheetBuilder:
     SheetBuilder should be used only for the single one
     specific sheet, meaning all of the repositories set
     to be tracked by this builder, will be shown on this sheet.
+
+    Args:
+        sheet_name (str): Name of the sheet.
     """
 
     def __init__(self, sheet_name):
         self._repos = {}  # repos tracked by this builder
         self._repo_names = ()
         self._sheet_name = sheet_name
+        # number of repos to be fetched in parallel
+        self._fetch_workers = 1
+        # number of pages read in parallel on the first update
+        self._page_workers = 1
+        # API to read repos with: "rest" or "graphql"
+        self._fetch_engine = "rest"
+        self._graphql = None
+        # repos reading priorities and rate limit planning
+        self._priorities = {}
+        self._budget = BudgetScheduler(sheet_name)
+        # issues read with hydrate(), None for deleted ones
+        self._hydrated = {}
+        # repos, which are read only if their events feed changed
+        self._probe_repos = set()
+        # ETags of the repos events feeds, and the
+        # new ones, remembered after reading the repo
+        self._events_etags = load_update_stamps("events_etags", sheet_name)
+        self._new_etags = {}
+        # repos skipped on this update as not changed
+        self._skipped_repos = set()
         # time and id of the issues last updated in the repos
         self._last_issue_updates = load_update_stamps("last_issue_updates", sheet_name)
         # dict in which we aggregate all of the issue objects
-        # used to avoid re-reading unupdated issues from GitHub
-        self._issues_index = {}
-        self._gh_client = self._login_on_github()
+        # used to avoid re-reading unupdated issues from GitHub;
+        # filled with the issues saved on the previous run
+        self._issues_index = {
+            url: snapshots.from_record(record)
+            for url, record in load_update_stamps("issue_snapshots", sheet_name).items()
+        }
+        # issues restored from disk, which could be deleted while
+        # the scraper was stopped; they are checked once their repo
+        # is read, or with hydrate(), if the repo was deferred
+        self._restored = set(self._issues_index)
+        # True, if indexed issues changed since they were saved
+        self._index_changed = False
 
+        self._gh_client = self._login_on_github()
         self.prs_index = PullRequestsIndex(sheet_name)
         self.first_update = True
 
@@ -49,6 +94,23 @@ class SheetBuilder:
         (opened and closed), which were updated since the last
         update, will be processed.
 
+        Repositories are read by a pool of "fetch_workers"
+        (set in the sheet configurations) threads and then
+        merged into indexes in the order of the config.
+        "fetch_engine" configuration sets API to read with.
+        On the first update pages of a repo are read by a
+        pool of "page_workers" threads.
+
+        Repos, which can't be read within the remaining
+        rate limit, are deferred till the next update.
+        Repos with "probe_changes" option are skipped,
+        if their events feed didn't change.
+
+        Indexed issues are saved on disk, so that after
+        restart only recently updated issues are read.
+        Restored issues are checked for existence in bulk,
+        once their repo is read.
+
         Returns:
             dict:
                 Issues index in format:
@@ -56,44 +118,74 @@ class SheetBuilder:
         """
         updated_issues = {}
 
+        if self._fetch_engine == "graphql":
+            fetch = self._fetch_repo_graphql
+            rate_limit = transport.rate_limits.get("graphql")
+            if self._graphql is None:
+                self._graphql = self._login_on_graphql()
+        else:
+            fetch = self._fetch_repo
+            rate_limit = transport.rate_limits.get("core")
+
+        # stamps are initialized for the deferred repos
+        # as well, as their issues can be read one by one
         for repo_name in self._repo_names:
-            repo = self._repos.setdefault(
-                repo_name, self._gh_client.get_repo(repo_name)
+            self._is_first_update(repo_name)
+
+        repo_names = self._budget.plan(self._repo_names, self._priorities, rate_limit)
+
+        self._new_etags = {}
+        self._skipped_repos = set()
+
+        fetch = functools.partial(self._fetch_counted, fetch)
+        if self._fetch_workers > 1:
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=self._fetch_workers
+            ) as executor:
+                fetched = list(executor.map(fetch, repo_names))
+        else:
+            fetched = map(fetch, repo_names)
+
+        read_repos = []
+        # merging in the planned order to keep
+        # results independent of the fetch order
+        for repo_name, result in zip(repo_names, fetched):
+            if result is None:  # rate limit exceeded, failed or not changed
+                if repo_name in self._skipped_repos:
+                    read_repos.append(repo_name)
+                continue
+
+            repo_name, issues, links, last_pr_update, last_issue_update = result
+            self.prs_index.merge(repo_name, links, last_pr_update)
+            updated_issues.update(issues)
+            self._restored.difference_update(issues)
+            self._last_issue_updates[repo_name] = last_issue_update
+            if repo_name in self._new_etags:
+                self._events_etags[repo_name] = self._new_etags[repo_name]
+            read_repos.append(repo_name)
+
+        if self._probe_repos:
+            logging.info(
+                "Change probe: {skipped} of {total} repos were not changed".format(
+                    skipped=len(self._skipped_repos), total=len(repo_names)
+                )
             )
-            self.prs_index.index_closed_prs(repo, self._repo_names)
-
-            is_first_update = self._is_first_update(repo_name)
-
-            logging.info("{repo}: processing issues".format(repo=repo.full_name))
-            issues = repo.get_issues(**self._build_filter(repo_name))
 
-            for ind, issue in enumerate(issues):
-                # "since" filter returns the issue, which was
-                # the last updated in previous filling - skip it
-                if (
-                    issue.updated_at == self._last_issue_updates[repo_name][0]
-                    and issue.html_url == self._last_issue_updates[repo_name][1]
-                ):
-                    continue
-
-                self._process_issue(issue, updated_issues)
-
-                if issue.updated_at > self._last_issue_updates[repo_name][0]:
-                    self._last_issue_updates[repo_name] = (
-                        issue.updated_at,
-                        issue.html_url,
-                    )
-
-                log_progress(is_first_update, issues.totalCount, ind, "issues")
-
-            logging.info("{repo}: issues processed".format(repo=repo.full_name))
+        self._issues_index.update(updated_issues)
+        if updated_issues:
+            self._index_changed = True
+        self._check_restored(read_repos)
 
+        # snapshots are saved before the stamps: if the process dies
+        # in between, updates will be read once again, not lost
+        self._save_snapshots()
         save_update_stamps(
             "last_issue_updates", self._sheet_name, self._last_issue_updates
         )
+        save_update_stamps("events_etags", self._sheet_name, self._events_etags)
         self.prs_index.save_updates()
+        self._budget.save()
 
-        self._issues_index.update(updated_issues)
         return updated_issues
 
     def get_from_index(self, issue_id):
@@ -115,30 +207,83 @@ class SheetBuilder:
         """
         if issue_id in self._issues_index.keys():
             self._issues_index.pop(issue_id)
+            self._index_changed = True
+        self._restored.discard(issue_id)
 
     def read_issue(self, id_):
         """Read issue by its URL.
 
+        Indexed issues and issues read with hydrate()
+        are taken without requests.
+
         Args:
             id_ (str): Issue HTML URL.
 
         Returns:
             github.Issue.Issue: Issue object from GitHub.
+
+        Raises:
+            github.UnknownObjectException: Issue was deleted.
         """
         repo_name, issue_num = parse_url(id_)
-        repo = self._repos.get(repo_name)
-        if not repo:
-            return
-
-        issue = repo.get_issue(int(issue_num))
+        if id_ in self._hydrated:
+            issue = self._hydrated.pop(id_)
+            if issue is None:
+                self._issues_index.pop(id_, None)
+                raise github.UnknownObjectException(404, {"message": "Not Found"})
+        elif id_ in self._issues_index:
+            return self._issues_index[id_]
+        else:
+            if repo_name not in self._repo_names:
+                return
+
+            issue = snapshots.issue_snapshot(
+                self._get_repo(repo_name).get_issue(int(issue_num))
+            )
 
         self._issues_index[issue.html_url] = issue
+        self._index_changed = True
 
         if issue.updated_at > self._last_issue_updates[repo_name][0]:
             self._last_issue_updates[repo_name] = (issue.updated_at, issue.html_url)
 
         return issue
 
+    def hydrate(self, issue_ids):
+        """Read the given issues in bulk.
+
+        Used on the first update to avoid reading tracked
+        issues one by one. Read issues are taken by
+        read_issue() without requests, deleted issues
+        make it raise github.UnknownObjectException.
+        Restored issues of the repos, which were not read
+        yet, are read as well, to detect the ones deleted
+        while the scraper was stopped.
+
+        Args:
+            issue_ids (Iterable): Issues HTML URLs.
+        """
+        ids_by_repo = {}
+        for id_ in issue_ids:
+            if id_ in self._hydrated or (
+                id_ in self._issues_index and id_ not in self._restored
+            ):
+                continue
+
+            repo_name, issue_num = parse_url(id_)
+            if repo_name in self._repo_names:
+                ids_by_repo.setdefault(repo_name, {})[int(issue_num)] = id_
+
+        for repo_name, ids in ids_by_repo.items():
+            logging.info(
+                "{repo}: reading {num} tracked issues".format(
+                    repo=repo_name, num=len(ids)
+                )
+            )
+            for num, issue in self._read_by_numbers(repo_name, ids.keys()).items():
+                self._hydrated[ids[num]] = issue
+            self._restored.difference_update(ids.values())
+
     def reload_config(self, config):
         """Update builder's configurations - list of tracked repos.
 
@@ -146,6 +291,13 @@ class SheetBuilder:
             config (dict): Dict with sheet configurations.
         """
         self._repo_names = tuple(config["repo_names"].keys())
+        self._fetch_workers = config.get("fetch_workers", 1)
+        self._page_workers = config.get("page_workers", 1)
+        self._fetch_engine = config.get("fetch_engine", "rest")
+        self._priorities = dict.fromkeys(self._repo_names, config.get("priority", 0))
+        self._probe_repos = (
+            set(self._repo_names) if config.get("probe_changes") else set()
+        )
 
     def get_related_prs(self, issue_id):
         """Return pull requests of the specified issue.
@@ -160,6 +312,362 @@ class SheetBuilder:
         """
         return self.prs_index.get_related_prs(issue_id)
 
+    def _fetch_counted(self, fetch, repo_name):
+        """Read the repository and record the reading cost.
+
+        If rate limit is exceeded while reading,
+        the repo is deferred till the next update. If
+        reading failed (repo was renamed or deleted,
+        GraphQL errors), the repo is skipped, so
+        that it doesn't break the other repos update.
+
+        Args:
+            fetch (Callable): Function to read the repo with.
+            repo_name (str): Repository name.
+
+        Returns:
+            tuple:
+                Result of the fetch function, None if deferred,
+                failed or skipped as not changed.
+        """
+        start_count = transport.requests_count()
+        try:
+            if not self._probe_changes(repo_name):
+                self._skipped_repos.add(repo_name)
+                return None
+
+            result = fetch(repo_name)
+        except (github.RateLimitExceededException, graphql_fetch.RateLimitError):
+            logging.warning(
+                "{repo}: rate limit exceeded, deferred till the next update".format(
+                    repo=repo_name
+                )
+            )
+            self._budget.defer(repo_name)
+            return None
+        except Exception:
+            logging.exception(
+                "{repo}: reading failed, skipped till the next update".format(
+                    repo=repo_name
+                )
+            )
+            return None
+
+        self._budget.record(repo_name, transport.requests_count() - start_count)
+        return result
+
+    def _probe_changes(self, repo_name):
+        """Check if the repository could be changed since the last update.
+
+        The last event of the repo is requested with the
+        events feed ETag. If there were no new events,
+        GitHub answers with "304 Not Modified", which
+        doesn't consume rate limit.
+
+        Args:
+            repo_name (str): Repository name.
+
+        Returns:
+            bool: False if the repo wasn't changed, True otherwise.
+        """
+        if (
+            repo_name not in self._probe_repos
+            or not self._last_issue_updates[repo_name][1]
+        ):
+            return True
+
+        etag = self._events_etags.get(repo_name)
+        headers, data = self._gh_client._Github__requester.requestJsonAndCheck(
+            "GET",
+            "/repos/{repo}/events".format(repo=repo_name),
+            parameters={"per_page": 1},
+            headers={"If-None-Match": etag} if etag else None,
+        )
+        new_etag = headers.get("etag")
+        # HTTP cache turns "304 Not Modified" into cached response
+        if data is None or (etag and new_etag == etag):
+            return False
+
+        self._new_etags[repo_name] = new_etag
+        return True
+
+    def _fetch_repo(self, repo_name):
+        """Read recently updated issues and PRs of the repository.
+
+        Doesn't change the builder's indexes and update
+        stamps, so several repos can be fetched in parallel.
+
+        Args:
+            repo_name (str): Repository name.
+
+        Returns:
+            tuple:
+                Repository name, updated issues index, fetched
+                PRs links, last PR and last issue update stamps.
+        """
+        issues_index = {}
+
+        repo = self._get_repo(repo_name)
+        links, last_pr_update = self.prs_index.fetch_closed_prs(
+            repo, self._repo_names, self._page_workers
+        )
+
+        last_issue_update = self._last_issue_updates[repo_name]
+        is_first_update = not last_issue_update[1]
+
+        logging.info("{repo}: processing issues".format(repo=repo.full_name))
+        issues = repo.get_issues(**self._build_filter(repo_name))
+
+        # issues number is requested separately, so
+        # it's read only for parallel pages reading
+        total = None
+        if is_first_update and self._page_workers > 1:
+            total = issues.totalCount
+            issues_iter = read_pages(issues, total, self._page_workers)
+        else:
+            # the next page is read while the current one is processed
+            issues_iter = read_ahead(issues)
+
+        for ind, issue in enumerate(issues_iter):
+            # "since" filter returns the issue, which was
+            # the last updated in previous filling - skip it
+            if (
+                issue.updated_at == self._last_issue_updates[repo_name][0]
+                and issue.html_url == self._last_issue_updates[repo_name][1]
+            ):
+                continue
+
+            self._process_issue(issue, issues_index, links)
+
+            if issue.updated_at > last_issue_update[0]:
+                last_issue_update = (issue.updated_at, issue.html_url)
+
+            log_progress(is_first_update, total, ind, "issues")
+
+        logging.info("{repo}: issues processed".format(repo=repo.full_name))
+        return repo_name, issues_index, links, last_pr_update, last_issue_update
+
+    def _fetch_repo_graphql(self, repo_name):
+        """Read recently updated issues and PRs of the repository with GraphQL.
+
+        GraphQL analog of _fetch_repo(). All of the PRs,
+        updated since the last indexation, are read, so
+        PRs are not requested through issues.
+
+        Args:
+            repo_name (str): Repository name.
+
+        Returns:
+            tuple:
+                Repository name, updated issues index, fetched
+                PRs links, last PR and last issue update stamps.
+        """
+        issues_index = {}
+        links = []
+        last_pr_update = None
+        repo_url = "https://github.com/" + repo_name
+
+        logging.info("{repo}: indexing pull requests".format(repo=repo_name))
+        pulls = self._graphql.fetch_pulls(
+            repo_name, self.prs_index.last_update(repo_name)
+        )
+        for pull in read_ahead(pulls):
+            if last_pr_update is None:
+                last_pr_update = pull.updated_at
+
+            for key_phrase in try_match_keywords(pull.body, self._repo_names):
+                links.append((repo_url, pull, key_phrase))
+            # body is needed only to find links
+            pull.body = None
+
+        last_issue_update = self._last_issue_updates[repo_name]
+        since = last_issue_update[0] if last_issue_update[1] else None
+
+        logging.info("{repo}: processing issues".format(repo=repo_name))
+        for issue in read_ahead(self._graphql.fetch_issues(repo_name, since)):
+            if (
+                issue.updated_at == self._last_issue_updates[repo_name][0]
+                and issue.html_url == self._last_issue_updates[repo_name][1]
+            ):
+                continue
+
+            issues_index[issue.html_url] = issue
+
+            if issue.updated_at > last_issue_update[0]:
+                last_issue_update = (issue.updated_at, issue.html_url)
+
+        logging.info("{repo}: issues processed".format(repo=repo_name))
+        return repo_name, issues_index, links, last_pr_update, last_issue_update
+
+    def _check_restored(self, repo_names):
+        """Check issues restored from disk for existence.
+
+        Restored issues of every read repo are requested in
+        bulk once. Existing issues are updated in the index,
+        deleted ones are dropped from it.
+
+        Args:
+            repo_names (Iterable): Names of the repos read on this update.
+        """
+        # issues of the repos, which are not tracked anymore, are not checked
+        self._restored = {
+            url for url in self._restored if parse_url(url)[0] in self._repo_names
+        }
+
+        ids_by_repo = {}
+        for id_ in self._restored:
+            repo_name, issue_num = parse_url(id_)
+            if repo_name in repo_names:
+                ids_by_repo.setdefault(repo_name, {})[int(issue_num)] = id_
+
+        for repo_name, ids in ids_by_repo.items():
+            logging.info(
+                "{repo}: checking {num} restored issues".format(
+                    repo=repo_name, num=len(ids)
+                )
+            )
+            try:
+                issues = self._read_by_numbers(repo_name, ids.keys())
+            except Exception:
+                logging.exception(
+                    "{repo}: restored issues check failed".format(repo=repo_name)
+                )
+                continue
+
+            for num, issue in issues.items():
+                if issue is None:
+                    self._issues_index.pop(ids[num], None)
+                    # to be taken by read_issue() without requests
+                    self._hydrated[ids[num]] = None
+                else:
+                    self._issues_index[ids[num]] = issue
+
+            self._restored.difference_update(ids.values())
+            self._index_changed = True
+
+    def _read_by_numbers(self, repo_name, numbers):
+        """Read the specified issues of the repository in bulk.
+
+        Args:
+            repo_name (str): Repository full name.
+            numbers (Iterable): Numbers of the issues to read.
+
+        Returns:
+            dict:
+                Index in format {<number>: snapshots.IssueSnapshot}.
+                Deleted (and transferred) issues have None value.
+        """
+        if self._fetch_engine == "graphql":
+            issues = self._graphql.fetch_issues_by_numbers(repo_name, numbers)
+        else:
+            issues = self._read_issues_by_numbers(self._get_repo(repo_name), numbers)
+
+        return {
+            num: issue and snapshots.issue_snapshot(issue)
+            for num, issue in issues.items()
+        }
+
+    def _save_snapshots(self):
+        """Save indexed issues of the tracked repos on disk.
+
+        Issues are saved only if they changed since the last saving.
+        """
+        if not self._index_changed:
+            return
+
+        save_update_stamps(
+            "issue_snapshots",
+            self._sheet_name,
+            {
+                url: snapshots.to_record(issue)
+                for url, issue in self._issues_index.items()
+                if parse_url(url)[0] in self._repo_names
+            },
+        )
+        self._index_changed = False
+
+    def _get_repo(self, repo_name):
+        """Get repository object, requesting it only once.
+
+        Args:
+            repo_name (str): Repository full name.
+
+        Returns:
+            github.Repository.Repository: Repository object.
+        """
+        repo = self._repos.get(repo_name)
+        if repo is None:
+            repo = self._repos[repo_name] = self._gh_client.get_repo(repo_name)
+        return repo
+
+    def _read_issues_by_numbers(self, repo, numbers):
+        """Read the specified issues of the repository with REST API.
+
+        If it's cheaper, issues are read by listing all of the
+        repo issues from the newest till the oldest specified
+        one. Otherwise every issue is requested separately.
+        Listing starts from the newest issue of the repo, so
+        its number is requested to estimate the listing cost.
+
+        Args:
+            repo (github.Repository.Repository): Repository object.
+            numbers (Iterable): Numbers of the issues to read.
+
+        Returns:
+            dict:
+                Index in format {<number>: github.Issue.Issue}.
+                Deleted (and transferred) issues have None value.
+        """
+        issues = dict.fromkeys(numbers)
+        min_num = min(issues)
+        per_page = self._gh_client.per_page
+
+        # listing can't be cheaper than reading issues separately
+        is_listing = (max(issues) - min_num) / per_page + 1 < len(issues)
+        if is_listing:
+            # +1 for the request of the newest issue number
+            pages_num = (self._newest_issue_number(repo) - min_num) / per_page + 2
+            is_listing = pages_num < len(issues)
+
+        if is_listing:
+            missing = set(issues)
+            for issue in repo.get_issues(state="all", sort="created", direction="desc"):
+                if issue.number in missing:
+                    issues[issue.number] = issue
+                    missing.discard(issue.number)
+
+                if not missing or issue.number <= min_num:
+                    break
+        else:
+            for num in issues:
+                try:
+                    issues[num] = repo.get_issue(num)
+                except github.UnknownObjectException:
+                    pass
+
+        return issues
+
+    def _newest_issue_number(self, repo):
+        """Request number of the newest issue (or PR) of the repository.
+
+        Args:
+            repo (github.Repository.Repository): Repository object.
+
+        Returns:
+            int: Number of the newest issue, 0 if there are no issues.
+        """
+        _, data = self._gh_client._Github__requester.requestJsonAndCheck(
+            "GET",
+            repo.url + "/issues",
+            parameters={
+                "state": "all",
+                "sort": "created",
+                "direction": "desc",
+                "per_page": 1,
+            },
+        )
+        return data[0]["number"] if data else 0
+
     def _is_first_update(self, repo_name):
         """Check if the is the first repo update.
 
@@ -207,12 +715,22 @@ class SheetBuilder:
         Returns:
             github.MainClass.Github: Client object authenticated on GitHub.
         """
+        if transport.token_pool is not None:
+            # requests are signed with the pool tokens
+            return github.Github()
+
         if not os.path.exists(LOGIN_PASS_FILE):
             self._ask_credentials()
 
         with open(LOGIN_PASS_FILE) as login_file:
-            login, password = login_file.read().strip().split("/")
+            credentials = login_file.read().strip()
 
+        # credentials are checked once for all of the sheets
+        client = _clients.get(credentials)
+        if client is not None:
+            return client
+
+        login, password = credentials.split("/")
         client = github.Github(login, password)
         # check credentials with a simple read request
         try:
@@ -220,10 +738,29 @@ class SheetBuilder:
         except github.BadCredentialsException:
             print("Incorrect credentials exception occurred!")
             self._ask_credentials()
-            client = self._login_on_github()
+            return self._login_on_github()
 
+        _clients[credentials] = client
         return client
 
+    def _login_on_graphql(self):
+        """Build GitHub GraphQL API fetcher.
+
+        GraphQL API requires token authentication, so
+        personal access token should be used as a password.
+
+        Returns:
+            graphql_fetch.GraphQLFetcher: Fetcher authenticated on GitHub.
+        """
+        if transport.token_pool is not None:
+            # queries are signed with the pool tokens
+            return graphql_fetch.GraphQLFetcher(graphql_fetch.HTTPTransport())
+
+        with open(LOGIN_PASS_FILE) as login_file:
+            token = login_file.read().strip().split("/")[1]
+
+        return graphql_fetch.GraphQLFetcher(graphql_fetch.HTTPTransport(token))
+
     def _ask_credentials(self):
         """Ask user for GitHub login and password.
 
@@ -237,19 +774,26 @@ class SheetBuilder:
         with open(LOGIN_PASS_FILE, "w") as login_file:
             login_file.write(login + "/" + password)
 
-    def _process_issue(self, issue, updated_issues):
-        """If issue is PR, indexate it. Add into updated index otherwise.
+    def _process_issue(self, issue, updated_issues, links):
+        """If issue is PR, add it into PRs links. Add into updated index otherwise.
 
         Args:
             issue (github.Issue.Issue): Issue object.
             updated_issues (dict): Updated issues index.
+            links (list): PRs links to be merged into PRs index.
         """
-        if issue.pull_request is None:
-            updated_issues[issue.html_url] = issue
+        # "pull_request" is absent from the payloads of plain
+        # issues, and reading it completes the issue with a request
+        if "/pull/" not in issue.html_url:
+            updated_issues[issue.html_url] = snapshots.issue_snapshot(issue)
+            return
+
+        # closed PRs are indexed with fetch_closed_prs()
+        if issue.state != "open":
             return
 
-        # issue is pull request - indexate it
+        # issue is open pull request - indexate it
+        pull = None
         for key_phrase in try_match_keywords(issue.body, self._repo_names):
-            self.prs_index.add(
-                issue.repository.html_url, issue.as_pull_request(), key_phrase
-            )
+            pull = pull or snapshots.issue_pull_snapshot(issue)
+            links.append((pull.repository.html_url, pull, key_phrase))
@@ -0,0 +1,259 @@
+"""
+Diff of the sheet tables.
+
+The table prepared for a sheet is compared with the table
+read from it, so that only the changed cells are written,
+and rows are inserted and deleted instead of rewriting
+all of the rows below the changed one.
+"""
+import datetime
+import difflib
+from utils import get_url_from_formula
+
+# day zero of the Google Sheets dates serial numbers
+SERIAL_ZERO = datetime.datetime(1899, 12, 30)
+# format of the dates, written by filling functions
+DATE_FORMAT = "%d %b %Y"
+
+
+class TableDiff:
+    """Changes to turn the table read from a sheet into the new one.
+
+    Rows are matched by issue URLs. Row indexes are counted
+    from the first row after the title row.
+
+    Args:
+        old_rows (list): Lists, each of which represents a read row.
+        new_rows (list): Lists, each of which represents a new row.
+        key_column (int): Index of the "Issue" column.
+        width (int): Number of columns.
+        date_columns (Iterable): Indexes of the columns with dates.
+
+    Attributes:
+        row_changes (list):
+            ("delete"|"insert", <start>, <end>) tuples. Each change
+            is made in the table left by the previous ones.
+        blocks (list):
+            (<row>, <column>, <values>) tuples - rectangles of
+            changed cells in the table left by the row changes.
+        kept_rows (dict):
+            {<new row index>: <old row index>} - rows,
+            which are not moved by the row changes.
+    """
+
+    def __init__(self, old_rows, new_rows, key_column, width, date_columns=()):
+        self._key_column = key_column
+        self._width = width
+        self._date_columns = frozenset(date_columns)
+
+        self.row_changes = []
+        self.blocks = []
+        self.kept_rows = {}
+
+        self._diff(old_rows, new_rows)
+
+    @property
+    def changed_cells(self):
+        """Number of cells to be written."""
+        return sum(len(values) * len(values[0]) for _, _, values in self.blocks)
+
+    def _diff(self, old_rows, new_rows):
+        """Compare the tables row by row and cell by cell.
+
+        Args:
+            old_rows (list): Read rows.
+            new_rows (list): New rows.
+        """
+        matcher = difflib.SequenceMatcher(
+            None,
+            [self._key(row) for row in old_rows],
+            [self._key(row) for row in new_rows],
+            autojunk=False,
+        )
+        opcodes = matcher.get_opcodes()
+
+        # changes are made from the bottom, so that
+        # indexes of the upper rows are not shifted
+        for tag, old_start, old_end, new_start, new_end in reversed(opcodes):
+            if tag in ("delete", "replace"):
+                self.row_changes.append(("delete", old_start, old_end))
+            if tag in ("insert", "replace"):
+                self.row_changes.append(
+                    ("insert", old_start, old_start + new_end - new_start)
+                )
+
+        # read rows at the positions of the new ones
+        old_at = [()] * len(new_rows)
+        for tag, old_start, old_end, new_start, _ in opcodes:
+            if tag == "equal":
+                old_at[new_start : new_start + old_end - old_start] = old_rows[
+                    old_start:old_end
+                ]
+                for shift in range(old_end - old_start):
+                    self.kept_rows[new_start + shift] = old_start + shift
+
+        spans = []
+        for index, row in enumerate(new_rows):
+            span = self._changed_span(old_at[index], row)
+            if span is not None:
+                spans.append((index, span))
+
+        self._coalesce(spans, new_rows)
+
+    def _key(self, row):
+        """Get row key - issue URL.
+
+        Args:
+            row (list): Row cells.
+
+        Returns:
+            str: Issue URL, empty string for rows without issue.
+        """
+        if len(row) > self._key_column and row[self._key_column]:
+            return get_url_from_formula(str(row[self._key_column]))
+        return ""
+
+    def _changed_span(self, old_row, new_row):
+        """Designate the changed part of the row.
+
+        Args:
+            old_row (list): Read row cells.
+            new_row (list): New row cells.
+
+        Returns:
+            tuple: First and last changed columns, None if nothing changed.
+        """
+        first = last = None
+        for col in range(self._width):
+            old = old_row[col] if col < len(old_row) else ""
+            new = new_row[col] if col < len(new_row) else ""
+            if old == new:
+                continue
+
+            is_date = col in self._date_columns
+            if normalize(old, is_date) != normalize(new, is_date):
+                if first is None:
+                    first = col
+                last = col
+
+        if first is None:
+            return None
+        return first, last
+
+    def _coalesce(self, spans, new_rows):
+        """Merge equal changed spans of the adjacent rows into blocks.
+
+        Args:
+            spans (list): (<row index>, (<first col>, <last col>)) tuples.
+            new_rows (list): New rows.
+        """
+        block = None  # [<first row>, <last row>, <span>]
+        for index, span in spans:
+            if block is not None and index == block[1] + 1 and span == block[2]:
+                block[1] = index
+                continue
+
+            self._add_block(block, new_rows)
+            block = [index, index, span]
+
+        self._add_block(block, new_rows)
+
+    def _add_block(self, block, new_rows):
+        """Add block of the changed cells with their new values.
+
+        Args:
+            block (list): First and last rows and the changed columns span.
+            new_rows (list): New rows.
+        """
+        if block is None:
+            return
+
+        first_row, last_row, (first_col, last_col) = block
+        values = [
+            _pad(new_rows[row], self._width)[first_col : last_col + 1]
+            for row in range(first_row, last_row + 1)
+        ]
+        self.blocks.append((first_row, first_col, values))
+
+
+def normalize(value, is_date=False):
+    """Convert cell value into the form it's read from a sheet.
+
+    Values are written with "USER_ENTERED" option,
+    so numbers and dates, written as strings, are read
+    as numbers (dates - as serial numbers).
+
+    Args:
+        value (Any): Cell value.
+        is_date (bool): The cell is in a date column.
+
+    Returns:
+        str: Normalized value.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+    if is_date:
+        try:
+            date = datetime.datetime.strptime(value, DATE_FORMAT)
+            return str((date - SERIAL_ZERO).days)
+        except ValueError:
+            return value
+
+    if value[:1].isdigit():
+        try:
+            return normalize(float(value))
+        except ValueError:
+            pass
+    return value
+
+
+def cell_data(value, is_date=False):
+    """Build Sheets API cell data with the value.
+
+    Values are typed the way "USER_ENTERED" input option
+    does it: formulas, numbers and dates (as serial
+    numbers) are recognized in strings.
+
+    Args:
+        value (Any): Cell value.
+        is_date (bool): The cell is in a date column.
+
+    Returns:
+        dict: Cell data, empty for empty values.
+    """
+    if value is None or value == "":
+        return {}
+    if isinstance(value, bool):
+        return {"userEnteredValue": {"boolValue": value}}
+    if isinstance(value, (int, float)):
+        return {"userEnteredValue": {"numberValue": value}}
+    if value.startswith("="):
+        return {"userEnteredValue": {"formulaValue": value}}
+
+    normalized = normalize(value, is_date)
+    if normalized != value or value.isdigit():
+        try:
+            return {"userEnteredValue": {"numberValue": float(normalized)}}
+        except ValueError:
+            pass
+    return {"userEnteredValue": {"stringValue": value}}
+
+
+def _pad(row, width):
+    """Pad the row with empty cells to the given width.
+
+    Args:
+        row (list): Row cells.
+        width (int): Number of columns.
+
+    Returns:
+        list: Row of the given width.
+    """
+    if len(row) >= width:
+        return row
+    return list(row) + [""] * (width - len(row))
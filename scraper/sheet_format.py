@@ -0,0 +1,139 @@
+"""
+Formatting of the sheets.
+
+Columns formatting is sent only when it was changed in
+the configurations: requests are fingerprinted, and the
+fingerprint is compared with the one of the last sent
+formatting. Conditional format rules are not replaced
+by new requests, but added to the sheet, so they are
+reconciled with the rules existing in the sheet.
+"""
+import hashlib
+import json
+
+# fields of a grid range, which identify it
+RANGE_FIELDS = (
+    "sheetId",
+    "startRowIndex",
+    "endRowIndex",
+    "startColumnIndex",
+    "endColumnIndex",
+)
+
+
+def fingerprint(requests):
+    """Build fingerprint of formatting requests.
+
+    Args:
+        requests (list): Formatting requests.
+
+    Returns:
+        str: Requests hash.
+    """
+    dump = json.dumps(requests, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha1(dump.encode()).hexdigest()
+
+
+def reconcile_rules(sheet_id, existing, desired):
+    """Build requests to turn existing conditional rules into desired ones.
+
+    Rules, which are not desired, and duplicates of the
+    desired rules are deleted, missing rules are added.
+
+    Args:
+        sheet_id (int): Numeric sheet id.
+        existing (list): Conditional format rules read from the sheet.
+        desired (list): Conditional format rules from the configurations.
+
+    Returns:
+        list: Rules deleting and adding requests.
+    """
+    missing = {}
+    for rule in desired:
+        missing.setdefault(_rule_key(rule), rule)
+
+    to_delete = []
+    for index, rule in enumerate(existing):
+        if missing.pop(_rule_key(rule), None) is None:
+            to_delete.append(index)
+
+    # deleting from the end, so that indexes are not shifted
+    requests = [
+        {"deleteConditionalFormatRule": {"sheetId": sheet_id, "index": index}}
+        for index in reversed(to_delete)
+    ]
+    for rule in missing.values():
+        requests.append({"addConditionalFormatRule": {"rule": rule}})
+
+    return requests
+
+
+def _rule_key(rule):
+    """Build key to compare conditional format rules.
+
+    Sheets API returns rules in a normalized form: zero
+    color components are omitted, colors are duplicated
+    in color styles. The key takes only the fields, set
+    by the configurations.
+
+    Args:
+        rule (dict): Conditional format rule.
+
+    Returns:
+        str: Rule key.
+    """
+    if "booleanRule" not in rule:
+        return fingerprint(rule)
+
+    color = rule["booleanRule"].get("format", {}).get("backgroundColor", {})
+    return fingerprint(
+        {
+            "ranges": [
+                {field: range_.get(field) for field in RANGE_FIELDS}
+                for range_ in rule.get("ranges", [])
+            ],
+            "condition": rule["booleanRule"].get("condition"),
+            "color": [
+                round(color.get(name, 0), 3) for name in ("red", "green", "blue")
+            ],
+        }
+    )
+
+
+def color_ranges(colors, previous, width):
+    """Build ranges of the cells, which colors were changed.
+
+    Adjacent changed cells of a column with the
+    same color are merged into a single range.
+    Cells, which lost their color, are included
+    into ranges with None color to be cleared.
+
+    Args:
+        colors (list):
+            {<column index>: <color>} dicts - colors of the rows cells.
+        previous (list):
+            {<column index>: <color>} dicts - known colors of the
+            cells in the sheet, None for the rows, which colors are
+            unknown. Cells of such rows are considered changed.
+        width (int): Number of columns in the table.
+
+    Returns:
+        list: (<column>, <first row>, <row after the last>, <color>) tuples.
+    """
+    ranges = []
+    for col in range(width):
+        range_ = None
+        for index, row in enumerate(colors):
+            color = row.get(col)
+            if previous[index] is not None and previous[index].get(col) == color:
+                range_ = None
+                continue
+
+            if range_ is not None and range_[3] == color:
+                range_[2] = index + 1
+                continue
+
+            range_ = [col, index, index + 1, color]
+            ranges.append(range_)
+
+    return [tuple(range_) for range_ in ranges]
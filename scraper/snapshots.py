@@ -0,0 +1,401 @@
+"""
+Lightweight issue and PR objects.
+
+They have the same attributes, which filling functions
+and Scraper use on github.Issue.Issue and
+github.PullRequest.PullRequest objects.
+
+Snapshots are slotted, and labels, users and repositories
+are shared between them, so that indexes with thousands
+of issues take as little memory as possible.
+"""
+import datetime
+import functools
+import sys
+
+
+class Label:
+    """Issue label.
+
+    Args:
+        name (str): Label name.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class User:
+    """GitHub user.
+
+    Args:
+        login (str): User login.
+    """
+
+    __slots__ = ("login",)
+
+    def __init__(self, login):
+        self.login = login
+
+
+class Repository:
+    """Repository of an issue.
+
+    Args:
+        full_name (str): Repository full name.
+    """
+
+    __slots__ = ("full_name",)
+
+    def __init__(self, full_name):
+        self.full_name = full_name
+
+    @property
+    def html_url(self):
+        """Repository URL."""
+        return "https://github.com/" + self.full_name
+
+
+class IssueSnapshot:
+    """Issue data, read from GitHub.
+
+    Args:
+        repo_name (str): Repository full name.
+        number (int): Issue number.
+        title (str): Issue title.
+        body (str): Issue body.
+        state (str): "open" or "closed".
+        labels (list): Labels names.
+        assignees (list): Assignees logins.
+        created_at (datetime.datetime): Creation time.
+        updated_at (datetime.datetime): Last update time.
+        closed_at (datetime.datetime): Closing time, None for open issues.
+    """
+
+    __slots__ = (
+        "repository",
+        "number",
+        "title",
+        "body",
+        "state",
+        "labels",
+        "assignees",
+        "created_at",
+        "updated_at",
+        "closed_at",
+    )
+
+    pull_request = None
+
+    def __init__(
+        self,
+        repo_name,
+        number,
+        title,
+        body,
+        state,
+        labels,
+        assignees,
+        created_at,
+        updated_at,
+        closed_at,
+    ):
+        self.repository = _repository(repo_name)
+        self.number = number
+        self.title = title
+        self.body = body
+        self.state = sys.intern(state)
+        self.labels = tuple(_label(name) for name in labels)
+        self.assignees = tuple(_user(login) for login in assignees)
+        self.created_at = created_at
+        self.updated_at = updated_at
+        self.closed_at = closed_at
+
+    @property
+    def html_url(self):
+        """Issue URL."""
+        return "{repo}/issues/{num}".format(
+            repo=self.repository.html_url, num=self.number
+        )
+
+
+class PullSnapshot:
+    """Pull request data, read from GitHub.
+
+    Args:
+        repo_name (str): Repository full name.
+        number (int): PR number.
+        body (str): PR body.
+        state (str): "open" or "closed".
+        merged (bool): True if PR was merged.
+        user (str): Author login.
+        created_at (datetime.datetime): Creation time.
+        updated_at (datetime.datetime): Last update time.
+    """
+
+    __slots__ = (
+        "repository",
+        "number",
+        "body",
+        "state",
+        "merged",
+        "user",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(
+        self, repo_name, number, body, state, merged, user, created_at, updated_at
+    ):
+        self.repository = _repository(repo_name)
+        self.number = number
+        self.body = body
+        self.state = sys.intern(state)
+        self.merged = merged
+        self.user = _user(user)
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @property
+    def html_url(self):
+        """PR URL."""
+        return "{repo}/pull/{num}".format(
+            repo=self.repository.html_url, num=self.number
+        )
+
+
+def issue_snapshot(issue):
+    """Build snapshot of the issue read from GitHub.
+
+    Issue body is not kept, as Scraper doesn't use it.
+
+    Args:
+        issue (github.Issue.Issue): Issue object.
+
+    Returns:
+        IssueSnapshot: Issue snapshot.
+    """
+    if isinstance(issue, IssueSnapshot):
+        return issue
+
+    return IssueSnapshot(
+        _repo_name(issue.html_url),
+        issue.number,
+        issue.title,
+        None,
+        issue.state,
+        [label.name for label in issue.labels],
+        [user.login for user in issue.assignees],
+        issue.created_at,
+        issue.updated_at,
+        issue.closed_at,
+    )
+
+
+def pull_snapshot(pull):
+    """Build snapshot of the pull request read from GitHub.
+
+    PR body is not kept, as it's used only on PR indexing.
+
+    Args:
+        pull (github.PullRequest.PullRequest): Pull request object.
+
+    Returns:
+        PullSnapshot: Pull request snapshot.
+    """
+    if isinstance(pull, PullSnapshot):
+        if pull.body is None:
+            return pull
+
+        # the given snapshot is not changed,
+        # as its owner can still use the body
+        return PullSnapshot(
+            pull.repository.full_name,
+            pull.number,
+            None,
+            pull.state,
+            pull.merged,
+            pull.user.login,
+            pull.created_at,
+            pull.updated_at,
+        )
+
+    return PullSnapshot(
+        _repo_name(pull.html_url),
+        pull.number,
+        None,
+        pull.state,
+        # "merged" attribute isn't included into PRs
+        # list, and reading it costs a request per PR
+        pull.merged_at is not None,
+        pull.user.login,
+        pull.created_at,
+        pull.updated_at,
+    )
+
+
+def issue_pull_snapshot(issue):
+    """Build snapshot of the open pull request from its issue.
+
+    Issues list includes PRs, and reading them with
+    as_pull_request() costs a request per PR.
+
+    Args:
+        issue (github.Issue.Issue): Issue object of an open PR.
+
+    Returns:
+        PullSnapshot: Pull request snapshot.
+    """
+    return PullSnapshot(
+        _repo_name(issue.html_url),
+        issue.number,
+        None,
+        issue.state,
+        False,
+        issue.user.login,
+        issue.created_at,
+        issue.updated_at,
+    )
+
+
+def to_record(issue):
+    """Convert issue into a compact record to be saved on disk.
+
+    Only the data used by filling functions is kept.
+
+    Args:
+        issue (github.Issue.Issue | IssueSnapshot): Issue object.
+
+    Returns:
+        tuple: Issue record.
+    """
+    return (
+        issue.repository.full_name,
+        issue.number,
+        issue.title,
+        issue.state,
+        tuple(label.name for label in issue.labels),
+        tuple(user.login for user in issue.assignees),
+        issue.created_at,
+        issue.updated_at,
+        issue.closed_at,
+    )
+
+
+def from_record(record):
+    """Build issue snapshot from the record saved on disk.
+
+    Args:
+        record (tuple): Issue record, built with to_record().
+
+    Returns:
+        IssueSnapshot: Issue object without body.
+    """
+    (
+        repo_name,
+        number,
+        title,
+        state,
+        labels,
+        assignees,
+        created_at,
+        updated_at,
+        closed_at,
+    ) = record
+    return IssueSnapshot(
+        repo_name,
+        number,
+        title,
+        None,
+        state,
+        labels,
+        assignees,
+        created_at,
+        updated_at,
+        closed_at,
+    )
+
+
+def pull_to_record(pull):
+    """Convert pull request into a compact record to be saved on disk.
+
+    Args:
+        pull (github.PullRequest.PullRequest | PullSnapshot): PR object.
+
+    Returns:
+        tuple: Pull request record.
+    """
+    pull = pull_snapshot(pull)
+    return (
+        pull.repository.full_name,
+        pull.number,
+        pull.state,
+        pull.merged,
+        pull.user.login,
+        pull.created_at,
+        pull.updated_at,
+    )
+
+
+def pull_from_record(record):
+    """Build pull request snapshot from the record saved on disk.
+
+    Args:
+        record (tuple): PR record, built with pull_to_record().
+
+    Returns:
+        PullSnapshot: Pull request object without body.
+    """
+    repo_name, number, state, merged, user, created_at, updated_at = record
+    return PullSnapshot(
+        repo_name, number, None, state, merged, user, created_at, updated_at
+    )
+
+
+def to_datetime(value):
+    """Convert GitHub ISO-8601 time string into datetime.
+
+    PyGithub represents time in UTC without time zone,
+    so the result of this function is naive as well.
+
+    Args:
+        value (str): ISO-8601 time string.
+
+    Returns:
+        datetime.datetime: Converted time, None for None.
+    """
+    if value is None:
+        return None
+    return datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+
+
+def _repo_name(url):
+    """Get repository full name from issue/PR URL.
+
+    Args:
+        url (str): Issue or PR HTML URL.
+
+    Returns:
+        str: Repository full name.
+    """
+    return "/".join(url.split("/")[3:5])
+
+
+@functools.lru_cache(maxsize=None)
+def _repository(full_name):
+    """Get shared repository object."""
+    return Repository(sys.intern(full_name))
+
+
+@functools.lru_cache(maxsize=None)
+def _label(name):
+    """Get shared label object."""
+    return Label(sys.intern(name))
+
+
+@functools.lru_cache(maxsize=None)
+def _user(login):
+    """Get shared user object."""
+    return User(sys.intern(login))
@@ -3,7 +3,14 @@ import importlib
 import logging
 import os.path
 import auth
+import quota
+import throttle
+import transport
+from http_cache import HTTPCache
+from repos_data import ReposData
 from sheet import Sheet, ArchiveSheet
+from token_pool import build_pool
+from webhooks import WebhookReceiver
 
 
 logging.basicConfig(
@@ -35,8 +42,21 @@ class Spreadsheet:
         self._archive = None
         self._to_be_archived = {}
 
-        self._ss_resource = auth.authenticate()
+        if getattr(config, "HTTP_CACHE", None):
+            transport.install(HTTPCache(**config.HTTP_CACHE))
+
+        if getattr(config, "GITHUB_TOKENS", None):
+            transport.install(tokens=build_pool(**config.GITHUB_TOKENS))
+
+        self._ss_resource = auth.authenticate(getattr(config, "SHEETS_QUOTA", None))
         self._id = id_ or self._create()
+        self._repos_data = ReposData(self._id)
+
+        self._webhooks = None
+        if getattr(config, "WEBHOOKS", None):
+            self._webhooks = WebhookReceiver(**config.WEBHOOKS)
+            self._webhooks.start()
+
         self.sheets = self._init_existing_sheets()
         if self._config.ARCHIVE_SHEET and not self._archive:
             self._archive = ArchiveSheet(
@@ -101,24 +121,73 @@ class Spreadsheet:
             logging.exception("Exception occured:")
 
     def update_all_sheets(self):
-        """Update all the sheets one by one."""
+        """Update all the sheets one by one.
+
+        GitHub data of all the sheets is read beforehand, so
+        every repository is requested only once per update.
+        """
+        logging.info("Reading repositories")
+        try:
+            self._repos_data.update(self._config.SHEETS)
+            logging.info("Repositories read")
+
+            if transport.cache is not None:
+                logging.info(
+                    "HTTP cache: {hits} hits, {misses} misses, "
+                    "{evictions} evictions".format(**transport.cache.stats())
+                )
+        except Exception:
+            logging.exception("Exception occured:")
+
+        tables = self._read_sheets()
         for sheet_name, sheet in self.sheets.items():
-            logging.info("Updating sheet " + sheet_name)
-            try:
-                sheet.update(self._ss_resource, self._to_be_archived)
-                logging.info("Updated sheet " + sheet_name)
-            except Exception:
-                logging.exception("Exception occured:")
+            self._update_sheet(sheet_name, sheet, tables.get(sheet_name))
 
         if self._archive:
             logging.info("Updating archive")
             try:
-                self._archive.update(self._ss_resource, self._to_be_archived)
+                self._archive.update(
+                    self._ss_resource,
+                    self._to_be_archived,
+                    tables.get(self._archive.name),
+                )
                 self._to_be_archived = {}
             except Exception:
                 logging.exception("Exception occured:")
             logging.info("Archive updated")
 
+        for api, metrics in throttle.metrics().items():
+            logging.info(
+                "{api} API: concurrency limit {limit}, {calls} calls, "
+                "{throttles} throttled".format(api=api, **metrics)
+            )
+        logging.info(
+            "Sheets API quota: waited {waited:.1f} s".format(
+                waited=quota.sheets_governor.waited
+            )
+        )
+
+    def update_dirty_sheets(self):
+        """Update sheets affected by the received webhook events.
+
+        Only the sheets tracking repos, which issues or PRs were
+        changed according to the events, are updated. GitHub isn't
+        requested, the data is taken from the events payloads.
+        """
+        if self._webhooks is None:
+            return
+
+        try:
+            repo_names = self._webhooks.apply_events(self._repos_data)
+        except Exception:
+            logging.exception("Exception occured:")
+            return
+
+        for sheet_name, sheet in self.sheets.items():
+            sheet_repos = self._config.SHEETS.get(sheet_name, {}).get("repo_names", {})
+            if repo_names.intersection(sheet_repos):
+                self._update_sheet(sheet_name, sheet)
+
     def reload_config(self, config):
         """Load new configurations.
 
@@ -147,6 +216,55 @@ class Spreadsheet:
 
             self._last_config_update = config_update
 
+    def _read_sheets(self):
+        """Read values of all the sheets with a single request.
+
+        Returns:
+            dict:
+                {<sheet_name>: <values>} - sheets values. Empty,
+                if reading failed, so that sheets read themselves.
+        """
+        sheets = list(self.sheets.values())
+        if self._archive and not self._archive.is_new:
+            sheets.append(self._archive)
+
+        if not sheets:
+            return {}
+
+        try:
+            resp = (
+                self._ss_resource.values()
+                .batchGet(
+                    spreadsheetId=self._id,
+                    ranges=[sheet.name for sheet in sheets],
+                    valueRenderOption="FORMULA",
+                )
+                .execute()
+            )
+        except Exception:
+            logging.exception("Exception occured:")
+            return {}
+
+        return {
+            sheet.name: value_range.get("values", [])
+            for sheet, value_range in zip(sheets, resp["valueRanges"])
+        }
+
+    def _update_sheet(self, sheet_name, sheet, table=None):
+        """Update the sheet, logging errors.
+
+        Args:
+            sheet_name (str): Name of the sheet.
+            sheet (sheet.Sheet): Sheet to update.
+            table (list): Sheet values, if they were already read.
+        """
+        logging.info("Updating sheet " + sheet_name)
+        try:
+            sheet.update(self._ss_resource, self._to_be_archived, table)
+            logging.info("Updated sheet " + sheet_name)
+        except Exception:
+            logging.exception("Exception occured:")
+
     def _init_existing_sheets(self):
         """Init Sheet() object for every sheet in this spreadsheet.
 
@@ -164,7 +282,7 @@ class Spreadsheet:
                 self._archive = ArchiveSheet(name, self._id, props["sheetId"])
                 continue
 
-            sheets[name] = Sheet(name, self._id, props["sheetId"])
+            sheets[name] = Sheet(name, self._id, props["sheetId"], self._repos_data)
 
         return sheets
 
@@ -213,7 +331,7 @@ class Spreadsheet:
 
         for name in sheets_in_conf:
             if name not in self.sheets.keys():
-                self.sheets[name] = Sheet(name, self._id)
+                self.sheets[name] = Sheet(name, self._id, repos_data=self._repos_data)
                 add_sheet_reqs.append(self.sheets[name].create_request)
 
         if self._config.ARCHIVE_SHEET and self._archive.is_new:
@@ -1,5 +1,6 @@
 """Manual mocks of some Scraper classes."""
 import github
+from repos_data import ReposData
 from sheet import Sheet
 from sheet_builder import SheetBuilder
 import spreadsheet
@@ -13,13 +14,20 @@ class SheetBuilderMock(SheetBuilder):
         return github.Github()
 
 
+class ReposDataMock(ReposData):
+    def _login_on_github(self):
+        return github.Github()
+
+
 class SheetMock(Sheet):
     def __init__(self, name, spreadsheet_id, id_=None):
         self.id = id_
         self.name = name
         self.ss_id = spreadsheet_id
         self._config = None
+        self._format_fingerprint = None
         self._builder = SheetBuilderMock(name)
+        self._cell_colors = []
 
 
 class ConfigMock:
@@ -49,6 +57,8 @@ class SpreadsheetMock(spreadsheet.Spreadsheet):
         self._config_updated = True
         self._to_be_archived = {}
         self._archive = None
+        self._webhooks = None
+        self._repos_data = None
 
 
 def return_module(module):
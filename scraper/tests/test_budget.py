@@ -0,0 +1,54 @@
+"""Unit tests for rate limit budget scheduler."""
+import time
+import unittest
+from budget import BudgetScheduler, DEFAULT_COST
+
+REPOS = ("repo1", "repo2", "repo3")
+
+
+class TestBudgetScheduler(unittest.TestCase):
+    def setUp(self):
+        self._budget = BudgetScheduler("sheet_name", reserve=10)
+        self._budget._costs = {"repo1": 30, "repo2": 30, "repo3": 30}
+
+    def test_plan_unknown_limit(self):
+        """Check that all repos are planned if rate limit is unknown."""
+        self.assertEqual(
+            self._budget.plan(REPOS, {"repo3": 1}, None), ["repo3", "repo1", "repo2"]
+        )
+
+    def test_plan_defer(self):
+        """Check that repos are deferred if rate limit is not enough."""
+        reset = time.time() + 3600
+
+        planned = self._budget.plan(REPOS, {"repo2": 1}, (75, 5000, reset))
+        self.assertEqual(planned, ["repo2", "repo1"])
+        self.assertEqual(self._budget._deferred, ["repo3"])
+
+        # deferred repo goes first among the same priority repos
+        planned = self._budget.plan(REPOS, {"repo2": 1}, (75, 5000, reset))
+        self.assertEqual(planned, ["repo2", "repo3"])
+        self.assertEqual(self._budget._deferred, ["repo1"])
+
+    def test_plan_reset(self):
+        """Check that rate limit reset is taken into account."""
+        planned = self._budget.plan(REPOS, {}, (0, 5000, time.time() - 1))
+        self.assertEqual(planned, list(REPOS))
+
+    def test_record(self):
+        """Check cost estimations."""
+        budget = BudgetScheduler("sheet_name")
+        budget._costs = {}
+
+        budget.record("repo1", 8)
+        self.assertEqual(budget._costs["repo1"], 8)
+        budget.record("repo1", 2)
+        self.assertEqual(budget._costs["repo1"], 5)
+        self.assertEqual(budget._costs.get("repo2", DEFAULT_COST), DEFAULT_COST)
+
+    def test_defer(self):
+        budget = BudgetScheduler("sheet_name")
+        budget.defer("repo1")
+        budget.defer("repo1")
+
+        self.assertEqual(budget._deferred, ["repo1"])
@@ -0,0 +1,184 @@
+"""Unit tests for GraphQL fetcher."""
+import datetime
+import http.server
+import json
+import threading
+import unittest
+import graphql_fetch
+
+
+def issue_node(number, updated_at, state="OPEN"):
+    """Build issue node of GraphQL response."""
+    return {
+        "number": number,
+        "title": "Issue " + str(number),
+        "state": state,
+        "createdAt": "2020-06-01T10:00:00Z",
+        "updatedAt": updated_at,
+        "closedAt": None if state == "OPEN" else updated_at,
+        "labels": {"nodes": [{"name": "type: bug"}]},
+        "assignees": {"nodes": [{"login": "IlyaFaer"}]},
+    }
+
+
+def pull_node(number, updated_at, merged=True):
+    """Build pull request node of GraphQL response."""
+    return {
+        "number": number,
+        "body": "Closes #1",
+        "state": "MERGED" if merged else "OPEN",
+        "merged": merged,
+        "createdAt": "2020-06-01T10:00:00Z",
+        "updatedAt": updated_at,
+        "author": {"login": "IlyaFaer"},
+    }
+
+
+def page(connection, nodes, cursor=None):
+    """Build GraphQL response with a single connection page."""
+    return {
+        "data": {
+            "repository": {
+                connection: {
+                    "pageInfo": {"hasNextPage": bool(cursor), "endCursor": cursor},
+                    "nodes": nodes,
+                }
+            }
+        }
+    }
+
+
+class GraphQLHandler(http.server.BaseHTTPRequestHandler):
+    """Local stand-in for GitHub GraphQL API."""
+
+    pages = {}
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.requests.append((self.headers["Authorization"], body))
+
+        resp = json.dumps(self.pages[body["variables"].get("cursor")]).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(resp)))
+        self.end_headers()
+        self.wfile.write(resp)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestGraphQLFetcher(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._server = http.server.HTTPServer(("127.0.0.1", 0), GraphQLHandler)
+        threading.Thread(target=cls._server.serve_forever, daemon=True).start()
+
+        cls._fetcher = graphql_fetch.GraphQLFetcher(
+            graphql_fetch.HTTPTransport(
+                "token123",
+                "http://127.0.0.1:{port}/graphql".format(
+                    port=cls._server.server_address[1]
+                ),
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._server.shutdown()
+        cls._server.server_close()
+
+    def setUp(self):
+        GraphQLHandler.requests = []
+
+    def test_fetch_issues(self):
+        """Check reading issues page by page."""
+        GraphQLHandler.pages = {
+            None: page("issues", [issue_node(2, "2020-06-03T10:00:00Z")], "c1"),
+            "c1": page(
+                "issues", [issue_node(1, "2020-06-02T10:00:00Z", state="CLOSED")]
+            ),
+        }
+
+        issues = list(self._fetcher.fetch_issues("org/repo"))
+
+        self.assertEqual([issue.number for issue in issues], [2, 1])
+        self.assertEqual(issues[0].html_url, "https://github.com/org/repo/issues/2")
+        self.assertEqual(issues[0].repository.full_name, "org/repo")
+        self.assertEqual(issues[0].labels[0].name, "type: bug")
+        self.assertEqual(issues[0].assignees[0].login, "IlyaFaer")
+        self.assertEqual(issues[0].updated_at, datetime.datetime(2020, 6, 3, 10))
+        self.assertIsNone(issues[0].closed_at)
+        self.assertIsNone(issues[0].pull_request)
+        self.assertIsNone(issues[0].body)
+        self.assertEqual(issues[1].state, "closed")
+        self.assertEqual(issues[1].closed_at, datetime.datetime(2020, 6, 2, 10))
+
+        auth, body = GraphQLHandler.requests[0]
+        self.assertEqual(auth, "bearer token123")
+        self.assertEqual(body["variables"]["states"], ["OPEN"])
+        self.assertEqual(body["variables"]["size"], 100)
+        self.assertEqual(GraphQLHandler.requests[1][1]["variables"]["cursor"], "c1")
+
+    def test_fetch_issues_since(self):
+        """Check that all the updated issues are requested."""
+        GraphQLHandler.pages = {None: page("issues", [])}
+
+        list(self._fetcher.fetch_issues("org/repo", datetime.datetime(2020, 6, 3)))
+
+        variables = GraphQLHandler.requests[0][1]["variables"]
+        self.assertEqual(variables["since"], "2020-06-03T00:00:00Z")
+        self.assertIsNone(variables["states"])
+
+    def test_fetch_pulls(self):
+        """Check reading PRs until the last indexed one."""
+        GraphQLHandler.pages = {
+            None: page(
+                "pullRequests",
+                [
+                    pull_node(3, "2020-06-03T10:00:00Z", merged=False),
+                    pull_node(2, "2020-06-02T10:00:00Z"),
+                ],
+                "c1",
+            ),
+            "c1": page("pullRequests", [pull_node(1, "2020-05-01T10:00:00Z")]),
+        }
+
+        pulls = list(
+            self._fetcher.fetch_pulls("org/repo", datetime.datetime(2020, 6, 1))
+        )
+
+        self.assertEqual([pull.number for pull in pulls], [3, 2])
+        self.assertEqual(pulls[0].state, "open")
+        self.assertFalse(pulls[0].merged)
+        self.assertEqual(pulls[1].state, "closed")
+        self.assertTrue(pulls[1].merged)
+        self.assertEqual(pulls[1].user.login, "IlyaFaer")
+        self.assertEqual(pulls[1].html_url, "https://github.com/org/repo/pull/2")
+
+    def test_fetch_issues_by_numbers(self):
+        """Check reading issues by numbers with a single query."""
+        node = issue_node(1, "2020-06-03T10:00:00Z")
+        GraphQLHandler.pages = {
+            None: {
+                "data": {"repository": {"i1": node, "i5": None}},
+                "errors": [{"type": "NOT_FOUND", "path": ["repository", "i5"]}],
+            }
+        }
+
+        issues = self._fetcher.fetch_issues_by_numbers("org/repo", (5, 1))
+
+        self.assertEqual(issues[1].html_url, "https://github.com/org/repo/issues/1")
+        self.assertIsNone(issues[5])
+        self.assertEqual(len(GraphQLHandler.requests), 1)
+        query = GraphQLHandler.requests[0][1]["query"]
+        self.assertIn("i1: issue(number: 1)", query)
+        self.assertIn("i5: issue(number: 5)", query)
+
+    def test_errors(self):
+        """Check that GraphQL errors are raised."""
+        GraphQLHandler.pages = {None: {"errors": [{"message": "Bad query"}]}}
+
+        with self.assertRaises(graphql_fetch.GraphQLError):
+            list(self._fetcher.fetch_issues("org/repo"))
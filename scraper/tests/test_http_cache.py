@@ -0,0 +1,97 @@
+"""Unit tests for on-disk HTTP cache."""
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+from http_cache import HTTPCache
+from transport import Response
+
+URL = "https://api.github.com/repos/org/repo"
+HEADERS = {"Authorization": "token 123"}
+
+
+class TestHTTPCache(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self._cache = HTTPCache(self._dir.name)
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def test_not_modified(self):
+        """Check that 304 response is served from the cache."""
+        request = mock.Mock(
+            side_effect=(
+                Response(200, {"ETag": '"abc"', "X-RateLimit-Remaining": "10"}, "{}"),
+                Response(304, {"X-RateLimit-Remaining": "9"}, ""),
+            )
+        )
+
+        self._cache.send(request, "GET", URL, None, HEADERS)
+        resp = self._cache.send(request, "GET", URL, None, HEADERS)
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.read(), "{}")
+        self.assertEqual(resp.headers["x-ratelimit-remaining"], "9")
+
+        self.assertNotIn("If-None-Match", request.call_args_list[0][0][3])
+        self.assertEqual(request.call_args_list[1][0][3]["If-None-Match"], '"abc"')
+        self.assertEqual(self._cache.stats(), {"hits": 1, "misses": 1, "evictions": 0})
+
+    def test_modified(self):
+        """Check that changed response replaces the cached one."""
+        request = mock.Mock(
+            side_effect=(
+                Response(200, {"Last-Modified": "Mon, 01 Jun 2020"}, "old"),
+                Response(200, {"Last-Modified": "Tue, 02 Jun 2020"}, "new"),
+                Response(304, {}, ""),
+            )
+        )
+        for _ in range(3):
+            resp = self._cache.send(request, "GET", URL, None, HEADERS)
+
+        self.assertEqual(resp.read(), "new")
+        self.assertEqual(
+            request.call_args_list[2][0][3]["If-Modified-Since"], "Tue, 02 Jun 2020"
+        )
+
+    def test_credentials_in_key(self):
+        """Check that responses are cached per credentials."""
+        request = mock.Mock(return_value=Response(200, {"ETag": '"abc"'}, "{}"))
+
+        self._cache.send(request, "GET", URL, None, HEADERS)
+        self._cache.send(request, "GET", URL, None, {"Authorization": "token 456"})
+
+        self.assertNotIn("If-None-Match", request.call_args_list[1][0][3])
+
+    def test_not_cacheable(self):
+        """Check that responses without validators are not stored."""
+        request = mock.Mock(return_value=Response(200, {}, "{}"))
+
+        self._cache.send(request, "GET", URL, None, HEADERS)
+        self.assertEqual(os.listdir(self._dir.name), [])
+
+    def test_eviction(self):
+        """Check that the least recently used responses are evicted."""
+        cache = HTTPCache(self._dir.name, max_size=500)
+        request = mock.Mock(return_value=Response(200, {"ETag": '"abc"'}, "x" * 100))
+
+        for num in range(5):
+            cache.send(request, "GET", URL + str(num), None, HEADERS)
+
+        self.assertGreater(cache.evictions, 0)
+        self.assertLessEqual(
+            sum(
+                os.path.getsize(os.path.join(self._dir.name, name))
+                for name in os.listdir(self._dir.name)
+            ),
+            500,
+        )
+        # the last response is still cached
+        cache.send(request, "GET", URL + "4", None, HEADERS)
+        self.assertIn("If-None-Match", request.call_args[0][3])
+
+        # index is restored from the directory
+        restored = HTTPCache(self._dir.name)
+        restored._load_entries()
+        self.assertEqual(restored._entries.keys(), cache._entries.keys())
@@ -0,0 +1,77 @@
+"""Unit tests for pull requests index."""
+import datetime
+import unittest
+import unittest.mock as mock
+from pr_index import PullRequestsIndex
+from snapshots import PullSnapshot
+
+DATE_ = datetime.datetime(2020, 6, 3)
+ISSUE_URL = "https://github.com/org/repo/issues/1"
+RECORD = ("org/repo", 5, "closed", True, "IlyaFaer", DATE_, DATE_)
+
+
+class TestPullRequestsIndex(unittest.TestCase):
+    def test_restore(self):
+        """Check that index is restored from the file."""
+        with mock.patch(
+            "pr_index.load_update_stamps",
+            side_effect=lambda field, name: {ISSUE_URL: [RECORD]}
+            if field == "prs_index"
+            else {"org/repo": DATE_},
+        ):
+            index = PullRequestsIndex("sheet_name")
+
+        pull = index.get_related_prs(ISSUE_URL)[0]
+        self.assertEqual(pull.html_url, "https://github.com/org/repo/pull/5")
+        self.assertTrue(pull.merged)
+        self.assertEqual(index.last_update("org/repo"), DATE_)
+
+    def test_save_updates(self):
+        """Check that index is saved before stamps, only if changed."""
+        with mock.patch("pr_index.load_update_stamps", return_value={}):
+            index = PullRequestsIndex("sheet_name")
+
+        pull = PullSnapshot(
+            "org/repo", 5, "Closes #1", "closed", True, "IlyaFaer", DATE_, DATE_
+        )
+        index.merge(
+            "org/repo", [("https://github.com/org/repo", pull, "Closes #1")], DATE_
+        )
+
+        with mock.patch("pr_index.save_update_stamps") as save_mock:
+            index.save_updates()
+            index.save_updates()
+
+        save_mock.assert_has_calls(
+            (
+                mock.call("prs_index", "sheet_name", {ISSUE_URL: [RECORD]}),
+                mock.call("last_pr_updates", "sheet_name", {"org/repo": DATE_}),
+                mock.call("last_pr_updates", "sheet_name", {"org/repo": DATE_}),
+            )
+        )
+        self.assertEqual(save_mock.call_count, 3)
+
+    def test_add_ordered(self):
+        """Check that PRs are kept in creation date order."""
+        with mock.patch("pr_index.load_update_stamps", return_value={}):
+            index = PullRequestsIndex("sheet_name")
+
+        def pull(number, day, state="open"):
+            return PullSnapshot(
+                "org/repo",
+                number,
+                None,
+                state,
+                False,
+                "IlyaFaer",
+                datetime.datetime(2020, 6, day),
+                DATE_,
+            )
+
+        for pr in (pull(2, 2), pull(4, 4), pull(3, 3), pull(2, 2, "closed")):
+            index.add("https://github.com/org/repo", pr, "Closes #1")
+
+        prs = index.get_related_prs(ISSUE_URL)
+        self.assertEqual([pr.number for pr in prs], [4, 3, 2])
+        self.assertEqual(prs[2].state, "closed")
+        self.assertEqual(index.get_related_prs("unknown_url"), [])
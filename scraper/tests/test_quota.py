@@ -0,0 +1,33 @@
+"""Unit tests for Sheets API quota governor."""
+import logging
+import time
+import unittest
+import quota
+
+logging.disable(logging.INFO)
+
+
+class TestQuotaGovernor(unittest.TestCase):
+    def test_acquire(self):
+        """Check that requests over the quota wait for the window."""
+        governor = quota.QuotaGovernor(reads=2, writes=1, window=0.1)
+
+        start = time.time()
+        governor.acquire("get")
+        governor.acquire("batchGet")
+        governor.acquire("batchUpdate")
+        self.assertLess(time.time() - start, 0.05)
+
+        governor.acquire("get")
+        self.assertGreaterEqual(time.time() - start, 0.09)
+        self.assertGreater(governor.waited, 0)
+
+    def test_configure(self):
+        """Check that quotas can be changed."""
+        governor = quota.QuotaGovernor(reads=1, writes=1, window=0.1)
+        governor.configure(reads=3, writes=1)
+
+        start = time.time()
+        for _ in range(3):
+            governor.acquire("get")
+        self.assertLess(time.time() - start, 0.05)
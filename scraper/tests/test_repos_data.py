@@ -0,0 +1,82 @@
+"""Unit tests for spreadsheet-level repositories data."""
+import sys
+import examples.fill_funcs_example
+
+sys.modules["fill_funcs"] = examples.fill_funcs_example
+
+import unittest  # noqa: E402
+import unittest.mock as mock  # noqa: E402
+from mocks import ReposDataMock  # noqa: E402
+from repos_data import ReposDataView  # noqa: E402
+
+ISSUE1_URL = "https://github.com/org/repo1/issues/1"
+ISSUE2_URL = "https://github.com/org/repo2/issues/2"
+
+
+class TestReposData(unittest.TestCase):
+    def test_update(self):
+        """Check that repos of all the sheets are read at once."""
+        SHEETS = {
+            "sheet1": {"repo_names": {"org/repo1": "Repo1"}, "fetch_workers": 3},
+            "sheet2": {"repo_names": {"org/repo1": "Repo1", "org/repo2": "Repo2"}},
+            "sheet3": {},
+        }
+        repos_data = ReposDataMock("ss_id")
+
+        with mock.patch.object(
+            repos_data, "retrieve_updated", return_value={ISSUE1_URL: 1}
+        ) as retrieve_mock:
+            repos_data.update(SHEETS)
+            retrieve_mock.assert_called_once()
+
+        self.assertEqual(repos_data._repo_names, ("org/repo1", "org/repo2"))
+        self.assertEqual(repos_data._fetch_workers, 3)
+        self.assertEqual(repos_data._cycle_issues, {ISSUE1_URL: 1})
+
+    def test_get_issues(self):
+        """Check filtering issues by repositories."""
+        repos_data = ReposDataMock("ss_id")
+        repos_data._issues_index = {ISSUE1_URL: 1, ISSUE2_URL: 2}
+        repos_data._cycle_issues = {ISSUE2_URL: 2}
+
+        self.assertEqual(repos_data.get_issues(("org/repo1",)), {})
+        self.assertEqual(repos_data.get_issues(("org/repo2",)), {ISSUE2_URL: 2})
+        self.assertEqual(
+            repos_data.get_issues(("org/repo1",), indexed=True), {ISSUE1_URL: 1}
+        )
+
+        # restored issues are not given till they are checked
+        repos_data._restored = {ISSUE1_URL}
+        self.assertEqual(repos_data.get_issues(("org/repo1",), indexed=True), {})
+
+
+class TestReposDataView(unittest.TestCase):
+    def test_retrieve_updated(self):
+        """Check taking issues from the spreadsheet repos data."""
+        repos_data = ReposDataMock("ss_id")
+        repos_data.get_issues = mock.Mock(side_effect=({"url1": 1}, {"url2": 2}))
+
+        view = ReposDataView("sheet_name", repos_data)
+        view.reload_config({"repo_names": {"repo1": "Repo1", "repo2": "Repo2"}})
+        view._taken_repos = {"repo1"}
+
+        self.assertIs(view.prs_index, repos_data.prs_index)
+        self.assertEqual(view.retrieve_updated(), {"url1": 1, "url2": 2})
+        repos_data.get_issues.assert_has_calls(
+            (mock.call({"repo1"}), mock.call({"repo2"}, indexed=True))
+        )
+        self.assertEqual(view._taken_repos, {"repo1", "repo2"})
+        self.assertEqual(view.get_from_index("url2"), 2)
+
+    def test_delete_from_index(self):
+        """Check that deleted issues are dropped from the repos data as well."""
+        repos_data = ReposDataMock("ss_id")
+        repos_data._issues_index = {ISSUE1_URL: 1, ISSUE2_URL: 2}
+
+        view = ReposDataView("sheet_name", repos_data)
+        view._issues_index = {ISSUE1_URL: 1}
+        view.delete_from_index(ISSUE1_URL)
+
+        self.assertIsNone(view.get_from_index(ISSUE1_URL))
+        self.assertEqual(repos_data._issues_index, {ISSUE2_URL: 2})
+        self.assertTrue(repos_data._index_changed)
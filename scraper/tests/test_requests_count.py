@@ -0,0 +1,205 @@
+"""
+Request counts of the GitHub data reading.
+
+Builders read data through a fake GitHub transport, so
+that every request sent to the API can be asserted.
+"""
+import json
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+import urllib.parse
+import github
+import snapshots
+import transport
+from sheet_builder import SheetBuilder
+
+REPO_URL = "https://github.com/org/repo"
+API_URL = "https://api.github.com/repos/org/repo"
+
+USER = {"login": "user"}
+PULL = {
+    "url": API_URL + "/pulls/3",
+    "html_url": REPO_URL + "/pull/3",
+    "number": 3,
+    "body": "Fixes #1",
+    "state": "closed",
+    "merged_at": "2020-06-03T10:00:00Z",
+    "user": USER,
+    "created_at": "2020-06-01T10:00:00Z",
+    "updated_at": "2020-06-03T10:00:00Z",
+}
+ISSUE = {
+    "url": API_URL + "/issues/1",
+    "html_url": REPO_URL + "/issues/1",
+    "number": 1,
+    "title": "Issue",
+    "body": "Issue body",
+    "state": "open",
+    "labels": [{"name": "bug"}],
+    "assignees": [USER],
+    "user": USER,
+    "created_at": "2020-06-01T10:00:00Z",
+    "updated_at": "2020-06-04T10:00:00Z",
+    "closed_at": None,
+}
+# open PR, as it's returned by the issues list
+ISSUE_PULL = dict(
+    ISSUE,
+    url=API_URL + "/issues/2",
+    html_url=REPO_URL + "/pull/2",
+    number=2,
+    body="Towards #1",
+    pull_request={"url": API_URL + "/pulls/2"},
+)
+# closed PR, as it's returned by the issues list
+ISSUE_CLOSED_PULL = dict(
+    PULL,
+    url=API_URL + "/issues/3",
+    title="PR",
+    labels=[],
+    assignees=[],
+    closed_at="2020-06-03T10:00:00Z",
+    pull_request={"url": API_URL + "/pulls/3"},
+)
+
+RESPONSES = {
+    "/users/user": USER,
+    "/repos/org/repo": {
+        "url": API_URL,
+        "html_url": REPO_URL,
+        "full_name": "org/repo",
+        "name": "repo",
+    },
+    "/repos/org/repo/pulls": [PULL],
+    "/repos/org/repo/issues": [ISSUE, ISSUE_PULL, ISSUE_CLOSED_PULL],
+}
+
+
+class FakeGitHub:
+    """Fake GitHub API, answering from RESPONSES and recording requests."""
+
+    def __init__(self):
+        self.requests = []
+        # paginated responses: {<path>: [<page>, ...]}
+        self.pages = {}
+
+    def request(self, verb, url, body, headers, timeout=None):
+        parsed = urllib.parse.urlparse(url)
+        path = parsed.path
+        self.requests.append(path)
+        transport.requests_counter()[0] += 1
+
+        headers = {"content-type": "application/json"}
+        if path in self.pages:
+            page = int(urllib.parse.parse_qs(parsed.query).get("page", ["1"])[0])
+            if page < len(self.pages[path]):
+                headers["link"] = '<{api}{path}?page={next}>; rel="next"'.format(
+                    api="https://api.github.com", path=path, next=page + 1
+                )
+            return transport.Response(
+                200, headers, json.dumps(self.pages[path][page - 1])
+            )
+
+        if path not in RESPONSES:
+            return transport.Response(404, {}, '{"message": "Not Found"}')
+
+        return transport.Response(200, headers, json.dumps(RESPONSES[path]))
+
+
+class TestRequestsCount(unittest.TestCase):
+    def setUp(self):
+        self._github = FakeGitHub()
+        patcher = mock.patch("transport._request", self._github.request)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        login_file = tempfile.NamedTemporaryFile("w", delete=False)
+        login_file.write("user/password")
+        login_file.close()
+        self.addCleanup(os.remove, login_file.name)
+
+        for patcher in (
+            mock.patch("sheet_builder.LOGIN_PASS_FILE", login_file.name),
+            mock.patch.dict("sheet_builder._clients", clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _build(self, name="sheet1", last_update="2020-05-01T10:00:00Z"):
+        # stamp in the format of the installed PyGithub
+        stamp = github.PullRequest.PullRequest(
+            github.Github()._Github__requester,
+            {},
+            {"updated_at": last_update},
+            completed=True,
+        ).updated_at
+
+        builder = SheetBuilder(name)
+        builder.reload_config({"repo_names": {"org/repo": "repo"}})
+        builder._last_issue_updates = {"org/repo": (stamp, "")}
+        builder.prs_index._last_pr_updates = {"org/repo": stamp}
+        return builder
+
+    def test_login(self):
+        """Check that credentials are checked once for all of the sheets."""
+        self._build("sheet1")
+        self._build("sheet2")
+
+        self.assertEqual(self._github.requests, ["/users/user"])
+
+    def test_update(self):
+        """Check requests of the repo reading."""
+        builder = self._build()
+        self._github.requests.clear()
+
+        _, issues, links, last_pr_update, _ = builder._fetch_repo("org/repo")
+
+        self.assertEqual(
+            self._github.requests,
+            ["/repos/org/repo", "/repos/org/repo/pulls", "/repos/org/repo/issues"],
+        )
+        self.assertEqual(list(issues), [REPO_URL + "/issues/1"])
+        # closed PR from the PRs list and open PR from the issues list
+        self.assertEqual(
+            [
+                (pull.number, pull.merged)
+                for pull in (snapshots.pull_snapshot(link[1]) for link in links)
+            ],
+            [(3, True), (2, False)],
+        )
+        self.assertEqual(last_pr_update.day, 3)
+
+    def test_next_update(self):
+        """Check that the repo object is requested only once."""
+        builder = self._build()
+        builder._fetch_repo("org/repo")
+        self._github.requests.clear()
+
+        # listed objects are never completed
+        with transport.completion_guard(strict=True):
+            builder._fetch_repo("org/repo")
+
+        self.assertEqual(
+            self._github.requests, ["/repos/org/repo/pulls", "/repos/org/repo/issues"]
+        )
+
+    def test_next_update_pulls_pages(self):
+        """Check that the next PRs page is not read after the last updated PR."""
+        old_pull = dict(PULL, number=4, updated_at="2020-05-20T10:00:00Z")
+        older_pull = dict(PULL, number=5, updated_at="2020-05-10T10:00:00Z")
+        self._github.pages["/repos/org/repo/pulls"] = [[PULL, old_pull], [older_pull]]
+
+        builder = self._build(last_update="2020-06-01T10:00:00Z")
+        self._github.requests.clear()
+
+        _, _, links, _, _ = builder._fetch_repo("org/repo")
+
+        self.assertEqual(
+            self._github.requests,
+            ["/repos/org/repo", "/repos/org/repo/pulls", "/repos/org/repo/issues"],
+        )
+        self.assertEqual(
+            [snapshots.pull_snapshot(link[1]).number for link in links], [3, 2]
+        )
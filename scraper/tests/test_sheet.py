@@ -10,6 +10,10 @@ sys.modules["config"] = examples.config_example
 import logging  # noqa: E402
 import unittest  # noqa: E402
 import unittest.mock as mock  # noqa: E402
+import github  # noqa: E402
+import snapshots  # noqa: E402
+import transport  # noqa: E402
+from instances import Columns  # noqa: E402
 from mocks import SheetMock  # noqa: E402
 
 
@@ -46,6 +50,212 @@ class TestSheet(unittest.TestCase):
             spreadsheetId=SPREADSHEET_ID, body={"requests": REQUESTS}
         )
 
+    def test_diff_requests(self):
+        """Check that only changes are written into the sheet."""
+        ISSUE = '=HYPERLINK("https://github.com/org/repo/issues/{num}","{num}")'
+
+        sheet = SheetMock("sheet1", SPREADSHEET_ID, 123)
+        sheet._config = {"columns": [{"name": "Issue"}, {"name": "Status"}]}
+        sheet._columns = Columns(sheet._config["columns"], sheet.id)
+        sheet._read_rows = [[ISSUE.format(num=1), "Open"], [ISSUE.format(num=2)]]
+
+        requests = sheet._diff_requests(
+            sheet._table_diff(
+                [[ISSUE.format(num=1), "Closed"], [ISSUE.format(num=3), "Open"]]
+            )
+        )
+
+        self.assertEqual(
+            requests,
+            [
+                {
+                    "deleteDimension": {
+                        "range": {
+                            "sheetId": 123,
+                            "dimension": "ROWS",
+                            "startIndex": 2,
+                            "endIndex": 3,
+                        }
+                    }
+                },
+                {
+                    "insertDimension": {
+                        "range": {
+                            "sheetId": 123,
+                            "dimension": "ROWS",
+                            "startIndex": 2,
+                            "endIndex": 3,
+                        },
+                        "inheritFromBefore": True,
+                    }
+                },
+                {
+                    "updateCells": {
+                        "start": {"sheetId": 123, "rowIndex": 1, "columnIndex": 1},
+                        "rows": [
+                            {
+                                "values": [
+                                    {"userEnteredValue": {"stringValue": "Closed"}}
+                                ]
+                            }
+                        ],
+                        "fields": "userEnteredValue",
+                    }
+                },
+                {
+                    "updateCells": {
+                        "start": {"sheetId": 123, "rowIndex": 2, "columnIndex": 0},
+                        "rows": [
+                            {
+                                "values": [
+                                    {
+                                        "userEnteredValue": {
+                                            "formulaValue": ISSUE.format(num=3)
+                                        }
+                                    },
+                                    {"userEnteredValue": {"stringValue": "Open"}},
+                                ]
+                            }
+                        ],
+                        "fields": "userEnteredValue",
+                    }
+                },
+            ],
+        )
+
+    def test_update_single_batch(self):
+        """Check that all of the sheet changes are posted with one call."""
+        sheet = SheetMock("sheet1", SPREADSHEET_ID, 123)
+        sheet._config = {
+            "columns": [{"name": "Issue"}, {"name": "Status"}],
+            "team": ("user",),
+        }
+        sheet._read_rows = None
+        sheet._builder.first_update = False
+
+        ss_resource_mock = mock.Mock()
+        ss_resource_mock.get.return_value.execute.return_value = {"sheets": [{}]}
+        with mock.patch.object(sheet, "_read", return_value={}):
+            with mock.patch.object(sheet._builder, "retrieve_updated", return_value={}):
+                sheet.update(ss_resource_mock, {})
+
+        ss_resource_mock.batchUpdate.assert_called_once()
+        requests = ss_resource_mock.batchUpdate.call_args[1]["body"]["requests"]
+        # title row formatting, sheet resizing, title row, clearing of the old rows
+        self.assertIn("repeatCell", requests[0])
+        self.assertIn("updateSheetProperties", requests[1])
+        self.assertEqual(requests[2]["updateCells"]["start"]["rowIndex"], 0)
+        self.assertEqual(requests[-1]["updateCells"]["range"]["startRowIndex"], 1)
+        ss_resource_mock.values.assert_not_called()
+
+    def test_grid_request(self):
+        """Check that the sheet is resized to fit the whole table."""
+        sheet = SheetMock("sheet1", SPREADSHEET_ID, 123)
+
+        for length, row_count in ((10, 1000), (1500, 1501)):
+            self.assertEqual(
+                sheet._grid_request(length),
+                {
+                    "updateSheetProperties": {
+                        "properties": {
+                            "sheetId": 123,
+                            "gridProperties": {"rowCount": row_count},
+                        },
+                        "fields": "gridProperties.rowCount",
+                    }
+                },
+            )
+
+    def test_color_requests(self):
+        """Check that only changed colors are sent."""
+        GREY = {"red": 0.6, "green": 0.6, "blue": 0.6}
+        GREEN = {"green": 1}
+
+        sheet = SheetMock("sheet1", SPREADSHEET_ID, 123)
+        sheet._columns = mock.Mock(names=["Issue", "Status", "Priority"])
+
+        colors = [{1: GREY}, {1: GREY}, {1: GREY, 2: GREEN}]
+        requests, cell_colors = sheet._color_requests(colors, {})
+        self.assertEqual(
+            [
+                (
+                    req["repeatCell"]["range"]["startRowIndex"],
+                    req["repeatCell"]["range"]["endRowIndex"],
+                    req["repeatCell"]["range"]["startColumnIndex"],
+                    req["repeatCell"]["cell"]["userEnteredFormat"].get(
+                        "backgroundColor"
+                    ),
+                )
+                for req in requests
+            ],
+            # colors of the unknown cells are cleared
+            [(1, 4, 0, None), (1, 4, 1, GREY), (1, 3, 2, None), (3, 4, 2, GREEN)],
+        )
+        sheet._cell_colors = cell_colors
+
+        # the first row deleted, the new row inserted at the end,
+        # the last kept row lost its color
+        colors = [{1: GREY}, {1: GREY}, {1: GREY}]
+        requests, _ = sheet._color_requests(colors, {0: 1, 1: 2})
+        self.assertEqual(
+            [
+                (
+                    req["repeatCell"]["range"]["startRowIndex"],
+                    req["repeatCell"]["range"]["endRowIndex"],
+                    req["repeatCell"]["range"]["startColumnIndex"],
+                    req["repeatCell"]["fields"],
+                )
+                for req in requests
+            ],
+            [
+                (3, 4, 0, "userEnteredFormat.backgroundColor"),
+                (3, 4, 1, "userEnteredFormat"),
+                (2, 4, 2, "userEnteredFormat.backgroundColor"),
+            ],
+        )
+
+    def test_format_requests_unchanged(self):
+        """Check that formatting is built only when it was changed."""
+        COLORS = {"Open": {"red": 1}, "Closed": {"green": 1}}
+
+        sheet = SheetMock("sheet1", SPREADSHEET_ID, 123)
+        sheet._config = {
+            "columns": [{"name": "Issue"}, {"name": "Status", "values": COLORS}]
+        }
+
+        ss_resource_mock = mock.Mock()
+        ss_resource_mock.get.return_value.execute.return_value = {"sheets": [{}]}
+
+        requests, fingerprint = sheet._format_requests(ss_resource_mock)
+        self.assertEqual(
+            len([req for req in requests if "addConditionalFormatRule" in req]), 2
+        )
+        sheet._format_fingerprint = fingerprint
+
+        ss_resource_mock.get.reset_mock()
+        self.assertEqual(sheet._format_requests(ss_resource_mock), ([], fingerprint))
+        ss_resource_mock.get.assert_not_called()
+
+        # changed configurations
+        COLORS["Open"] = {"blue": 1}
+        requests, new_fingerprint = sheet._format_requests(ss_resource_mock)
+        self.assertNotEqual(new_fingerprint, fingerprint)
+        self.assertTrue(requests)
+
+    def test_read_clear_sheet(self):
+        """Check that a clear sheet is formatted without reading it again."""
+        sheet = SheetMock("sheet1", SPREADSHEET_ID, 123)
+        sheet._config = {"columns": [{"name": "Issue"}, {"name": "Status"}]}
+
+        ss_resource_mock = mock.Mock()
+        ss_resource_mock.get.return_value.execute.return_value = {"sheets": [{}]}
+
+        self.assertEqual(sheet._read(ss_resource_mock, []), {})
+
+        ss_resource_mock.values.assert_not_called()
+        ss_resource_mock.batchUpdate.assert_called_once()
+        self.assertEqual(sheet._read_rows, [])
+
     def test_reload_config(self):
         """Check if sheet configurations reloaded correclty."""
         sheet = SheetMock("sheet1", SPREADSHEET_ID)
@@ -60,19 +270,23 @@ class TestSheet(unittest.TestCase):
 
         self.assertEqual(sheet._config, CONFIG)
 
-    def test_clear_bottom(self):
+    def test_clear_request(self):
         """Check that clearing table bottom works fine."""
-        sheet = SheetMock("sheet1", SPREADSHEET_ID)
+        sheet = SheetMock("sheet1", SPREADSHEET_ID, 123)
 
-        execute_mock = mock.Mock()
-        clear_mock = mock.Mock(execute=execute_mock)
-        values_mock = mock.Mock(return_value=mock.Mock(clear=clear_mock))
-        ss_resource_mock = mock.Mock(values=values_mock)
-
-        sheet._clear_bottom(ss_resource_mock, 5, 10)
-
-        clear_mock.assert_called_once_with(
-            spreadsheetId=SPREADSHEET_ID, range="sheet1!A7:J"
+        self.assertEqual(
+            sheet._clear_request(5, 10),
+            {
+                "updateCells": {
+                    "range": {
+                        "sheetId": 123,
+                        "startRowIndex": 6,
+                        "startColumnIndex": 0,
+                        "endColumnIndex": 10,
+                    },
+                    "fields": "userEnteredValue,userEnteredFormat.backgroundColor",
+                }
+            },
         )
 
     def test_spot_issue_object_updated(self):
@@ -98,3 +312,58 @@ class TestSheet(unittest.TestCase):
         self.assertEqual(
             sheet._spot_issue_object("123", {"1253": "Issue"}), "index_issue"
         )
+
+    def test_fill_without_requests(self):
+        """Check that filling doesn't complete objects read from listings."""
+        REPO_URL = "https://github.com/googleapis/python-storage"
+        transport.install()
+        requester = mock.Mock()
+
+        config = examples.config_example.SHEETS["Python"]
+        sheet = SheetMock("Python", SPREADSHEET_ID)
+        sheet._config = config
+        sheet._columns = Columns(config["columns"], sheet.id)
+
+        # payloads, as they are returned by issues and PRs lists
+        issue = github.Issue.Issue(
+            requester,
+            {},
+            {
+                "url": "https://api.github.com/repos/googleapis/python-storage/issues/1",
+                "html_url": REPO_URL + "/issues/1",
+                "number": 1,
+                "title": "Issue",
+                "state": "open",
+                "labels": [{"name": "api: storage"}],
+                "assignees": [],
+                "created_at": "2020-06-01T10:00:00Z",
+                "updated_at": "2020-06-03T10:00:00Z",
+                "closed_at": None,
+            },
+            completed=False,
+        )
+        pull = github.PullRequest.PullRequest(
+            requester,
+            {},
+            {
+                "url": "https://api.github.com/repos/googleapis/python-storage/pulls/2",
+                "html_url": REPO_URL + "/pull/2",
+                "number": 2,
+                "state": "closed",
+                "merged_at": "2020-06-03T10:00:00Z",
+                "user": {"login": "IlyaFaer"},
+                "created_at": "2020-06-02T10:00:00Z",
+                "updated_at": "2020-06-03T10:00:00Z",
+            },
+            completed=False,
+        )
+
+        tracked_issues = {}
+        with transport.completion_guard(strict=True):
+            sheet._builder.prs_index.add(REPO_URL, pull, "Closes #1")
+            sheet._insert_new_issues(
+                tracked_issues, {issue.html_url: snapshots.issue_snapshot(issue)}
+            )
+
+        requester.requestJsonAndCheck.assert_not_called()
+        self.assertEqual(tracked_issues[issue.html_url]["Repository"], "Storage")
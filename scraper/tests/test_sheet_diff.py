@@ -0,0 +1,115 @@
+"""Unit tests for sheet tables diff."""
+import unittest
+import sheet_diff
+
+
+def issue(num):
+    """Build "Issue" column formula."""
+    return '=HYPERLINK("https://github.com/org/repo/issues/{num}","{num}")'.format(
+        num=num
+    )
+
+
+class TestTableDiff(unittest.TestCase):
+    def test_no_changes(self):
+        """Check that equal tables give no changes."""
+        rows = [[issue(1), "Open", "03 Jun 2020"], [issue(2), "Closed", ""]]
+        read = [[issue(1), "Open", 43985], [issue(2), "Closed"]]
+
+        diff = sheet_diff.TableDiff(read, rows, 0, 3, date_columns=[2])
+
+        self.assertEqual(diff.row_changes, [])
+        self.assertEqual(diff.blocks, [])
+
+    def test_changed_cells(self):
+        """Check that only the changed part of a row is written."""
+        read = [[issue(1), "Open", "a", "b", "c"], [issue(2), "Open", "a"]]
+        rows = [[issue(1), "Closed", "a", "d", "c"], [issue(2), "Open", "a", "", ""]]
+
+        diff = sheet_diff.TableDiff(read, rows, 0, 5)
+
+        self.assertEqual(diff.row_changes, [])
+        self.assertEqual(diff.blocks, [(0, 1, [["Closed", "a", "d"]])])
+        self.assertEqual(diff.changed_cells, 3)
+
+    def test_coalesce(self):
+        """Check that equal spans of adjacent rows are merged."""
+        read = [[issue(num), "Open"] for num in range(4)]
+        rows = [
+            [issue(0), "Closed"],
+            [issue(1), "Closed"],
+            [issue(2), "Open"],
+            [issue(3), "Closed"],
+        ]
+
+        diff = sheet_diff.TableDiff(read, rows, 0, 2)
+
+        self.assertEqual(
+            diff.blocks, [(0, 1, [["Closed"], ["Closed"]]), (3, 1, [["Closed"]])]
+        )
+
+    def test_rows_changes(self):
+        """Check that rows of new and deleted issues are inserted and deleted."""
+        read = [[issue(num), "Open"] for num in (1, 2, 3, 4)]
+        rows = [[issue(num), "Open"] for num in (0, 1, 3, 4, 5)]
+
+        diff = sheet_diff.TableDiff(read, rows, 0, 2)
+
+        self.assertEqual(
+            diff.row_changes, [("insert", 4, 5), ("delete", 1, 2), ("insert", 0, 1)]
+        )
+        # only the new rows are written
+        self.assertEqual(
+            diff.blocks,
+            [(0, 0, [[issue(0), "Open"]]), (4, 0, [[issue(5), "Open"]])],
+        )
+
+        # apply changes to check that they give the new table
+        table = list(read)
+        for change, start, end in diff.row_changes:
+            if change == "delete":
+                del table[start:end]
+            else:
+                table[start:start] = [[]] * (end - start)
+
+        for row, col, values in diff.blocks:
+            for index, row_values in enumerate(values):
+                table[row + index] = row_values
+
+        self.assertEqual(table, rows)
+        # rows of issues 1, 3 and 4 stay in place
+        self.assertEqual(diff.kept_rows, {1: 0, 2: 2, 3: 3})
+
+
+class TestDiffFunctions(unittest.TestCase):
+    def test_normalize(self):
+        """Check that written values are normalized as read ones."""
+        self.assertEqual(sheet_diff.normalize("03 Jun 2020", is_date=True), "43985")
+        self.assertEqual(sheet_diff.normalize(43985, is_date=True), "43985")
+        self.assertEqual(sheet_diff.normalize("Jun 2020", is_date=True), "Jun 2020")
+        self.assertEqual(sheet_diff.normalize("12"), "12")
+        self.assertEqual(sheet_diff.normalize(12.0), "12")
+        self.assertEqual(sheet_diff.normalize("1.50"), "1.5")
+        self.assertEqual(sheet_diff.normalize("1.2.3"), "1.2.3")
+        self.assertEqual(sheet_diff.normalize(None), "")
+
+    def test_cell_data(self):
+        """Check that values are typed as user entered ones."""
+        self.assertEqual(sheet_diff.cell_data(""), {})
+        self.assertEqual(
+            sheet_diff.cell_data("03 Jun 2020", is_date=True),
+            {"userEnteredValue": {"numberValue": 43985}},
+        )
+        self.assertEqual(
+            sheet_diff.cell_data("12"), {"userEnteredValue": {"numberValue": 12}}
+        )
+        self.assertEqual(
+            sheet_diff.cell_data(1.5), {"userEnteredValue": {"numberValue": 1.5}}
+        )
+        self.assertEqual(
+            sheet_diff.cell_data("=1+1"), {"userEnteredValue": {"formulaValue": "=1+1"}}
+        )
+        self.assertEqual(
+            sheet_diff.cell_data("03 Jun"),
+            {"userEnteredValue": {"stringValue": "03 Jun"}},
+        )
@@ -0,0 +1,103 @@
+"""Unit tests for sheets formatting."""
+import unittest
+import sheet_format
+
+
+def rule(value, color, col=1):
+    """Build text equality conditional format rule."""
+    return {
+        "ranges": [
+            {
+                "sheetId": 123,
+                "startRowIndex": 1,
+                "startColumnIndex": col,
+                "endColumnIndex": col + 1,
+            }
+        ],
+        "booleanRule": {
+            "condition": {"type": "TEXT_EQ", "values": [{"userEnteredValue": value}]},
+            "format": {"backgroundColor": color},
+        },
+    }
+
+
+class TestReconcileRules(unittest.TestCase):
+    def test_no_changes(self):
+        """Check that rules in the normalized API form are matched."""
+        read = rule("Open", {"red": 0.6000000238418579, "green": 1})
+        read["booleanRule"]["format"]["backgroundColorStyle"] = {
+            "rgbColor": {"red": 0.6000000238418579, "green": 1}
+        }
+
+        requests = sheet_format.reconcile_rules(
+            123, [read], [rule("Open", {"red": 0.6, "green": 1, "blue": 0})]
+        )
+        self.assertEqual(requests, [])
+
+    def test_reconcile(self):
+        """Check that only the difference is added and deleted."""
+        existing = [
+            rule("Open", {"red": 1}),
+            rule("Closed", {"green": 1}),
+            rule("Open", {"red": 1}),
+            rule("Paused", {"blue": 1}),
+        ]
+        desired = [
+            rule("Open", {"red": 1}),
+            rule("Closed", {"green": 1}),
+            rule("New", {"red": 1}),
+        ]
+
+        requests = sheet_format.reconcile_rules(123, existing, desired)
+        self.assertEqual(
+            requests,
+            [
+                {"deleteConditionalFormatRule": {"sheetId": 123, "index": 3}},
+                {"deleteConditionalFormatRule": {"sheetId": 123, "index": 2}},
+                {"addConditionalFormatRule": {"rule": rule("New", {"red": 1})}},
+            ],
+        )
+
+    def test_fingerprint(self):
+        """Check that fingerprint doesn't depend on keys order."""
+        self.assertEqual(
+            sheet_format.fingerprint([{"a": 1, "b": 2}]),
+            sheet_format.fingerprint([{"b": 2, "a": 1}]),
+        )
+        self.assertNotEqual(
+            sheet_format.fingerprint([{"a": 1}]), sheet_format.fingerprint([{"a": 2}])
+        )
+
+
+class TestColorRanges(unittest.TestCase):
+    def test_color_ranges(self):
+        """Check that changed cells are merged into column ranges."""
+        GREY = {"red": 0.6, "green": 0.6, "blue": 0.6}
+        GREEN = {"green": 1}
+
+        colors = [{0: GREY, 2: GREEN}, {0: GREY}, {0: GREEN}, {0: GREY}, {0: GREY}]
+        previous = [{}, {}, {0: GREEN}, {0: GREEN}, {}]
+
+        self.assertEqual(
+            sheet_format.color_ranges(colors, previous, 3),
+            [(0, 0, 2, GREY), (0, 3, 5, GREY), (2, 0, 1, GREEN)],
+        )
+
+    def test_no_changes(self):
+        """Check that known colors are not sent again."""
+        colors = [{0: {"red": 1}}, {}]
+        self.assertEqual(
+            sheet_format.color_ranges(colors, [{0: {"red": 1}}, {}], 2), []
+        )
+
+    def test_clear_colors(self):
+        """Check that lost and unknown colors are cleared."""
+        RED = {"red": 1}
+
+        colors = [{}, {0: RED}, {}, {}]
+        previous = [{0: RED}, {0: RED}, None, {}]
+
+        self.assertEqual(
+            sheet_format.color_ranges(colors, previous, 2),
+            [(0, 0, 1, None), (0, 2, 3, None), (1, 2, 3, None)],
+        )
@@ -1,6 +1,18 @@
 import datetime
+import time
 import unittest
+import unittest.mock as mock
+import github
 from mocks import SheetBuilderMock
+from snapshots import IssueSnapshot
+
+
+class IssuesListMock(list):
+    """Mock for github.PaginatedList.PaginatedList of issues."""
+
+    @property
+    def totalCount(self):
+        return len(self)
 
 
 class TestSheetBuilder(unittest.TestCase):
@@ -34,6 +46,10 @@ class TestSheetBuilder(unittest.TestCase):
         builder.reload_config({"repo_names": REPOS})
 
         self.assertEqual(builder._repo_names, tuple(REPOS.keys()))
+        self.assertEqual(builder._fetch_workers, 1)
+
+        builder.reload_config({"repo_names": REPOS, "fetch_workers": 4})
+        self.assertEqual(builder._fetch_workers, 4)
 
     def test_get_from_index(self):
         """Test getting issues from index."""
@@ -56,3 +72,471 @@ class TestSheetBuilder(unittest.TestCase):
 
         builder.delete_from_index(URL)
         self.assertNotIn(URL, builder._issues_index.keys())
+
+    def test_fetch_repo(self):
+        """Check that repo fetching doesn't change builder's indexes."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        NEW_DATE = datetime.datetime(2020, 6, 5)
+
+        issue = mock.Mock(updated_at=NEW_DATE, html_url="issue_url", pull_request=None)
+        old_issue = mock.Mock(updated_at=DATE_, html_url="old_url", pull_request=None)
+        repo = mock.Mock(
+            full_name="repo1",
+            get_issues=mock.Mock(return_value=IssuesListMock([issue, old_issue])),
+        )
+
+        builder = SheetBuilderMock("sheet_name")
+        builder._repos = {"repo1": repo}
+        builder._repo_names = ("repo1",)
+        builder._last_issue_updates = {"repo1": (DATE_, "old_url")}
+
+        with mock.patch.object(
+            builder.prs_index, "fetch_closed_prs", return_value=([], None)
+        ):
+            with mock.patch(
+                "snapshots.issue_snapshot", side_effect=lambda issue: issue
+            ):
+                result = builder._fetch_repo("repo1")
+
+        self.assertEqual(
+            result, ("repo1", {"issue_url": issue}, [], None, (NEW_DATE, "issue_url"))
+        )
+        self.assertEqual(builder._last_issue_updates["repo1"], (DATE_, "old_url"))
+        self.assertEqual(builder._issues_index, {})
+
+    def test_fetch_repo_first_update_pages(self):
+        """Check that pages are read in parallel on the first update."""
+        issue = mock.Mock(
+            updated_at=datetime.datetime(2020, 6, 5), html_url="url", pull_request=None
+        )
+        issues = mock.Mock(totalCount=1)
+        repo = mock.Mock(full_name="repo1", get_issues=mock.Mock(return_value=issues))
+
+        builder = SheetBuilderMock("sheet_name")
+        builder._repos = {"repo1": repo}
+        builder._repo_names = ("repo1",)
+        builder._page_workers = 4
+        builder._last_issue_updates = {"repo1": (datetime.datetime(1, 1, 1), "")}
+
+        with mock.patch.object(
+            builder.prs_index, "fetch_closed_prs", return_value=([], None)
+        ) as fetch_prs:
+            with mock.patch(
+                "sheet_builder.read_pages", return_value=iter([issue])
+            ) as read_pages:
+                with mock.patch(
+                    "snapshots.issue_snapshot", side_effect=lambda issue: issue
+                ):
+                    result = builder._fetch_repo("repo1")
+
+        fetch_prs.assert_called_once_with(repo, ("repo1",), 4)
+        read_pages.assert_called_once_with(issues, 1, 4)
+        self.assertEqual(result[1], {"url": issue})
+
+    def test_retrieve_updated_parallel(self):
+        """Check that parallel fetching results are merged in the config order."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        REPOS = ("repo1", "repo2", "repo3")
+
+        def fetch_repo(repo_name):
+            # the first repo finishes the last
+            time.sleep(0.05 if repo_name == "repo1" else 0)
+            return (
+                repo_name,
+                {repo_name + "_issue": repo_name},
+                [("url", repo_name, "Closes #1")],
+                DATE_,
+                (DATE_, repo_name + "_issue"),
+            )
+
+        builder = SheetBuilderMock("sheet_name")
+        builder.reload_config({"repo_names": dict.fromkeys(REPOS), "fetch_workers": 3})
+        builder._last_issue_updates = {}
+
+        with mock.patch.object(builder, "_fetch_repo", side_effect=fetch_repo):
+            with mock.patch.object(builder.prs_index, "merge") as merge_mock:
+                with mock.patch("sheet_builder.save_update_stamps"):
+                    with mock.patch.object(builder.prs_index, "save_updates"):
+                        with mock.patch.object(builder, "_save_snapshots"):
+                            issues = builder.retrieve_updated()
+
+        self.assertEqual(list(issues.keys()), [r + "_issue" for r in REPOS])
+        merge_mock.assert_has_calls(
+            [mock.call(r, [("url", r, "Closes #1")], DATE_) for r in REPOS]
+        )
+        for repo_name in REPOS:
+            self.assertEqual(
+                builder._last_issue_updates[repo_name], (DATE_, repo_name + "_issue")
+            )
+        self.assertEqual(builder.get_from_index("repo2_issue"), "repo2")
+
+    def test_fetch_repo_graphql(self):
+        """Check reading repo with GraphQL fetcher."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        NEW_DATE = datetime.datetime(2020, 6, 5)
+
+        pull = mock.Mock(updated_at=NEW_DATE, body="Closes #1")
+        issue = mock.Mock(updated_at=NEW_DATE, html_url="issue_url")
+
+        builder = SheetBuilderMock("sheet_name")
+        builder._repo_names = ("org/repo1",)
+        builder._last_issue_updates = {"org/repo1": (DATE_, "old_url")}
+        builder._graphql = mock.Mock(
+            fetch_pulls=mock.Mock(return_value=[pull]),
+            fetch_issues=mock.Mock(return_value=[issue]),
+        )
+
+        with mock.patch.object(builder.prs_index, "last_update", return_value=DATE_):
+            result = builder._fetch_repo_graphql("org/repo1")
+
+        builder._graphql.fetch_pulls.assert_called_once_with("org/repo1", DATE_)
+        builder._graphql.fetch_issues.assert_called_once_with("org/repo1", DATE_)
+        self.assertEqual(
+            result,
+            (
+                "org/repo1",
+                {"issue_url": issue},
+                [("https://github.com/org/repo1", pull, "Closes #1")],
+                NEW_DATE,
+                (NEW_DATE, "issue_url"),
+            ),
+        )
+        # body is not kept after links were found
+        self.assertIsNone(pull.body)
+
+    def test_fetch_counted_rate_limit(self):
+        """Check that repo is deferred when rate limit is exceeded."""
+        builder = SheetBuilderMock("sheet_name")
+        fetch = mock.Mock(side_effect=github.RateLimitExceededException(403, {}))
+
+        with mock.patch.object(builder._budget, "defer") as defer_mock:
+            self.assertIsNone(builder._fetch_counted(fetch, "repo1"))
+            defer_mock.assert_called_once_with("repo1")
+
+    def test_retrieve_updated_repo_error(self):
+        """Check that a failed repo doesn't break the other repos update."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        REPOS = ("repo1", "repo2", "repo3")
+
+        def fetch_repo(repo_name):
+            if repo_name == "repo2":
+                raise github.UnknownObjectException(404, {}, {})
+            return (repo_name, {repo_name + "_issue": repo_name}, [], DATE_, None)
+
+        builder = SheetBuilderMock("sheet_name")
+        builder.reload_config({"repo_names": dict.fromkeys(REPOS)})
+        builder._last_issue_updates = {}
+
+        with mock.patch.object(builder, "_fetch_repo", side_effect=fetch_repo):
+            with mock.patch("sheet_builder.save_update_stamps") as save_mock:
+                with mock.patch.object(builder.prs_index, "save_updates"):
+                    with mock.patch.object(builder, "_save_snapshots"):
+                        with mock.patch("logging.exception"):
+                            issues = builder.retrieve_updated()
+
+        self.assertEqual(list(issues.keys()), ["repo1_issue", "repo3_issue"])
+        # the failed repo will be read from scratch next time
+        self.assertEqual(builder._last_issue_updates["repo2"][1], "")
+        save_mock.assert_any_call(
+            "last_issue_updates", "sheet_name", builder._last_issue_updates
+        )
+
+    def test_retrieve_updated_deferred_repo(self):
+        """Check that issues of a repo deferred on the first update can be read."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        URL = "https://github.com/org/repo2/issues/1"
+
+        builder = SheetBuilderMock("sheet_name")
+        builder.reload_config({"repo_names": dict.fromkeys(("org/repo1", "org/repo2"))})
+        builder._last_issue_updates = {}
+
+        with mock.patch.object(
+            builder._budget, "plan", return_value=["org/repo1"]
+        ), mock.patch.object(
+            builder,
+            "_fetch_repo",
+            return_value=("org/repo1", {}, [], DATE_, (DATE_, "")),
+        ), mock.patch(
+            "sheet_builder.save_update_stamps"
+        ), mock.patch.object(
+            builder.prs_index, "save_updates"
+        ), mock.patch.object(
+            builder._budget, "save"
+        ):
+            builder.retrieve_updated()
+
+        issue = IssueSnapshot(
+            "org/repo2", 1, "Title", None, "open", [], [], DATE_, DATE_, None
+        )
+        repo = mock.Mock()
+        repo.get_issue.return_value = issue
+        builder._repos["org/repo2"] = repo
+
+        self.assertEqual(builder.read_issue(URL), issue)
+        self.assertEqual(builder._last_issue_updates["org/repo2"], (DATE_, URL))
+
+    def test_fetch_counted(self):
+        """Check that repo reading cost is recorded."""
+        builder = SheetBuilderMock("sheet_name")
+        fetch = mock.Mock(return_value="result")
+
+        with mock.patch("transport.requests_count", side_effect=(3, 7)):
+            with mock.patch.object(builder._budget, "record") as record_mock:
+                self.assertEqual(builder._fetch_counted(fetch, "repo1"), "result")
+                record_mock.assert_called_once_with("repo1", 4)
+
+    def test_hydrate(self):
+        """Check that hydrated issues are read without requests."""
+        DATE_ = datetime.datetime(2020, 6, 1)
+        issue = IssueSnapshot(
+            "org/repo1", 1, "Title", "", "open", [], [], DATE_, DATE_, None
+        )
+
+        builder = SheetBuilderMock("sheet_name")
+        builder._repo_names = ("org/repo1",)
+        builder._last_issue_updates = {
+            "org/repo1": (datetime.datetime(2020, 6, 3), "url")
+        }
+        builder._fetch_engine = "graphql"
+        builder._graphql = mock.Mock(
+            fetch_issues_by_numbers=mock.Mock(return_value={1: issue, 2: None})
+        )
+
+        builder.hydrate(
+            (
+                "https://github.com/org/repo1/issues/1",
+                "https://github.com/org/repo1/issues/2",
+                "https://github.com/org/repo2/issues/3",
+            )
+        )
+        builder._graphql.fetch_issues_by_numbers.assert_called_once_with(
+            "org/repo1", {1: None, 2: None}.keys()
+        )
+
+        self.assertIs(
+            builder.read_issue("https://github.com/org/repo1/issues/1"), issue
+        )
+        self.assertIs(builder.get_from_index(issue.html_url), issue)
+        with self.assertRaises(github.UnknownObjectException):
+            builder.read_issue("https://github.com/org/repo1/issues/2")
+
+    def test_read_issues_by_numbers_listing(self):
+        """Check reading close issues by listing the repo issues."""
+        issues = [mock.Mock(number=num) for num in (9, 8, 7, 6, 5, 4)]
+        repo = mock.Mock(get_issues=mock.Mock(return_value=issues))
+
+        builder = SheetBuilderMock("sheet_name")
+        with mock.patch.object(builder, "_newest_issue_number", return_value=9):
+            result = builder._read_issues_by_numbers(repo, (8, 5, 3))
+
+        self.assertEqual(result, {8: issues[1], 5: issues[4], 3: None})
+        repo.get_issue.assert_not_called()
+
+    def test_read_issues_by_numbers_old(self):
+        """Check that old issues of a busy repo are read one by one."""
+        NUMBERS = tuple(range(100, 131))
+        repo = mock.Mock(url="https://api.github.com/repos/org/repo")
+
+        builder = SheetBuilderMock("sheet_name")
+        with mock.patch.object(
+            builder._gh_client._Github__requester,
+            "requestJsonAndCheck",
+            return_value=({}, [{"number": 5000}]),
+        ) as request_mock:
+            result = builder._read_issues_by_numbers(repo, NUMBERS)
+
+        self.assertEqual(list(result), list(NUMBERS))
+        self.assertEqual(request_mock.call_args[1]["parameters"]["per_page"], 1)
+        repo.get_issues.assert_not_called()
+        self.assertEqual(repo.get_issue.call_count, len(NUMBERS))
+
+    def test_read_issues_by_numbers_separately(self):
+        """Check reading distant issues one by one."""
+        issue = mock.Mock(number=1)
+        repo = mock.Mock(
+            get_issue=mock.Mock(
+                side_effect=(issue, github.UnknownObjectException(404, {}))
+            )
+        )
+
+        builder = SheetBuilderMock("sheet_name")
+        result = builder._read_issues_by_numbers(repo, (1, 1000))
+
+        self.assertEqual(result, {1: issue, 1000: None})
+        repo.get_issues.assert_not_called()
+
+    def test_restore_snapshots(self):
+        """Check that issues saved on the previous run are indexed."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        URL = "https://github.com/org/repo1/issues/1"
+        record = ("org/repo1", 1, "Title", "open", ("bug",), (), DATE_, DATE_, None)
+
+        with mock.patch(
+            "sheet_builder.load_update_stamps",
+            side_effect=lambda field, name: {URL: record}
+            if field == "issue_snapshots"
+            else {},
+        ):
+            builder = SheetBuilderMock("sheet_name")
+
+        builder._repo_names = ("org/repo1",)
+        self.assertEqual(builder.get_from_index(URL).labels[0].name, "bug")
+
+        with mock.patch("sheet_builder.save_update_stamps") as save_mock:
+            # snapshots are not saved, if they didn't change
+            builder._save_snapshots()
+            save_mock.assert_not_called()
+
+            builder._index_changed = True
+            builder._save_snapshots()
+            save_mock.assert_called_once_with(
+                "issue_snapshots", "sheet_name", {URL: record}
+            )
+
+    def test_restored_snapshots_checked(self):
+        """Check that restored issues are checked for existence on hydration."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        URL1 = "https://github.com/org/repo1/issues/1"
+        URL2 = "https://github.com/org/repo1/issues/2"
+        records = {
+            URL1: ("org/repo1", 1, "Title", "open", (), (), DATE_, DATE_, None),
+            URL2: ("org/repo1", 2, "Title", "open", (), (), DATE_, DATE_, None),
+        }
+
+        with mock.patch(
+            "sheet_builder.load_update_stamps",
+            side_effect=lambda field, name: dict(records)
+            if field == "issue_snapshots"
+            else {},
+        ):
+            builder = SheetBuilderMock("sheet_name")
+
+        builder._repo_names = ("org/repo1",)
+        builder._last_issue_updates = {"org/repo1": (DATE_, URL1)}
+        issue = IssueSnapshot(
+            "org/repo1", 1, "New", None, "open", [], [], DATE_, DATE_, None
+        )
+
+        with mock.patch.object(builder, "_get_repo"):
+            with mock.patch.object(
+                builder,
+                "_read_issues_by_numbers",
+                return_value={1: issue, 2: None},
+            ) as read_mock:
+                builder.hydrate((URL1, URL2))
+                read_mock.assert_called_once()
+
+        self.assertEqual(builder.read_issue(URL1).title, "New")
+        # deleted issue
+        with self.assertRaises(github.UnknownObjectException):
+            builder.read_issue(URL2)
+        self.assertIsNone(builder.get_from_index(URL2))
+
+        # checked issues are not read again
+        builder.hydrate((URL1,))
+        self.assertEqual(builder._hydrated, {})
+
+    def test_check_restored(self):
+        """Check that restored issues are checked in bulk once their repo is read."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        URL1 = "https://github.com/org/repo1/issues/1"
+        URL2 = "https://github.com/org/repo1/issues/2"
+        URL3 = "https://github.com/org/repo2/issues/3"
+        URL4 = "https://github.com/org/old/issues/4"
+        records = {
+            url: (
+                "/".join(url.split("/")[3:5]),
+                int(url[-1]),
+                "Title",
+                "open",
+                (),
+                (),
+                DATE_,
+                DATE_,
+                None,
+            )
+            for url in (URL1, URL2, URL3, URL4)
+        }
+
+        with mock.patch(
+            "sheet_builder.load_update_stamps",
+            side_effect=lambda field, name: dict(records)
+            if field == "issue_snapshots"
+            else {},
+        ):
+            builder = SheetBuilderMock("sheet_name")
+
+        builder._repo_names = ("org/repo1", "org/repo2")
+        issue = IssueSnapshot(
+            "org/repo1", 1, "New", None, "open", [], [], DATE_, DATE_, None
+        )
+
+        with mock.patch.object(builder, "_get_repo"):
+            with mock.patch.object(
+                builder,
+                "_read_issues_by_numbers",
+                return_value={1: issue, 2: None},
+            ) as read_mock:
+                builder._check_restored(["org/repo1"])
+                read_mock.assert_called_once()
+
+        # the existing issue is taken without requests
+        self.assertIs(builder.read_issue(URL1), issue)
+        # the deleted one is dropped
+        self.assertIsNone(builder.get_from_index(URL2))
+        with self.assertRaises(github.UnknownObjectException):
+            builder.read_issue(URL2)
+
+        # issues of the deferred repo are still to be checked,
+        # issues of the repos, which are not tracked, are not
+        self.assertEqual(builder._restored, {URL3})
+        self.assertTrue(builder._index_changed)
+
+    def test_probe_changes(self):
+        """Check probing repos events feed."""
+        DATE_ = datetime.datetime(2020, 6, 3)
+        builder = SheetBuilderMock("sheet_name")
+        builder.reload_config(
+            {"repo_names": {"org/repo1": "1", "org/repo2": "2"}, "probe_changes": True}
+        )
+        builder._last_issue_updates = {
+            "org/repo1": (DATE_, "url"),
+            "org/repo2": (DATE_, ""),
+        }
+        builder._events_etags = {"org/repo1": '"old"'}
+
+        requester = mock.Mock()
+        builder._gh_client._Github__requester = requester
+
+        # repo was never read
+        self.assertTrue(builder._probe_changes("org/repo2"))
+        requester.requestJsonAndCheck.assert_not_called()
+
+        # 304 Not Modified
+        requester.requestJsonAndCheck.return_value = ({"etag": '"old"'}, None)
+        self.assertFalse(builder._probe_changes("org/repo1"))
+        requester.requestJsonAndCheck.assert_called_once_with(
+            "GET",
+            "/repos/org/repo1/events",
+            parameters={"per_page": 1},
+            headers={"If-None-Match": '"old"'},
+        )
+
+        # response served from the HTTP cache
+        requester.requestJsonAndCheck.return_value = ({"etag": '"old"'}, [{}])
+        self.assertFalse(builder._probe_changes("org/repo1"))
+
+        requester.requestJsonAndCheck.return_value = ({"etag": '"new"'}, [{}])
+        self.assertTrue(builder._probe_changes("org/repo1"))
+        self.assertEqual(builder._new_etags, {"org/repo1": '"new"'})
+
+    def test_fetch_counted_not_changed(self):
+        """Check that not changed repo isn't read."""
+        builder = SheetBuilderMock("sheet_name")
+        fetch = mock.Mock()
+
+        with mock.patch.object(builder, "_probe_changes", return_value=False):
+            self.assertIsNone(builder._fetch_counted(fetch, "repo1"))
+
+        fetch.assert_not_called()
+        self.assertEqual(builder._skipped_repos, {"repo1"})
@@ -0,0 +1,107 @@
+"""Unit tests for issue and PR snapshots."""
+import datetime
+import unittest
+import github
+import snapshots
+
+DATE_ = datetime.datetime(2020, 6, 3, 10)
+
+
+def build_issue(number, labels):
+    """Build PyGithub issue without requests."""
+    return github.Issue.Issue(
+        github.Github()._Github__requester,
+        {},
+        {
+            "html_url": "https://github.com/org/repo/issues/" + str(number),
+            "number": number,
+            "title": "Title",
+            "body": "Body",
+            "state": "open",
+            "labels": [{"name": name} for name in labels],
+            "assignees": [{"login": "IlyaFaer"}],
+            "created_at": "2020-06-03T10:00:00Z",
+            "updated_at": "2020-06-03T10:00:00Z",
+            "closed_at": None,
+        },
+        completed=True,
+    )
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_issue_snapshot(self):
+        """Check building issue snapshot from PyGithub object."""
+        snapshot = snapshots.issue_snapshot(build_issue(1, ["type: bug"]))
+
+        self.assertEqual(snapshot.html_url, "https://github.com/org/repo/issues/1")
+        self.assertEqual(snapshot.repository.full_name, "org/repo")
+        self.assertEqual(snapshot.title, "Title")
+        self.assertIsNone(snapshot.body)
+        self.assertEqual(snapshot.labels[0].name, "type: bug")
+        self.assertEqual(snapshot.assignees[0].login, "IlyaFaer")
+        self.assertEqual(snapshot.created_at.replace(tzinfo=None), DATE_)
+        self.assertIsNone(snapshot.closed_at)
+        self.assertIsNone(snapshot.pull_request)
+        self.assertIs(snapshots.issue_snapshot(snapshot), snapshot)
+
+    def test_shared_objects(self):
+        """Check that snapshots share labels, users and repos."""
+        first = snapshots.issue_snapshot(build_issue(1, ["type: bug"]))
+        second = snapshots.issue_snapshot(build_issue(2, ["api: core", "type: bug"]))
+
+        self.assertIs(first.repository, second.repository)
+        self.assertIs(first.labels[0], second.labels[1])
+        self.assertIs(first.assignees[0], second.assignees[0])
+        with self.assertRaises(AttributeError):
+            first.comments = 3
+
+    def test_pull_snapshot(self):
+        """Check building PR snapshot from PyGithub object."""
+        pull = github.PullRequest.PullRequest(
+            github.Github()._Github__requester,
+            {},
+            {
+                "html_url": "https://github.com/org/repo/pull/5",
+                "number": 5,
+                "body": "Closes #1",
+                "state": "closed",
+                "merged_at": "2020-06-03T10:00:00Z",
+                "user": {"login": "IlyaFaer"},
+                "created_at": "2020-06-03T10:00:00Z",
+                "updated_at": "2020-06-03T10:00:00Z",
+            },
+            completed=True,
+        )
+        snapshot = snapshots.pull_snapshot(pull)
+
+        self.assertEqual(snapshot.html_url, "https://github.com/org/repo/pull/5")
+        self.assertTrue(snapshot.merged)
+        self.assertEqual(snapshot.user.login, "IlyaFaer")
+
+    def test_pull_snapshot_drops_body(self):
+        """Check that PR snapshots are indexed without body."""
+        pull = snapshots.PullSnapshot(
+            "org/repo",
+            5,
+            "Closes #1",
+            "closed",
+            True,
+            "IlyaFaer",
+            datetime.datetime(2020, 6, 3),
+            datetime.datetime(2020, 6, 3),
+        )
+        snapshot = snapshots.pull_snapshot(pull)
+
+        self.assertIsNone(snapshot.body)
+        self.assertEqual(snapshot.html_url, pull.html_url)
+        self.assertTrue(snapshot.merged)
+        # the given snapshot is not changed
+        self.assertEqual(pull.body, "Closes #1")
+
+    def test_record(self):
+        """Check that records keep issue data."""
+        snapshot = snapshots.issue_snapshot(build_issue(1, ["type: bug"]))
+        restored = snapshots.from_record(snapshots.to_record(snapshot))
+
+        self.assertEqual(snapshots.to_record(restored), snapshots.to_record(snapshot))
+        self.assertEqual(restored.html_url, snapshot.html_url)
@@ -56,7 +56,8 @@ class TestSpreadsheet(unittest.TestCase):
                 with mock.patch(
                     "spreadsheet.Spreadsheet._init_existing_sheets", return_value=SHEETS
                 ) as init_sheets_mock:
-                    doc = spreadsheet.Spreadsheet(CONFIG)
+                    with mock.patch("spreadsheet.ReposData"):
+                        doc = spreadsheet.Spreadsheet(CONFIG)
 
                     init_sheets_mock.assert_called_once()
                 create_mock.assert_called_once()
@@ -81,7 +82,8 @@ class TestSpreadsheet(unittest.TestCase):
                 with mock.patch(
                     "spreadsheet.Spreadsheet._init_existing_sheets", return_value=SHEETS
                 ) as init_sheets_mock:
-                    doc = spreadsheet.Spreadsheet(CONFIG, SPREADSHEET_ID)
+                    with mock.patch("spreadsheet.ReposData"):
+                        doc = spreadsheet.Spreadsheet(CONFIG, SPREADSHEET_ID)
                     init_sheets_mock.assert_called_once()
                 create_ss.assert_not_called()
             auth_mock.assert_called_once()
@@ -200,12 +202,75 @@ class TestSpreadsheet(unittest.TestCase):
         sheet2 = SheetMock("sheet2", SPREADSHEET_ID)
 
         ss_mock.sheets = {"sheet1": sheet1, "sheet2": sheet2}
+        ss_mock._repos_data = mock.Mock()
         with mock.patch("sheet.Sheet.update") as update_sheet:
             ss_mock.update_all_sheets()
 
-            # no spreadsheet resource used in
-            # this test, so args will be None
-            update_sheet.assert_has_calls((mock.call(None, {}), mock.call(None, {})))
+            ss_mock._repos_data.update.assert_called_once_with(CONFIG.SHEETS)
+
+            # no spreadsheet resource used in this test, so
+            # args will be None, and sheets will read themselves
+            update_sheet.assert_has_calls(
+                (mock.call(None, {}, None), mock.call(None, {}, None))
+            )
+
+    def test_update_all_sheets_batch_read(self):
+        """Check that all the sheets are read with a single request."""
+        ss_mock = SpreadsheetMock(CONFIG)
+        sheet1 = SheetMock("sheet1", SPREADSHEET_ID)
+        sheet2 = SheetMock("sheet2", SPREADSHEET_ID)
+
+        ss_mock.sheets = {"sheet1": sheet1, "sheet2": sheet2}
+        ss_mock._archive = mock.Mock(is_new=False)
+        ss_mock._archive.name = "archive"
+        ss_mock._repos_data = mock.Mock()
+        ss_mock._ss_resource = mock.Mock()
+        batch_get = ss_mock._ss_resource.values.return_value.batchGet
+        batch_get.return_value.execute.return_value = {
+            "valueRanges": [{"values": [["Issue"]]}, {}, {"values": [["Archived"]]}]
+        }
+
+        with mock.patch("sheet.Sheet.update") as update_sheet:
+            ss_mock.update_all_sheets()
+
+        batch_get.assert_called_once_with(
+            spreadsheetId=SPREADSHEET_ID,
+            ranges=["sheet1", "sheet2", "archive"],
+            valueRenderOption="FORMULA",
+        )
+        update_sheet.assert_has_calls(
+            (
+                mock.call(ss_mock._ss_resource, {}, [["Issue"]]),
+                mock.call(ss_mock._ss_resource, {}, []),
+            )
+        )
+        ss_mock._archive.update.assert_called_once_with(
+            ss_mock._ss_resource, {}, [["Archived"]]
+        )
+
+    def test_update_dirty_sheets(self):
+        """Update only sheets affected by webhook events."""
+        config = ConfigMock()
+        config.SHEETS = {
+            "sheet1": {"repo_names": {"org/repo1": "repo1"}},
+            "sheet2": {"repo_names": {"org/repo2": "repo2"}},
+        }
+        ss_mock = SpreadsheetMock(config)
+        sheet1 = SheetMock("sheet1", SPREADSHEET_ID)
+        sheet2 = SheetMock("sheet2", SPREADSHEET_ID)
+
+        ss_mock.sheets = {"sheet1": sheet1, "sheet2": sheet2}
+        ss_mock._repos_data = mock.Mock()
+        ss_mock._webhooks = mock.Mock(
+            apply_events=mock.Mock(return_value={"org/repo2"})
+        )
+        with mock.patch.object(sheet1, "update") as update1:
+            with mock.patch.object(sheet2, "update") as update2:
+                ss_mock.update_dirty_sheets()
+
+        ss_mock._webhooks.apply_events.assert_called_once_with(ss_mock._repos_data)
+        update1.assert_not_called()
+        update2.assert_called_once_with(None, {}, None)
 
     def test_reload_config(self):
         """Test reloading the spreadsheet configurations."""
@@ -0,0 +1,157 @@
+"""Unit tests for adaptive concurrency controllers."""
+import logging
+import threading
+import time
+import unittest
+import unittest.mock as mock
+import httplib2
+import requests
+from googleapiclient.errors import HttpError
+import throttle
+import transport
+
+logging.disable(logging.WARNING)
+
+
+def throttled_error():
+    """Build Sheets API quota error."""
+    return HttpError(httplib2.Response({"status": 429}), b"Quota exceeded")
+
+
+class TestAIMDController(unittest.TestCase):
+    def test_increase(self):
+        """Check that the limit grows by one per window of healthy calls."""
+        controller = throttle.AIMDController("API", initial=2, max_limit=3)
+
+        for _ in range(2):
+            controller.call(lambda: "resp", lambda resp: None)
+        self.assertEqual(controller.limit, 2)
+
+        controller.call(lambda: "resp", lambda resp: None)
+        self.assertEqual(controller.limit, 3)
+
+        for _ in range(10):
+            controller.call(lambda: "resp", lambda resp: None)
+        self.assertEqual(controller.limit, 3)
+
+    def test_throttled(self):
+        """Check that throttled calls are retried with decreased limit."""
+        controller = throttle.AIMDController("API", initial=8, backoff=0.01)
+        responses = ["throttled", "throttled", "resp"]
+
+        start = time.time()
+        result = controller.call(
+            lambda: responses.pop(0), lambda resp: 0 if resp == "throttled" else None
+        )
+
+        self.assertEqual(result, "resp")
+        self.assertEqual(controller.limit, 2)
+        self.assertEqual(controller.metrics()["throttles"], 2)
+        self.assertEqual(controller.metrics()["calls"], 3)
+        # exponential backoff: 0.01 + 0.02
+        self.assertGreaterEqual(time.time() - start, 0.03)
+
+    def test_retries_exhausted(self):
+        """Check that the last error is raised, when retries are exhausted."""
+        controller = throttle.AIMDController("API", backoff=0, retries=2)
+        func = mock.Mock(side_effect=[throttled_error() for _ in range(3)])
+
+        with self.assertRaises(HttpError):
+            controller.call(func, throttle.sheets_retry_after)
+
+        self.assertEqual(func.call_count, 3)
+
+    def test_concurrency_limit(self):
+        """Check that concurrent calls don't exceed the limit."""
+        controller = throttle.AIMDController("API", initial=2, max_limit=2)
+        lock = threading.Lock()
+        active = [0, 0]
+
+        def func():
+            with lock:
+                active[0] += 1
+                active[1] = max(active)
+            time.sleep(0.01)
+            with lock:
+                active[0] -= 1
+
+        threads = [
+            threading.Thread(target=controller.call, args=(func, lambda resp: None))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(active[1], 2)
+
+    def test_call_connection_error(self):
+        """Check that connection errors of GitHub calls are re-raised."""
+        controller = throttle.AIMDController("GitHub", retries=3)
+        func = mock.Mock(side_effect=[requests.ConnectionError("boom")])
+
+        with self.assertRaises(requests.ConnectionError):
+            controller.call(func, throttle.github_retry_after)
+
+        self.assertEqual(func.call_count, 1)
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_github_retry_after(self):
+        """Check GitHub secondary rate limit detection."""
+        self.assertIsNone(
+            throttle.github_retry_after(transport.Response(200, {}, "{}"))
+        )
+        self.assertEqual(
+            throttle.github_retry_after(
+                transport.Response(403, {"retry-after": "30"}, "{}")
+            ),
+            30,
+        )
+        self.assertEqual(
+            throttle.github_retry_after(
+                transport.Response(
+                    403, {}, '{"message": "You have exceeded a secondary rate limit"}'
+                )
+            ),
+            0,
+        )
+        # primary rate limit is exhausted
+        self.assertIsNone(
+            throttle.github_retry_after(
+                transport.Response(403, {"x-ratelimit-remaining": "0"}, "{}")
+            )
+        )
+
+    def test_sheets_retry_after(self):
+        """Check Sheets API quota errors detection."""
+        self.assertIsNone(throttle.sheets_retry_after({"values": []}))
+        self.assertIsNone(
+            throttle.sheets_retry_after(
+                HttpError(httplib2.Response({"status": 400}), b"Bad request")
+            )
+        )
+        self.assertEqual(throttle.sheets_retry_after(throttled_error()), 0)
+
+
+class TestSheetsResource(unittest.TestCase):
+    def test_execute(self):
+        """Check that requests are executed through the controller."""
+        controller = throttle.AIMDController("Sheets", backoff=0)
+        request = mock.Mock(spec=["execute"])
+        request.execute.side_effect = [throttled_error(), {"values": [["1"]]}]
+        values = mock.Mock(spec=["get"])
+        values.get.return_value = request
+        resource = mock.Mock(spec=["values"])
+        resource.values.return_value = values
+
+        governor = mock.Mock()
+        proxy = throttle.SheetsResource(resource, controller, governor)
+        resp = proxy.values().get(spreadsheetId="ss_id", range="Sheet").execute()
+
+        self.assertEqual(resp, {"values": [["1"]]})
+        self.assertEqual(controller.metrics()["throttles"], 1)
+        values.get.assert_called_once_with(spreadsheetId="ss_id", range="Sheet")
+        # the retry is counted against the quota too
+        governor.acquire.assert_has_calls([mock.call("get"), mock.call("get")])
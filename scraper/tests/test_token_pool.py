@@ -0,0 +1,90 @@
+"""Unit tests for GitHub credentials pool."""
+import datetime
+import time
+import unittest
+import unittest.mock as mock
+import token_pool
+
+
+def limit_headers(remaining, limit=5000, reset=None, resource="core"):
+    """Build rate limit response headers."""
+    return {
+        "x-ratelimit-remaining": str(remaining),
+        "x-ratelimit-limit": str(limit),
+        "x-ratelimit-reset": str(reset or int(time.time()) + 3600),
+        "x-ratelimit-resource": resource,
+    }
+
+
+class TestTokenPool(unittest.TestCase):
+    def test_choose_unused(self):
+        """Check that never used tokens are chosen first."""
+        pool = token_pool.TokenPool(["token1", "token2"])
+        pool.update(0, limit_headers(4000))
+
+        self.assertEqual(pool.choose(), (1, "token2"))
+
+    def test_choose_most_remaining(self):
+        """Check that the token with the most remaining requests is chosen."""
+        pool = token_pool.TokenPool(["token1", "token2", "token3"])
+        pool.update(0, limit_headers(100))
+        pool.update(1, limit_headers(3000))
+        pool.update(2, limit_headers(2999))
+
+        self.assertEqual(pool.choose(), (1, "token2"))
+        # the chosen token is charged with the request
+        self.assertEqual(pool.choose(), (1, "token2"))
+        self.assertEqual(pool.choose(), (2, "token3"))
+
+    def test_choose_exhausted(self):
+        """Check that exhausted tokens are used only after reset."""
+        now = int(time.time())
+        pool = token_pool.TokenPool(["token1", "token2"])
+        pool.update(0, limit_headers(0, reset=now + 100))
+        pool.update(1, limit_headers(0, reset=now + 10))
+
+        # all of the tokens are exhausted - the first to reset is chosen
+        self.assertEqual(pool.choose(), (1, "token2"))
+
+        pool.update(0, limit_headers(0, reset=now - 1))
+        self.assertEqual(pool.choose(), (0, "token1"))
+
+    def test_choose_resource(self):
+        """Check that tokens are rotated by the resource rate limit."""
+        pool = token_pool.TokenPool(["token1", "token2"])
+        pool.update(0, limit_headers(10))
+        pool.update(1, limit_headers(4000))
+        pool.update(0, limit_headers(4000, resource="graphql"))
+        pool.update(1, limit_headers(10, resource="graphql"))
+
+        self.assertEqual(pool.choose("core")[0], 1)
+        self.assertEqual(pool.choose("graphql")[0], 0)
+
+    def test_rate_limit(self):
+        """Check that the pool rate limit is the total of the tokens limits."""
+        now = int(time.time())
+        pool = token_pool.TokenPool(["token1", "token2"])
+        pool.update(0, limit_headers(100, reset=now + 100))
+        self.assertIsNone(pool.rate_limit())
+
+        pool.update(1, limit_headers(0, reset=now - 1))
+        self.assertEqual(pool.rate_limit(), (5100, 10000, now + 100))
+
+    def test_app_token(self):
+        """Check that App installation token is renewed before expiration."""
+        expires_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=30)
+        integration = mock.Mock()
+        integration.get_access_token.return_value = mock.Mock(
+            token="app_token", expires_at=expires_at
+        )
+
+        with mock.patch("github.GithubIntegration", return_value=integration):
+            app_token = token_pool.AppToken(1, "key", 2)
+
+        pool = token_pool.TokenPool([app_token])
+        self.assertEqual(pool.choose(), (0, "app_token"))
+        self.assertEqual(pool.choose(), (0, "app_token"))
+
+        # token expires in less than a minute - it's renewed every time
+        self.assertEqual(integration.get_access_token.call_count, 2)
+        integration.get_access_token.assert_called_with(2)
@@ -0,0 +1,106 @@
+"""Unit tests for GitHub HTTP transport."""
+import unittest
+import unittest.mock as mock
+import github
+import token_pool
+import transport
+
+HEADERS = {
+    "x-ratelimit-remaining": "4990",
+    "x-ratelimit-limit": "5000",
+    "x-ratelimit-reset": "1591178400",
+}
+
+
+class TestTransport(unittest.TestCase):
+    def test_connection(self):
+        """Check that connection sends the remembered request."""
+        cnx = transport.HTTPSConnection("api.github.com", timeout=10)
+        cnx.request("GET", "/repos/org/repo", None, {"Accept": "*/*"})
+
+        with mock.patch("transport.send") as send_mock:
+            cnx.getresponse()
+
+        send_mock.assert_called_once_with(
+            "GET", "https://api.github.com/repos/org/repo", None, {"Accept": "*/*"}, 10
+        )
+
+    def test_rate_limits(self):
+        """Check that rate limits are remembered from responses."""
+        resp = transport.Response(200, dict(HEADERS), "{}")
+
+        with mock.patch("transport._request", return_value=resp):
+            with mock.patch.dict("transport.rate_limits", clear=True):
+                transport.send("GET", "https://api.github.com/", None, {})
+                self.assertEqual(
+                    transport.rate_limits, {"core": (4990, 5000, 1591178400)}
+                )
+
+                resp.headers["x-ratelimit-resource"] = "graphql"
+                transport.send("POST", "https://api.github.com/graphql", "{}", {})
+                self.assertEqual(
+                    transport.rate_limits["graphql"], (4990, 5000, 1591178400)
+                )
+
+    def test_token_pool(self):
+        """Check that requests without credentials are signed by the pool."""
+        resp = transport.Response(200, dict(HEADERS), "{}")
+        pool = token_pool.TokenPool(["token1"])
+
+        with mock.patch("transport._request", return_value=resp) as request:
+            with mock.patch("transport.token_pool", pool):
+                with mock.patch.dict("transport.rate_limits", clear=True):
+                    transport.send("GET", "https://api.github.com/", None, {})
+                    # rate limit reset time has passed
+                    self.assertEqual(
+                        transport.rate_limits, {"core": (5000, 5000, 1591178400)}
+                    )
+
+                    transport.send(
+                        "GET",
+                        "https://api.github.com/",
+                        None,
+                        {"Authorization": "Bearer jwt"},
+                    )
+
+        self.assertEqual(
+            request.call_args_list[0][0][3]["Authorization"], "token token1"
+        )
+        self.assertEqual(request.call_args_list[1][0][3]["Authorization"], "Bearer jwt")
+
+    def test_completion_guard(self):
+        """Check that lazy completions are counted."""
+        transport.install()
+        requester = mock.Mock(
+            requestJsonAndCheck=mock.Mock(return_value=({}, {"title": "Title"}))
+        )
+        issue = github.Issue.Issue(
+            requester,
+            {},
+            {"url": "https://api.github.com/repos/org/repo/issues/1"},
+            completed=False,
+        )
+
+        with transport.completion_guard() as guard:
+            self.assertEqual(issue.title, "Title")
+            self.assertEqual(issue.title, "Title")
+
+        self.assertEqual(guard.completions, 1)
+        requester.requestJsonAndCheck.assert_called_once()
+
+    def test_completion_guard_strict(self):
+        """Check that strict guard raises on lazy completion."""
+        transport.install()
+        requester = mock.Mock()
+        issue = github.Issue.Issue(
+            requester,
+            {},
+            {"url": "https://api.github.com/repos/org/repo/issues/1"},
+            completed=False,
+        )
+
+        with self.assertRaises(transport.LazyCompletionError):
+            with transport.completion_guard(strict=True):
+                issue.title
+
+        requester.requestJsonAndCheck.assert_not_called()
@@ -1,6 +1,10 @@
 """Unit tests for scraper utils."""
 import logging
+import random
+import threading
+import time
 import unittest
+import transport
 import utils
 
 
@@ -19,6 +23,105 @@ class IssueMock:
         self.html_url = "https://github.com/org_name/repo_name/issues/123"
 
 
+class TestReadAhead(unittest.TestCase):
+    """Tests for read_ahead() iterator."""
+
+    def test_read_ahead(self):
+        """Check that all the items are read in order."""
+        self.assertEqual(list(utils.read_ahead(range(50), size=3)), list(range(50)))
+
+    def test_read_ahead_error(self):
+        """Check that reading errors are raised in the caller thread."""
+
+        def items():
+            yield 1
+            raise ValueError("Page read failed")
+
+        iterator = utils.read_ahead(items())
+        self.assertEqual(next(iterator), 1)
+        with self.assertRaises(ValueError):
+            next(iterator)
+
+    def test_read_ahead_stop(self):
+        """Check that reading stops, when the caller stops iterating."""
+        read = []
+        finished = threading.Event()
+
+        def items():
+            try:
+                for item in range(1000):
+                    read.append(item)
+                    yield item
+            finally:
+                finished.set()
+
+        for item in utils.read_ahead(items(), size=2):
+            if item == 5:
+                break
+
+        self.assertTrue(finished.wait(5))
+        self.assertLess(len(read), 10)
+
+    def test_read_ahead_requests_count(self):
+        """Check that requests are counted for the caller thread."""
+
+        def items():
+            transport.requests_counter()[0] += 2
+            yield 1
+
+        start_count = transport.requests_count()
+        list(utils.read_ahead(items()))
+        self.assertEqual(transport.requests_count() - start_count, 2)
+
+
+class PagesMock:
+    """Paginated list mock, reading pages with random delays."""
+
+    def __init__(self, items, per_page):
+        self._items = items
+        self._per_page = per_page
+        self.read_pages = []
+
+    def get_page(self, num):
+        time.sleep(random.random() / 100)
+        self.read_pages.append(num)
+        transport.requests_counter()[0] += 1
+        return self._items[num * self._per_page : (num + 1) * self._per_page]
+
+
+class TestReadPages(unittest.TestCase):
+    """Tests for read_pages() iterator."""
+
+    def test_read_pages(self):
+        """Check that pages read in parallel are yielded in order."""
+        pages = PagesMock(list(range(95)), 10)
+        self.assertEqual(list(utils.read_pages(pages, 95, workers=4)), list(range(95)))
+        self.assertEqual(sorted(pages.read_pages), list(range(10)))
+
+    def test_read_pages_single_page(self):
+        """Check that no threads are used for a single page list."""
+        pages = PagesMock(list(range(5)), 10)
+        self.assertEqual(list(utils.read_pages(pages, 5)), list(range(5)))
+        self.assertEqual(pages.read_pages, [0])
+
+    def test_read_pages_stop(self):
+        """Check that only a bounded number of pages is read ahead."""
+        pages = PagesMock(list(range(1000)), 10)
+        for item in utils.read_pages(pages, 1000, workers=2):
+            if item == 15:
+                break
+
+        # the first page, the current one and 2 * workers ahead
+        self.assertLessEqual(len(pages.read_pages), 6)
+
+    def test_read_pages_requests_count(self):
+        """Check that requests are counted for the caller thread."""
+        pages = PagesMock(list(range(50)), 10)
+        start_count = transport.requests_count()
+        list(utils.read_pages(pages, 50))
+        self.assertEqual(transport.requests_count() - start_count, 5)
+
+
 class TestBatchIterator(unittest.TestCase):
     """Tests for BatchIterator."""
 
@@ -31,6 +134,13 @@ class TestBatchIterator(unittest.TestCase):
         self.assertEqual(next(b_iter), [4, 5, 6])
         self.assertEqual(next(b_iter), [7, 8])
 
+    def test_batch_iterator_max_bytes(self):
+        """Check that batches are limited by the requests size."""
+        REQUESTS = [{"req": "a" * 10}, {"req": "b" * 10}, {"req": "c" * 40}, {}]
+
+        batches = list(utils.BatchIterator(REQUESTS, max_bytes=45))
+        self.assertEqual(batches, [REQUESTS[:2], [REQUESTS[2]], [REQUESTS[3]]])
+
 
 class TestUtilFunctions(unittest.TestCase):
     """Test util functions."""
@@ -62,6 +172,24 @@ class TestUtilFunctions(unittest.TestCase):
         )
         self.assertEqual(result, ["Closes test_org/test_repo#12"])
 
+    def test_match_keywords_all(self):
+        """Check matching all of the keywords occurrences."""
+        result = utils.try_match_keywords(
+            "Fixes: #12, closes Test_Org/test_repo#3 and RESOLVES test_org/test_repo#4."
+            " Towards #5, fixed #12. See #9, closes other_org/repo#1, prefixes #7",
+            ("test_org/test_repo",),
+        )
+        self.assertEqual(
+            result,
+            [
+                "Fixes #12",
+                "closes test_org/test_repo#3",
+                "RESOLVES test_org/test_repo#4",
+                "Towards #5",
+                "fixed #12",
+            ],
+        )
+
     def test_url_from_formula(self):
         """Check if getting URL from HYPERLINK formula is OK."""
         self.assertEqual(
@@ -0,0 +1,89 @@
+"""Unit tests for webhook events receiver."""
+import datetime
+import hashlib
+import hmac
+import os
+import unittest
+import requests
+import webhooks
+from mocks import ReposDataMock
+
+SECRET = "secret123"
+PAYLOADS_DIR = os.path.join(os.path.dirname(__file__), "webhook_payloads")
+ISSUE_URL = "https://github.com/org/repo/issues/12"
+
+
+def load_payload(name):
+    """Load recorded webhook payload."""
+    with open(os.path.join(PAYLOADS_DIR, name + ".json"), "rb") as payload_file:
+        return payload_file.read()
+
+
+class TestWebhookReceiver(unittest.TestCase):
+    def setUp(self):
+        self._receiver = webhooks.WebhookReceiver(SECRET, "127.0.0.1", 0)
+        self._receiver.start()
+
+    def tearDown(self):
+        self._receiver.stop()
+
+    def _replay(self, event, name, secret=SECRET):
+        """Send recorded payload to the receiver."""
+        body = load_payload(name)
+        signature = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+        return requests.post(
+            "http://127.0.0.1:{port}/".format(port=self._receiver.port),
+            data=body,
+            headers={
+                "X-GitHub-Event": event,
+                "X-Hub-Signature-256": "sha256=" + signature,
+                "Content-Type": "application/json",
+            },
+        )
+
+    def test_signature(self):
+        """Check that events with wrong signature are rejected."""
+        resp = self._replay("issues", "issues_labeled", secret="wrong")
+        self.assertEqual(resp.status_code, 403)
+
+        repos_data = ReposDataMock("ss_id")
+        repos_data._repo_names = ("org/repo",)
+        self.assertEqual(self._receiver.apply_events(repos_data), set())
+
+    def test_apply_events(self):
+        """Check applying recorded events to the spreadsheet data."""
+        for event, name in (
+            ("issues", "issues_labeled"),
+            ("issue_comment", "issue_comment_created"),
+            ("pull_request", "pull_request_closed"),
+            ("ping", "issues_labeled"),
+        ):
+            self.assertEqual(self._replay(event, name).status_code, 202)
+
+        repos_data = ReposDataMock("ss_id")
+        repos_data._repo_names = ("org/repo", "org/other")
+
+        self.assertEqual(self._receiver.apply_events(repos_data), {"org/repo"})
+
+        # the comment event was older than the labeling one
+        issue = repos_data.get_issues(("org/repo",))[ISSUE_URL]
+        self.assertEqual(issue.updated_at, datetime.datetime(2020, 6, 3, 10))
+        self.assertEqual(
+            [label.name for label in issue.labels], ["type: bug", "api: core"]
+        )
+        self.assertEqual(issue.assignees[0].login, "IlyaFaer")
+        self.assertIs(repos_data.get_from_index(ISSUE_URL), issue)
+
+        pull = repos_data.prs_index.get_related_prs(ISSUE_URL)[0]
+        self.assertEqual(pull.number, 15)
+        self.assertTrue(pull.merged)
+        self.assertEqual(
+            repos_data.prs_index.get_related_prs(
+                "https://github.com/org/other/issues/3"
+            ),
+            [pull],
+        )
+
+        # events are applied only once
+        self.assertEqual(self._receiver.apply_events(repos_data), set())
+        self.assertEqual(repos_data.get_issues(("org/repo",)), {})
@@ -0,0 +1,272 @@
+"""
+Adaptive concurrency of the API requests.
+
+Controllers limit the number of concurrent requests with
+the AIMD rule: the limit is raised by one after a window of
+healthy responses and halved when the API throttles the
+client (GitHub secondary rate limits, Sheets 429 quota
+errors). Throttled requests are retried after the delay,
+requested by the API, or after an exponential backoff.
+"""
+import contextlib
+import logging
+import threading
+import time
+from googleapiclient.errors import HttpError
+
+
+class AIMDController:
+    """Additive increase/multiplicative decrease concurrency limit.
+
+    Args:
+        name (str): API name, used in logs.
+        initial (int): Initial concurrency limit.
+        min_limit (int): Min concurrency limit.
+        max_limit (int): Max concurrency limit.
+        backoff (float):
+            Delay in seconds before the first retry, if
+            the API didn't set it. Doubles on every next
+            throttling till a healthy response.
+        retries (int): Max number of retries of a throttled call.
+    """
+
+    def __init__(
+        self, name, initial=4, min_limit=1, max_limit=16, backoff=1, retries=3
+    ):
+        self._name = name
+        self._min_limit = min_limit
+        self._max_limit = max_limit
+        self._backoff = backoff
+        self._retries = retries
+
+        self._cond = threading.Condition()
+        self._limit = float(initial)
+        self._active = 0
+        # calls are paused till this timestamp after throttling
+        self._paused_till = 0
+        # number of throttlings in a row
+        self._throttled_in_row = 0
+
+        self.calls = 0
+        self.throttles = 0
+
+    @property
+    def limit(self):
+        """Current concurrency limit."""
+        return int(self._limit)
+
+    def call(self, func, retry_after):
+        """Call the function within the concurrency limit.
+
+        Args:
+            func (Callable): Function sending a request.
+            retry_after (Callable):
+                Takes func result or raised exception and returns
+                None if the call wasn't throttled. Otherwise returns
+                delay in seconds requested by the API, 0 if not set.
+
+        Returns:
+            Any: Result of the last func call.
+        """
+        for attempt in range(self._retries + 1):
+            with self._slot():
+                try:
+                    result, error = func(), None
+                except Exception as exc:
+                    result, error = None, exc
+
+            delay = retry_after(result if error is None else error)
+            if delay is None:
+                if error is None:
+                    self._increase()
+                break
+
+            self._decrease(delay)
+
+        if error is not None:
+            raise error
+        return result
+
+    def metrics(self):
+        """Return controller state and counters.
+
+        Returns:
+            dict: Concurrency limit, active, sent and throttled calls.
+        """
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "active": self._active,
+                "calls": self.calls,
+                "throttles": self.throttles,
+            }
+
+    @contextlib.contextmanager
+    def _slot(self):
+        """Wait till the call fits into the concurrency limit."""
+        with self._cond:
+            while True:
+                pause = self._paused_till - time.time()
+                if pause <= 0 and self._active < self.limit:
+                    break
+
+                self._cond.wait(pause if pause > 0 else None)
+
+            self._active += 1
+            self.calls += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify_all()
+
+    def _increase(self):
+        """Raise the limit by one per a window of healthy calls."""
+        with self._cond:
+            self._throttled_in_row = 0
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            self._cond.notify_all()
+
+    def _decrease(self, delay):
+        """Halve the limit and pause calls after throttling.
+
+        Args:
+            delay (float): Delay requested by the API, 0 if not set.
+        """
+        with self._cond:
+            if not delay:
+                delay = self._backoff * 2 ** min(self._throttled_in_row, 6)
+
+            self.throttles += 1
+            self._throttled_in_row += 1
+            self._limit = max(self._min_limit, self._limit / 2)
+            self._paused_till = max(self._paused_till, time.time() + delay)
+
+        logging.warning(
+            "{name} API throttled requests, concurrency limit lowered "
+            "to {limit}, requests paused for {delay} s".format(
+                name=self._name, limit=self.limit, delay=delay
+            )
+        )
+
+
+class SheetsResource:
+    """Proxy of Google Sheets API resource.
+
+    Requests built with the resource are executed through
+    the Sheets controller and paced by the quota governor.
+
+    Args:
+        resource (googleapiclient.discovery.Resource): Sheets API resource.
+        controller (AIMDController): Concurrency controller.
+        governor (quota.QuotaGovernor): Requests quota governor.
+    """
+
+    def __init__(self, resource, controller, governor=None):
+        self._resource = resource
+        self._controller = controller
+        self._governor = governor
+
+    def __getattr__(self, name):
+        method = getattr(self._resource, name)
+
+        def call(*args, **kwargs):
+            result = method(*args, **kwargs)
+            if hasattr(result, "execute"):
+                return _SheetsRequest(result, name, self._controller, self._governor)
+            return SheetsResource(result, self._controller, self._governor)
+
+        return call
+
+
+class _SheetsRequest:
+    """Proxy of Google Sheets API request.
+
+    Args:
+        request (googleapiclient.http.HttpRequest): Request to execute.
+        method (str): Sheets API method name.
+        controller (AIMDController): Concurrency controller.
+        governor (quota.QuotaGovernor): Requests quota governor.
+    """
+
+    def __init__(self, request, method, controller, governor=None):
+        self._request = request
+        self._method = method
+        self._controller = controller
+        self._governor = governor
+
+    def execute(self, **kwargs):
+        """Execute the request within the concurrency limit and quota.
+
+        Returns:
+            dict: Parsed response.
+        """
+
+        def send():
+            # every retry is counted against the quota
+            if self._governor is not None:
+                self._governor.acquire(self._method)
+            return self._request.execute(**kwargs)
+
+        return self._controller.call(send, sheets_retry_after)
+
+
+def github_retry_after(resp):
+    """Check if GitHub throttled the request.
+
+    Args:
+        resp (Any): GitHub response (transport.Response) or raised exception.
+
+    Returns:
+        float: Delay requested by GitHub, None if not throttled.
+    """
+    # connection errors are not throttling
+    if isinstance(resp, Exception):
+        return None
+
+    # exhausted primary rate limit is not retried
+    if (
+        resp.status not in (403, 429)
+        or resp.headers.get("x-ratelimit-remaining") == "0"
+    ):
+        return None
+
+    if "retry-after" in resp.headers:
+        return float(resp.headers["retry-after"])
+    body = resp.read()
+    if resp.status == 429 or "secondary rate limit" in body or "abuse" in body:
+        return 0
+    return None
+
+
+def sheets_retry_after(result):
+    """Check if Google Sheets API throttled the request.
+
+    Args:
+        result (Any): Response or raised exception.
+
+    Returns:
+        float: Delay requested by the API, None if not throttled.
+    """
+    if not isinstance(result, HttpError) or result.resp.status != 429:
+        return None
+    return float(result.resp.get("retry-after", 0))
+
+
+# GitHub recommends not to send many requests concurrently,
+# and asks to wait at least a minute after secondary rate limit
+github_controller = AIMDController("GitHub", initial=8, max_limit=32, backoff=60)
+sheets_controller = AIMDController("Sheets", initial=2, max_limit=8)
+
+
+def metrics():
+    """Return state and counters of all the controllers.
+
+    Returns:
+        dict: Controllers metrics by API names.
+    """
+    return {
+        "github": github_controller.metrics(),
+        "sheets": sheets_controller.metrics(),
+    }
@@ -0,0 +1,183 @@
+"""
+Pool of GitHub credentials.
+
+Every credential has its own rate limit, so with several
+tokens more repositories can be read on every update.
+Requests are sent with the token, which has the most of
+the rate limit remaining; exhausted tokens are not used
+till their rate limit reset.
+"""
+import calendar
+import threading
+import time
+import github
+
+
+class AppToken:
+    """Installation access token of a GitHub App.
+
+    Installation tokens expire in an hour, so
+    the token is renewed shortly before expiration.
+
+    Args:
+        app_id (int): GitHub App id.
+        private_key (str): GitHub App private key in PEM format.
+        installation_id (int): Id of the App installation.
+    """
+
+    def __init__(self, app_id, private_key, installation_id):
+        self._integration = github.GithubIntegration(app_id, private_key)
+        self._installation_id = installation_id
+        self._lock = threading.Lock()
+        self._token = None
+        self._expires_at = 0
+
+    def get(self):
+        """Get actual installation token.
+
+        Returns:
+            str: Access token.
+        """
+        with self._lock:
+            if self._expires_at - time.time() < 60:
+                auth = self._integration.get_access_token(self._installation_id)
+                self._token = auth.token
+                self._expires_at = calendar.timegm(auth.expires_at.utctimetuple())
+
+        return self._token
+
+
+class TokenPool:
+    """GitHub credentials, rotated by the remaining rate limit.
+
+    Args:
+        tokens (list):
+            Personal access tokens (str) and
+            GitHub App tokens (AppToken).
+    """
+
+    def __init__(self, tokens):
+        self._tokens = list(tokens)
+        self._lock = threading.Lock()
+        # the last known rate limits of the tokens in format:
+        # {(<token index>, <resource>): [<remaining>, <limit>, <reset timestamp>]}
+        self._limits = {}
+
+    def choose(self, resource="core"):
+        """Choose the token with the most of the rate limit remaining.
+
+        Tokens, which were never used, are chosen first. If all of
+        the tokens are exhausted, the one which resets first is chosen.
+
+        Args:
+            resource (str): Rate limit resource: "core", "graphql", etc.
+
+        Returns:
+            int: Index of the chosen token, to be passed into update().
+            str: Access token.
+        """
+        now = time.time()
+        with self._lock:
+            index = max(
+                range(len(self._tokens)),
+                key=lambda ind: self._rank(ind, resource, now),
+            )
+            limit = self._limits.get((index, resource))
+            if limit is not None:
+                # count the request till the actual numbers come
+                limit[0] -= 1
+
+        token = self._tokens[index]
+        return index, token if isinstance(token, str) else token.get()
+
+    def update(self, index, headers):
+        """Remember the token rate limit from the response headers.
+
+        Args:
+            index (int): Index of the token, returned by choose().
+            headers (dict): Response headers.
+        """
+        if "x-ratelimit-remaining" not in headers:
+            return
+
+        resource = headers.get("x-ratelimit-resource", "core")
+        with self._lock:
+            self._limits[(index, resource)] = [
+                int(headers["x-ratelimit-remaining"]),
+                int(headers["x-ratelimit-limit"]),
+                int(headers["x-ratelimit-reset"]),
+            ]
+
+    def rate_limit(self, resource="core"):
+        """Total rate limit of all of the tokens.
+
+        Args:
+            resource (str): Rate limit resource: "core", "graphql", etc.
+
+        Returns:
+            tuple:
+                Remaining requests, requests limit and rate limit
+                reset timestamp. None, if some token was never used.
+        """
+        now = time.time()
+        remaining = limit = reset_time = 0
+        with self._lock:
+            for index in range(len(self._tokens)):
+                token_limit = self._limits.get((index, resource))
+                if token_limit is None:
+                    return None
+
+                token_remaining, token_max, token_reset = token_limit
+                if token_reset <= now:
+                    token_remaining = token_max
+
+                remaining += max(token_remaining, 0)
+                limit += token_max
+                reset_time = max(reset_time, token_reset)
+
+        return remaining, limit, reset_time
+
+    def _rank(self, index, resource, now):
+        """Build the token sorting key for choose().
+
+        Args:
+            index (int): Token index.
+            resource (str): Rate limit resource.
+            now (float): Current timestamp.
+
+        Returns:
+            tuple: Key, which is bigger for better tokens.
+        """
+        limit = self._limits.get((index, resource))
+        if limit is None:
+            return (2, 0)
+
+        remaining, max_limit, reset_time = limit
+        if reset_time <= now:
+            remaining = max_limit
+
+        if remaining > 0:
+            return (1, remaining)
+        return (0, -reset_time)
+
+
+def build_pool(tokens=(), apps=()):
+    """Build tokens pool from the configurations.
+
+    Args:
+        tokens (list): Personal access tokens.
+        apps (list):
+            GitHub App installations: dicts with "app_id",
+            "private_key_path" and "installation_id" keys.
+
+    Returns:
+        TokenPool: Pool of all the given credentials.
+    """
+    app_tokens = []
+    for app in apps:
+        with open(app["private_key_path"]) as key_file:
+            private_key = key_file.read()
+
+        app_tokens.append(AppToken(app["app_id"], private_key, app["installation_id"]))
+
+    return TokenPool(list(tokens) + app_tokens)
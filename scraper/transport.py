@@ -0,0 +1,379 @@
+"""
+HTTP transport for PyGithub requester.
+
+Default PyGithub connection object keeps the request
+arguments in its attributes and is shared between all
+of the requests of a client, so it can't be used by
+several threads at once. Connection classes of this
+module keep HTTP sessions per thread instead.
+
+The module also tracks lazy completions: requests, which
+PyGithub sends implicitly on reading attributes absent
+from the listing payloads.
+"""
+import contextlib
+import logging
+import threading
+import requests
+import github
+import throttle
+
+
+_local = threading.local()
+_counter_lock = threading.Lock()
+# cache of GET responses, set with install()
+cache = None
+# pool of GitHub credentials, set with install()
+token_pool = None
+# the last known rate limits in format:
+# {<resource>: (<remaining>, <limit>, <reset timestamp>)}
+rate_limits = {}
+# PyGithub method, substituted to track lazy completions
+_original_complete_if_needed = (
+    github.GithubObject.CompletableGithubObject._completeIfNeeded
+)
+
+
+class LazyCompletionError(Exception):
+    """Object completion was requested in a strict completion guard."""
+
+
+class CompletionGuard:
+    """Counter of the lazy completions.
+
+    Args:
+        strict (bool): Raise LazyCompletionError on completion.
+    """
+
+    def __init__(self, strict=False):
+        self.strict = strict
+        self.completions = 0
+
+
+class Response:
+    """Mimic of the httplib response object, expected by PyGithub.
+
+    Args:
+        status (int): HTTP status code.
+        headers (dict): Response headers.
+        body (str): Response body.
+    """
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    def getheaders(self):
+        """Return response headers.
+
+        Returns:
+            Iterable: (name, value) pairs.
+        """
+        return self.headers.items()
+
+    def read(self):
+        """Return response body.
+
+        Returns:
+            str: Response body.
+        """
+        return self._body
+
+
+class HTTPSConnection:
+    """Connection class to be injected into PyGithub requester.
+
+    PyGithub creates a new connection object for every
+    request, when custom connection classes are injected,
+    so the request arguments are never shared between threads.
+
+    Args:
+        host (str): GitHub API host.
+        port (int): GitHub API port.
+        timeout (int): Request timeout in seconds.
+    """
+
+    protocol = "https"
+
+    def __init__(self, host, port=None, strict=False, timeout=None, **kwargs):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._request = None
+
+    def request(self, verb, url, input, headers, stream=False):
+        """Remember request arguments.
+
+        Args:
+            verb (str): HTTP method.
+            url (str): Request path with parameters.
+            input (str): Request body.
+            headers (dict): Request headers.
+        """
+        self._request = (verb, url, input, headers)
+
+    def getresponse(self):
+        """Send the remembered request.
+
+        Returns:
+            Response: Response object.
+        """
+        verb, url, input, headers = self._request
+        return send(verb, self._full_url(url), input, headers, self.timeout)
+
+    def close(self):
+        """Connections are not persistent, nothing to close."""
+        pass
+
+    def _full_url(self, url):
+        """Build absolute URL from the request path.
+
+        Args:
+            url (str): Request path with parameters.
+
+        Returns:
+            str: Absolute URL.
+        """
+        port = ":" + str(self.port) if self.port else ""
+        return "{protocol}://{host}{port}{url}".format(
+            protocol=self.protocol, host=self.host, port=port, url=url
+        )
+
+
+class HTTPConnection(HTTPSConnection):
+    """Connection class for plain HTTP GitHub servers."""
+
+    protocol = "http"
+
+
+def send(verb, url, body, headers, timeout=None):
+    """Send HTTP request.
+
+    GET requests go through the responses cache, if it's installed.
+    Requests without credentials are signed with a token from
+    the tokens pool, if it's installed.
+
+    Args:
+        verb (str): HTTP method.
+        url (str): Absolute URL.
+        body (str): Request body.
+        headers (dict): Request headers.
+        timeout (int): Request timeout in seconds.
+
+    Returns:
+        Response: Response object.
+    """
+    request = _request
+    if token_pool is not None and "Authorization" not in headers:
+        request = _pool_request
+
+    if cache is not None and verb == "GET":
+        resp = cache.send(request, verb, url, body, headers, timeout)
+    else:
+        resp = request(verb, url, body, headers, timeout)
+
+    if request is _request:
+        _update_rate_limits(resp.headers)
+    return resp
+
+
+def requests_count():
+    """Number of the rate-limited requests, sent by the current thread.
+
+    Responses served from the cache are not counted.
+
+    Returns:
+        int: Number of requests.
+    """
+    return requests_counter()[0]
+
+
+def requests_counter():
+    """Requests counter of the current thread.
+
+    Returns:
+        list: Counter, a list with a single number.
+    """
+    counter = getattr(_local, "requests_counter", None)
+    if counter is None:
+        counter = _local.requests_counter = [0]
+    return counter
+
+
+def use_requests_counter(counter):
+    """Count requests of the current thread with the given counter.
+
+    Helper threads use it to attribute their
+    requests to the thread they work for.
+
+    Args:
+        counter (list): Counter, returned by requests_counter().
+    """
+    _local.requests_counter = counter
+
+
+def _request(verb, url, body, headers, timeout=None):
+    """Send HTTP request within the GitHub concurrency limit.
+
+    Requests, throttled by GitHub secondary
+    rate limits, are retried after a delay.
+
+    Args:
+        verb (str): HTTP method.
+        url (str): Absolute URL.
+        body (str): Request body.
+        headers (dict): Request headers.
+        timeout (int): Request timeout in seconds.
+
+    Returns:
+        Response: Response object.
+    """
+    return throttle.github_controller.call(
+        lambda: _session_request(verb, url, body, headers, timeout),
+        throttle.github_retry_after,
+    )
+
+
+def _session_request(verb, url, body, headers, timeout=None):
+    """Send HTTP request with the current thread session.
+
+    Args:
+        verb (str): HTTP method.
+        url (str): Absolute URL.
+        body (str): Request body.
+        headers (dict): Request headers.
+        timeout (int): Request timeout in seconds.
+
+    Returns:
+        Response: Response object.
+    """
+    session = getattr(_local, "session", None)
+    if session is None:
+        session = _local.session = requests.Session()
+
+    resp = session.request(
+        verb, url, data=body, headers=headers, timeout=timeout, allow_redirects=False
+    )
+    if resp.status_code != 304:
+        with _counter_lock:
+            requests_counter()[0] += 1
+
+    return Response(
+        resp.status_code,
+        {name.lower(): value for name, value in resp.headers.items()},
+        resp.text or "",
+    )
+
+
+def _pool_request(verb, url, body, headers, timeout=None):
+    """Send HTTP request, signed with a token from the pool.
+
+    Args:
+        verb (str): HTTP method.
+        url (str): Absolute URL.
+        body (str): Request body.
+        headers (dict): Request headers.
+        timeout (int): Request timeout in seconds.
+
+    Returns:
+        Response: Response object.
+    """
+    resource = "graphql" if url.endswith("/graphql") else "core"
+    index, token = token_pool.choose(resource)
+
+    headers = dict(headers)
+    headers["Authorization"] = "token " + token
+    resp = _request(verb, url, body, headers, timeout)
+
+    token_pool.update(index, resp.headers)
+    resource = resp.headers.get("x-ratelimit-resource", resource)
+    rate_limit = token_pool.rate_limit(resource)
+    if rate_limit is not None:
+        rate_limits[resource] = rate_limit
+    return resp
+
+
+@contextlib.contextmanager
+def completion_guard(strict=False):
+    """Track lazy completions of PyGithub objects in the current thread.
+
+    Args:
+        strict (bool): Raise LazyCompletionError on completion.
+
+    Yields:
+        CompletionGuard: Guard with completions counter.
+    """
+    guard = CompletionGuard(strict)
+    prev_guard = getattr(_local, "guard", None)
+    _local.guard = guard
+    try:
+        yield guard
+    finally:
+        _local.guard = prev_guard
+
+    if guard.completions:
+        logging.warning(
+            "{num} objects were completed with separate requests".format(
+                num=guard.completions
+            )
+        )
+
+
+def _complete_if_needed(obj):
+    """Substitution for CompletableGithubObject._completeIfNeeded().
+
+    Args:
+        obj (github.GithubObject.CompletableGithubObject):
+            Object, which attribute is being read.
+    """
+    guard = getattr(_local, "guard", None)
+    if guard is not None and not obj._CompletableGithubObject__completed:
+        guard.completions += 1
+        if guard.strict:
+            raise LazyCompletionError(
+                "{cls} {url} completion requested".format(
+                    cls=type(obj).__name__, url=obj._url.value
+                )
+            )
+
+    _original_complete_if_needed(obj)
+
+
+def _update_rate_limits(headers):
+    """Remember rate limit from the response headers.
+
+    Args:
+        headers (dict): Response headers.
+    """
+    if "x-ratelimit-remaining" in headers:
+        rate_limits[headers.get("x-ratelimit-resource", "core")] = (
+            int(headers["x-ratelimit-remaining"]),
+            int(headers["x-ratelimit-limit"]),
+            int(headers["x-ratelimit-reset"]),
+        )
+
+
+def install(http_cache=None, tokens=None):
+    """Inject connection classes of this module into PyGithub.
+
+    Affects all of the GitHub clients created after the call.
+    Lazy completions of PyGithub objects start being tracked
+    by completion_guard().
+
+    Args:
+        http_cache (http_cache.HTTPCache):
+            Cache for GET responses. Installed cache is
+            used by all of the clients, including existing.
+        tokens (token_pool.TokenPool):
+            Pool of GitHub credentials to sign the
+            requests, sent without credentials, with.
+    """
+    global cache, token_pool
+    if http_cache is not None:
+        cache = http_cache
+    if tokens is not None:
+        token_pool = tokens
+
+    github.Requester.Requester.injectConnectionClasses(HTTPConnection, HTTPSConnection)
+    github.GithubObject.CompletableGithubObject._completeIfNeeded = _complete_if_needed
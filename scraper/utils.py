@@ -1,34 +1,59 @@
 """Some utils for tracker."""
+import collections
+import concurrent.futures
 import copy
+import json
 import logging
+import queue
 import shelve
-from reg_exps import NUM_REGEX, PATTERNS
+import threading
+import transport
+from reg_exps import ISSUE_REF_REGEX, NUM_REGEX, build_keywords_regex
 
 
 class BatchIterator:
     """Helper for iterating requests in batches.
 
+    Batches can be limited by the number of requests
+    and by the size of the requests serialized into JSON.
+    A request bigger than the size limit makes its own batch.
+
     Args:
         requests (list): List of requests to iterate.
-        size (int): Size of a single one batch.
+        size (int): Max number of requests in a batch.
+        max_bytes (int): Max size of a batch in bytes.
     """
 
-    def __init__(self, requests, size=20):
+    def __init__(self, requests, size=None, max_bytes=None):
         self._requests = requests
         self._size = size
+        self._max_bytes = max_bytes
         self._pos = 0
 
     def __iter__(self):
         return self
 
     def __next__(self):
-        """Return requests batch with given size.
+        """Return the next requests batch.
 
         Returns:
             list: Requests batch.
         """
-        batch = self._requests[self._pos : self._pos + self._size]  # noqa: E203
-        self._pos += self._size
+        batch = []
+        batch_bytes = 0
+        while self._pos < len(self._requests):
+            if self._size and len(batch) == self._size:
+                break
+
+            request = self._requests[self._pos]
+            if self._max_bytes:
+                request_bytes = len(json.dumps(request))
+                if batch and batch_bytes + request_bytes > self._max_bytes:
+                    break
+                batch_bytes += request_bytes
+
+            batch.append(request)
+            self._pos += 1
 
         if not batch:
             raise StopIteration()
@@ -36,6 +61,112 @@ class BatchIterator:
         return batch
 
 
+def read_ahead(iterable, size=100):
+    """Iterate over the iterable, reading ahead in a background thread.
+
+    Used with PyGithub paginated lists: the next page is
+    requested while the current one is processed. Not
+    more than `size` items are read ahead. Requests of
+    the background thread are counted for the caller thread.
+
+    Args:
+        iterable (Iterable): Iterable to read, usually a paginated list.
+        size (int): Max number of read ahead items.
+
+    Yields:
+        Any: Items of the iterable.
+    """
+    items = queue.Queue(maxsize=size)
+    stop = threading.Event()
+    counter = transport.requests_counter()
+
+    def put(item):
+        """Put item into queue, unless iteration was stopped."""
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def read():
+        transport.use_requests_counter(counter)
+        try:
+            for item in iterable:
+                if not put((True, item)):
+                    return
+            put((False, None))
+        except Exception as exc:
+            put((False, exc))
+
+    threading.Thread(target=read, daemon=True).start()
+    try:
+        while True:
+            is_item, value = items.get()
+            if not is_item:
+                if value is not None:
+                    raise value
+                return
+
+            yield value
+    finally:
+        # iteration is finished or interrupted by the caller
+        stop.set()
+
+
+def read_pages(paginated_list, total, workers=4):
+    """Iterate over the paginated list, reading pages in parallel.
+
+    The first page is read to learn the page size, and
+    the rest of the pages are requested by numbers by a
+    pool of threads. Pages are yielded in order; not more
+    than `2 * workers` pages are read ahead. Requests of
+    the pool threads are counted for the caller thread.
+
+    Args:
+        paginated_list (github.PaginatedList.PaginatedList): List to read.
+        total (int): Total number of items in the list.
+        workers (int): Number of threads reading pages.
+
+    Yields:
+        Any: Items of the list.
+    """
+    counter = transport.requests_counter()
+
+    def get_page(num):
+        transport.use_requests_counter(counter)
+        return paginated_list.get_page(num)
+
+    first_page = paginated_list.get_page(0)
+    yield from first_page
+    if not first_page or len(first_page) >= total:
+        return
+
+    pages = iter(range(1, -(-total // len(first_page))))
+    futures = collections.deque()
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+    try:
+        for num in pages:
+            futures.append(executor.submit(get_page, num))
+            if len(futures) == 2 * workers:
+                break
+
+        while futures:
+            page = futures.popleft().result()
+            for num in pages:
+                futures.append(executor.submit(get_page, num))
+                break
+
+            yield from page
+    finally:
+        # iteration is finished or interrupted by the caller;
+        # Python 3.7 executor can't cancel pending futures itself
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+
 def get_num_from_formula(formula):
     """Get issue number from spreadsheet HYPERLINK formula.
 
@@ -93,33 +224,37 @@ def build_url_formula(issue):
 def try_match_keywords(body, repo_names):
     """Try to find GitHub keywords in issue's body.
 
+    Body is scanned once for issue references, and
+    only the text right before them is checked for
+    keywords with a regex, compiled for every tuple
+    of the tracked repos.
+
     Args:
         body (str): Issue's body.
         repo_names (tuple): Tracked repositories names.
 
     Returns:
-        list: Key phrases with issue numbers, if found.
+        list:
+            Key phrases with issue numbers, if found, in format
+            "<keyword> #<num>" or "<keyword> <repo name>#<num>".
     """
     result = []
     if body:
-        # check if there are keywords declaring
-        # relation to another object in this repo
-        for pattern in PATTERNS:
-            result += pattern.findall(body)
-
-        # check if there are keywords declaring
-        # relation to another object in another
-        # repo of this sheet
-        for repo_name in repo_names:
-            for keyword in ("Closes", "Fixes", "Towards"):
-                link = keyword + " " + repo_name + "#"
-
-                if link in body:
-                    start_ind = body.index(link)
-                    parts = body[start_ind:].split()
-                    result += [
-                        parts[0] + " " + parts[1],
-                    ]
+        regex, names, window = build_keywords_regex(repo_names)
+
+        for ref in ISSUE_REF_REGEX.finditer(body):
+            match = regex.search(body, max(0, ref.start() - window), ref.end())
+            if match is None:
+                continue
+
+            repo_name = match.group("repo")
+            phrase = "{keyword} {repo}#{num}".format(
+                keyword=match.group("keyword"),
+                repo=names[repo_name.lower()] if repo_name else "",
+                num=match.group("num"),
+            )
+            if phrase not in result:
+                result.append(phrase)
     return result
 
 
@@ -128,17 +263,23 @@ def log_progress(is_first_update, total, current, message):
 
     Args:
         is_first_update (bool): This is the first update of this repo.
-        total (int): Number of issues/PRs.
+        total (int): Number of issues/PRs, None if unknown.
         current (int): Last processed issue/PR number.
         message (str): String with the processed object instance.
     """
-    if is_first_update and total > 1600:
-        if (current + 1) % 400 == 0:
-            logging.info(
-                "processed {num} of {total} {message}".format(
-                    num=current + 1, total=total, message=message
-                )
+    if not is_first_update or (current + 1) % 400:
+        return
+
+    if total is None:
+        logging.info(
+            "processed {num} {message}".format(num=current + 1, message=message)
+        )
+    elif total > 1600:
+        logging.info(
+            "processed {num} of {total} {message}".format(
+                num=current + 1, total=total, message=message
             )
+        )
 
 
 def load_update_stamps(field, sheet_name):
@@ -0,0 +1,173 @@
+"""
+Receiver of GitHub webhook events.
+
+Receiver listens for "issues", "pull_request" and
+"issue_comment" events in a background thread and queues
+them. Queued events are applied to the spreadsheet data
+with apply_events() in the main thread, so that sheets,
+affected by the events, can be updated without reading
+repositories from GitHub.
+"""
+import hashlib
+import hmac
+import http.server
+import json
+import logging
+import queue
+import threading
+from snapshots import IssueSnapshot, PullSnapshot, to_datetime
+
+EVENTS = ("issues", "pull_request", "issue_comment")
+
+
+class WebhookReceiver:
+    """Local HTTP server receiving GitHub webhook events.
+
+    Args:
+        secret (str): Webhook secret, set on GitHub.
+        host (str): Host to listen on.
+        port (int): Port to listen on, 0 to choose a free one.
+    """
+
+    def __init__(self, secret, host="", port=8080):
+        self._secret = secret.encode()
+        self._events = queue.Queue()
+        self._server = http.server.ThreadingHTTPServer(
+            (host, port), _build_handler(self)
+        )
+
+    @property
+    def port(self):
+        """Port the receiver listens on."""
+        return self._server.server_address[1]
+
+    def start(self):
+        """Start receiving events in a background thread."""
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logging.info("Receiving webhooks on port {port}".format(port=self.port))
+
+    def stop(self):
+        """Stop receiving events."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def verify(self, body, signature):
+        """Check the event signature.
+
+        Args:
+            body (bytes): Request body.
+            signature (str): X-Hub-Signature-256 header value.
+
+        Returns:
+            bool: True if the event was signed with the secret.
+        """
+        expected = "sha256=" + hmac.new(self._secret, body, hashlib.sha256).hexdigest()
+        return hmac.compare_digest(expected, signature or "")
+
+    def put(self, event, payload):
+        """Queue the received event.
+
+        Args:
+            event (str): Event name.
+            payload (dict): Event payload.
+        """
+        self._events.put((event, payload))
+
+    def apply_events(self, repos_data):
+        """Apply all of the queued events to the spreadsheet data.
+
+        Args:
+            repos_data (repos_data.ReposData): Spreadsheet GitHub data.
+
+        Returns:
+            set: Names of the repos affected by the events.
+        """
+        events = []
+        while not self._events.empty():
+            events.append(self._events.get())
+
+        return repos_data.apply_events(events)
+
+
+def issue_from_payload(payload):
+    """Build issue snapshot from the event payload.
+
+    Args:
+        payload (dict): "issues" or "issue_comment" event payload.
+
+    Returns:
+        snapshots.IssueSnapshot: Issue snapshot.
+    """
+    issue = payload["issue"]
+    return IssueSnapshot(
+        payload["repository"]["full_name"],
+        issue["number"],
+        issue["title"],
+        None,
+        issue["state"],
+        [label["name"] for label in issue["labels"]],
+        [user["login"] for user in issue["assignees"]],
+        to_datetime(issue["created_at"]),
+        to_datetime(issue["updated_at"]),
+        to_datetime(issue["closed_at"]),
+    )
+
+
+def pull_from_payload(payload):
+    """Build pull request snapshot from the event payload.
+
+    Args:
+        payload (dict): "pull_request" event payload.
+
+    Returns:
+        snapshots.PullSnapshot: Pull request snapshot.
+    """
+    pull = payload["pull_request"]
+    return PullSnapshot(
+        payload["repository"]["full_name"],
+        pull["number"],
+        pull["body"],
+        pull["state"],
+        pull["merged_at"] is not None,
+        pull["user"]["login"],
+        to_datetime(pull["created_at"]),
+        to_datetime(pull["updated_at"]),
+    )
+
+
+def _build_handler(receiver):
+    """Build request handler class for the receiver.
+
+    Args:
+        receiver (WebhookReceiver): Receiver to queue events into.
+
+    Returns:
+        type: Request handler class.
+    """
+
+    class WebhookHandler(http.server.BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not receiver.verify(body, self.headers.get("X-Hub-Signature-256")):
+                self._respond(403)
+                return
+
+            event = self.headers.get("X-GitHub-Event")
+            if event in EVENTS:
+                try:
+                    receiver.put(event, json.loads(body))
+                except ValueError:
+                    self._respond(400)
+                    return
+
+            self._respond(202)
+
+        def _respond(self, status):
+            self.send_response(status)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    return WebhookHandler